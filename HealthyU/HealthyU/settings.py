@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,12 +44,18 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "tracker.middleware.ThresholdGZipMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "tracker.middleware.StaticAssetsMiddleware",
+    "tracker.middleware.StaticExportMiddleware",
+    "tracker.middleware.AnonymousPageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "tracker.middleware.ReadReplicaMiddleware",
+    "tracker.middleware.ShardMiddleware",
 ]
 
 ROOT_URLCONF = "HealthyU.urls"
@@ -78,10 +85,137 @@ WSGI_APPLICATION = "HealthyU.wsgi.application"
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("HEALTHYU_DB_PATH", BASE_DIR / "db.sqlite3"),
     }
 }
 
+# Production SQLite profile (HEALTHYU_DB_PROFILE=production):
+# WAL lets readers run alongside the writer, busy_timeout/timeout make writers
+# wait for the lock instead of failing, and connections are reused across requests.
+# Measure with: python manage.py bench_db (once per profile, on a fresh HEALTHYU_DB_PATH).
+# With the defaults (8 writers x 10, 8 readers x 50) most default-profile writes fail
+# with "database is locked"; the production profile completes them all.
+DB_PROFILE = os.environ.get("HEALTHYU_DB_PROFILE", "default")
+
+if DB_PROFILE == "production":
+    DATABASES["default"].update({
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "timeout": 20,
+            "transaction_mode": "IMMEDIATE",
+            "init_command": (
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA mmap_size=134217728;"
+                "PRAGMA cache_size=-20000;"
+                "PRAGMA busy_timeout=20000;"
+                "PRAGMA temp_store=MEMORY;"
+            ),
+        },
+    })
+
+# Sharding (HEALTHYU_SHARDS=N): SessionRecord / PointsTransaction rows are split
+# across N SQLite files by user id hash (tracker/sharding.py). After changing N run
+# `python manage.py migrate --database shardX` for new shards and `rebalance_shards`.
+SHARD_COUNT = int(os.environ.get("HEALTHYU_SHARDS", "0"))
+SHARD_DIR = Path(os.environ.get("HEALTHYU_SHARD_DIR", BASE_DIR))
+
+for i in range(SHARD_COUNT):
+    DATABASES[f"shard{i}"] = {
+        **DATABASES["default"],
+        "NAME": SHARD_DIR / f"shard{i}.sqlite3",
+    }
+
+DATABASE_ROUTERS = ["tracker.sharding.ShardRouter"]
+
+# Read replica (HEALTHYU_REPLICA_DB_PATH): read-heavy pages read from a copy of the
+# primary kept fresh by `python manage.py sync_replica --interval 5`.
+# Clients that just wrote are pinned to the primary for READ_REPLICA_STICKY_SECONDS.
+REPLICA_DB_PATH = os.environ.get("HEALTHYU_REPLICA_DB_PATH")
+
+if REPLICA_DB_PATH:
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": REPLICA_DB_PATH,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS.append("tracker.db_routers.ReadReplicaRouter")
+
+READ_REPLICA_URL_NAMES = [
+    "progress_data",
+    "show_progress",
+    "streak",
+    "points",
+]
+READ_REPLICA_STICKY_SECONDS = 10
+
+# Route session/challenge/plan writes through one writer thread (tracker/write_queue.py).
+SQLITE_WRITE_QUEUE = os.environ.get(
+    "HEALTHYU_WRITE_QUEUE", "1" if DB_PROFILE == "production" else "0"
+) == "1"
+
+# Serve the hot read endpoints with the async views in tracker/async_views.py
+# (only worth it under ASGI; under WSGI each async view gets its own event loop).
+ASYNC_VIEWS = os.environ.get("HEALTHYU_ASYNC_VIEWS", "0") == "1"
+
+# Live updates stream (tracker/live_updates.py, ASGI only)
+LIVE_UPDATES_HEARTBEAT_SECONDS = 15
+LIVE_UPDATES_QUEUE_SIZE = 32
+
+# Cache shared by every worker process: the page cache and its generation key
+# (bumped by signals.py), its single-flight lock, and the cached charts, reports and
+# analytics all live here, so a per-process cache would leave other workers stale.
+# HEALTHYU_REDIS_URL (needs the redis package) for multi-host deploys; otherwise the
+# production profile uses a directory shared by the workers on this host (SQLite
+# already pins the app to one host; its add() isn't atomic across processes, so the
+# single-flight lock is best effort there). LocMem is only right for a single
+# process (runserver, tests).
+CACHE_REDIS_URL = os.environ.get("HEALTHYU_REDIS_URL")
+
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+elif DB_PROFILE == "production":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("HEALTHYU_CACHE_DIR", BASE_DIR / "cache"),
+            "OPTIONS": {"MAX_ENTRIES": 20000},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Anonymous full-page cache (tracker/page_cache.py): URL name -> TTL seconds
+PAGE_CACHE_TTLS = {
+    "home": 300,
+    "workout_plans": 3600,
+    "yoga_detail": 3600,
+    "meditation_detail": 3600,
+    "workout_detail": 3600,
+    "challenge_session": 600,
+    "challenges": 60,
+}
+
+# Pre-rendered catalog pages (manage.py export_static_pages). StaticExportMiddleware
+# only serves them with HEALTHYU_SERVE_STATIC_EXPORT=1: set it in deploys that
+# re-run the export, so an old export never shadows newer templates or data.
+STATIC_EXPORT_ROOT = BASE_DIR / "static_export"
+SERVE_STATIC_EXPORT = os.environ.get("HEALTHYU_SERVE_STATIC_EXPORT", "0") == "1"
+
+# PhysicalHealth days older than this are rolled into weekly/monthly
+# summaries by manage.py compact_health_data (tracker/health_compaction.py)
+HEALTH_RAW_RETENTION_DAYS = 400
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -118,3 +252,27 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content-hashed names plus .gz/.br variants (tracker/storage.py).
+# Off in DEBUG, where runserver serves the app static directories directly.
+STATIC_MANIFEST = os.environ.get("HEALTHYU_STATIC_MANIFEST", "0" if DEBUG else "1") == "1"
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": (
+            "tracker.storage.CompressedManifestStaticFilesStorage"
+            if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
+# Let Django serve STATIC_ROOT (precompressed, long-cache) when nothing sits in front of it
+SERVE_STATIC_ASSETS = os.environ.get("HEALTHYU_SERVE_STATIC", "1" if STATIC_MANIFEST else "0") == "1"
+
+# Dynamic HTML / JSON smaller than this goes out uncompressed (ThresholdGZipMiddleware)
+GZIP_MIN_BYTES = 1024
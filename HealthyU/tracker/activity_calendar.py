@@ -0,0 +1,161 @@
+"""
+Year-at-a-glance activity calendar from ActivityYear rows.
+
+_save_session marks the day in the user's row for that year (one bit plus
+one intensity byte), so the heatmap, "days active this year" and streak
+checks read a single ~400-byte row instead of a year of SessionRecords.
+rebuild() refills the rows from SessionRecord after imports or data fixes.
+
+The heatmap is inline SVG like the progress charts (tracker/progress_charts.py):
+one column per week, Monday at the top.
+"""
+import calendar
+import datetime
+import heapq
+from datetime import timedelta
+from itertools import groupby
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import ActivityYear, SessionRecord
+from .sharding import aliases_for
+
+CELL, GAP = 11, 2
+TOP, LEFT = 16, 28
+LEVEL_LABELS = ("No session", "0-24%", "25-49%", "50-74%", "75-100%")
+
+
+def level_for(progress):
+    """1..4 for a saved session (0 is kept for "no session")."""
+    return 1 + min(max(int(progress or 0), 0), 99) // 25
+
+
+def mark_day(user_id, day, progress):
+    """Call inside the write unit that saves the session."""
+    row, _ = ActivityYear.objects.select_for_update().get_or_create(user_id=user_id, year=day.year)
+    row.mark(day, level_for(progress))
+    row.save(update_fields=["active_bits", "levels", "days_active"])
+
+
+def get_year(user_id, year):
+    return ActivityYear.objects.filter(user_id=user_id, year=year).first()
+
+
+def current_run(user_id, today):
+    """
+    Active days in a row ending today (or yesterday, if today isn't done yet),
+    from this year's and last year's rows.
+    """
+    rows = {r.year: r for r in ActivityYear.objects.filter(user_id=user_id, year__in=[today.year - 1, today.year])}
+    row = rows.get(today.year)
+    day = today if row and row.is_active(today) else today - timedelta(days=1)
+
+    run = 0
+    while (row := rows.get(day.year)) is not None:
+        days = row.run_ending(day)
+        run += days
+        if days != ActivityYear.day_index(day) + 1:
+            break
+        day = datetime.date(day.year - 1, 12, 31)   # the run reaches Jan 1st
+    return run
+
+
+def summary(row, year, today):
+    """JSON for progress/activity/: per-day levels plus the counts."""
+    days = 366 if calendar.isleap(year) else 365
+    levels = list(bytes(row.levels)[:days]) if row else [0] * days
+    return {
+        "year": year,
+        "days_active": row.days_active if row else 0,
+        "levels": levels,
+        "active_today": bool(row) and today.year == year and row.is_active(today),
+    }
+
+
+def heatmap_svg(row, year):
+    first = datetime.date(year, 1, 1)
+    days = 366 if calendar.isleap(year) else 365
+    weeks = (first.weekday() + days + 6) // 7
+
+    parts = []
+    for label, y in (("Mon", 0), ("Wed", 2), ("Fri", 4)):
+        parts.append(
+            f'<text class="tick" x="0" y="{TOP + y * (CELL + GAP) + CELL - 2}">{label}</text>'
+        )
+    for month in range(1, 13):
+        week = (first.weekday() + ActivityYear.day_index(datetime.date(year, month, 1))) // 7
+        parts.append(
+            f'<text class="tick" x="{LEFT + week * (CELL + GAP)}" y="{TOP - 5}">'
+            f"{calendar.month_abbr[month]}</text>"
+        )
+
+    levels = bytes(row.levels) if row else bytes(days)
+    for i in range(days):
+        day = first + timedelta(days=i)
+        week = (first.weekday() + i) // 7
+        level = levels[i]
+        parts.append(
+            f'<rect class="cell level-{level}" x="{LEFT + week * (CELL + GAP)}" '
+            f'y="{TOP + day.weekday() * (CELL + GAP)}" width="{CELL}" height="{CELL}" rx="2">'
+            f"<title>{day:%d %b %Y}: {escape(LEVEL_LABELS[level])}</title></rect>"
+        )
+
+    width = LEFT + weeks * (CELL + GAP)
+    height = TOP + 7 * (CELL + GAP)
+    return mark_safe(
+        f'<svg class="svg-heatmap" viewBox="0 0 {width} {height}" role="img" '
+        f'aria-label="Activity in {year}">{"".join(parts)}</svg>'
+    )
+
+
+def _rows_for_range(first, last, user_ids=None):
+    streams = []
+    for alias in aliases_for(SessionRecord):
+        qs = SessionRecord.objects.using(alias).filter(user_id__gte=first, user_id__lte=last)
+        if user_ids is not None:
+            qs = qs.filter(user_id__in=user_ids)
+        streams.append(qs.order_by("user_id", "date").values_list("user_id", "date", "progress"))
+
+    rows = []
+    for (user_id, year), sessions in groupby(
+        heapq.merge(*streams), key=lambda s: (s[0], s[1].year)
+    ):
+        row = ActivityYear(user_id=user_id, year=year)
+        for _, day, progress in sessions:
+            row.mark(day, level_for(progress))
+        rows.append(row)
+    return rows
+
+
+def _user_batches(user_ids, batch_size):
+    """(user ids, explicit): explicit batches must be filtered to exactly those ids."""
+    if user_ids is not None:
+        user_ids = sorted(set(user_ids))
+        for start in range(0, len(user_ids), batch_size):
+            yield user_ids[start:start + batch_size], True
+        return
+
+    last = 0
+    while True:
+        chunk = list(User.objects.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not chunk:
+            return
+        yield chunk, False
+        last = chunk[-1]
+
+
+def rebuild(user_ids=None, batch_size=1000):
+    """Rewrites the ActivityYear rows from SessionRecord; yields (users, rows) per batch."""
+    for chunk, explicit in _user_batches(user_ids, batch_size):
+        only = chunk if explicit else None
+        rows = _rows_for_range(chunk[0], chunk[-1], only)
+        with transaction.atomic():
+            stale = ActivityYear.objects.filter(user_id__gte=chunk[0], user_id__lte=chunk[-1])
+            if only is not None:
+                stale = stale.filter(user_id__in=only)
+            stale.delete()
+            ActivityYear.objects.bulk_create(rows)
+        yield len(chunk), len(rows)
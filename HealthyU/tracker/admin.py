@@ -1,24 +1,234 @@
-from django.contrib import admin
+import time
+
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+from . import recompute
 from .models import UserProfile, SessionRecord
+from .sharding import is_sharded, shard_aliases, shard_for, sharding_enabled
+from .write_queue import WriteQueueFull, WriteTimeout, writer
 
 # Register your models here.
 
-from .models import PhysicalHealth
-admin.site.register(PhysicalHealth)
+
+# ---------------- SCALE MODE (big history tables) ----------------
+def estimated_row_count(model, alias):
+    """Row count from SQLite's ANALYZE statistics; None if there are none."""
+    connection = connections[alias]
+    if connection.vendor != "sqlite":
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+    except DatabaseError:   # no sqlite_stat1 until ANALYZE has run
+        return None
+    return int(row[0].split()[0]) if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Never runs an unbounded COUNT(*): an unfiltered changelist uses the
+    ANALYZE estimate, a filtered one counts at most COUNT_CAP rows.
+    """
+
+    COUNT_CAP = 10000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not qs.query.where:
+            estimate = estimated_row_count(qs.model, qs.db)
+            if estimate is not None:
+                return estimate
+        return qs.order_by()[:self.COUNT_CAP].count()
+
+
+class ShardListFilter(admin.SimpleListFilter):
+    """
+    Which shard a sharded changelist reads. There is no "All": pages come from
+    one database (ScaleModeAdmin.get_shard picks it, this only offers the links).
+    """
+
+    title = "shard"
+    parameter_name = "shard"
+
+    def lookups(self, request, model_admin):
+        return [(alias, alias) for alias in shard_aliases()]
+
+    def queryset(self, request, queryset):
+        return queryset   # routed in ScaleModeAdmin.get_queryset
+
+    def choices(self, changelist):
+        current = changelist.root_queryset.db
+        for alias, title in self.lookup_choices:
+            yield {
+                "selected": alias == current,
+                "query_string": changelist.get_query_string({self.parameter_name: alias}),
+                "display": title,
+            }
+
+
+class ScaleModeAdmin(admin.ModelAdmin):
+    """
+    Changelists for tables with millions of rows: no user sidebar filter,
+    no full COUNT(*), user as a raw id, and search by exact username or
+    user id (both indexed lookups) instead of LIKE '%...%'.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    raw_id_fields = ("user",)
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+    search_help_text = "Exact username or user id"
+
+    def get_list_select_related(self, request):
+        # sharded rows live in a shard database without auth_user → no JOIN
+        # (() rather than False: False makes the changelist join every FK it lists)
+        if is_sharded(self.model) and sharding_enabled():
+            return ()
+        return super().get_list_select_related(request)
+
+    def get_list_display(self, request):
+        list_display = super().get_list_display(request)
+        if is_sharded(self.model) and sharding_enabled():
+            return tuple("user_id" if name == "user" else name for name in list_display)
+        return list_display
+
+    def get_list_filter(self, request):
+        list_filter = super().get_list_filter(request)
+        if is_sharded(self.model) and sharding_enabled():
+            return (ShardListFilter, *list_filter)
+        return list_filter
+
+    def get_shard(self, request):
+        """
+        Alias for a sharded changelist and the change forms opened from it:
+        the ?shard= choice, else the searched user's shard, else the first.
+        Explicit, because ShardMiddleware's current_shard is the staff user's own shard.
+        """
+        params = request.GET
+        if "_changelist_filters" in params:   # change form: the changelist's query string
+            params = QueryDict(params["_changelist_filters"])
+
+        alias = params.get(ShardListFilter.parameter_name)
+        if alias in shard_aliases():
+            return alias
+        user_ids = self._search_user_ids(params.get(SEARCH_VAR, ""))
+        if len(user_ids) == 1:
+            return shard_for(user_ids[0])
+        return shard_aliases()[0]
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if is_sharded(self.model) and sharding_enabled():
+            qs = qs.using(self.get_shard(request))
+        return qs
+
+    @staticmethod
+    def _search_user_ids(term):
+        term = term.strip()
+        if not term:
+            return []
+        if term.isdigit():
+            return [int(term)]
+        return list(User.objects.filter(username=term).values_list("pk", flat=True))
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(user_id__in=self._search_user_ids(search_term)), False
+
+
+from .models import PhysicalHealth, PhysicalHealthSummary
+
+
+@admin.register(PhysicalHealth)
+class PhysicalHealthAdmin(ScaleModeAdmin):
+    list_display = ('user', 'date', 'steps', 'calories', 'sleep_hours')
+    date_hierarchy = 'date'
+
+
+@admin.register(PhysicalHealthSummary)
+class PhysicalHealthSummaryAdmin(ScaleModeAdmin):
+    list_display = ('user', 'period', 'period_start', 'days', 'steps_total', 'calories_total', 'sleep_hours_total')
+    list_filter = ('period',)
 
 from .models import Exercise
 admin.site.register(Exercise)
 
+# ---------------- RECOMPUTE ACTIONS ----------------
+# The admin request waits for the whole recompute: bigger selections are left to
+# `manage.py recompute_profiles`, and each chunk is one unit on the write queue so
+# the request's writes interleave with everyone else's instead of holding the lock.
+RECOMPUTE_MAX_USERS = 500
+RECOMPUTE_CHUNK = 100
+
+
+def _recompute_chunk(job, user_ids):
+    return sum(n for _, n in recompute.run(job, user_ids, chunk_size=len(user_ids)))
+
+
+def _recompute_action(job, description):
+    def action(modeladmin, request, queryset):
+        user_ids = list(queryset.values_list("user_id", flat=True)[:RECOMPUTE_MAX_USERS + 1])
+        if len(user_ids) > RECOMPUTE_MAX_USERS:
+            modeladmin.message_user(
+                request,
+                f"More than {RECOMPUTE_MAX_USERS} users selected: run "
+                f"`python manage.py recompute_profiles --job {job}` for them instead.",
+                messages.WARNING,
+            )
+            return
+
+        started = time.monotonic()
+        changed = 0
+        for start in range(0, len(user_ids), RECOMPUTE_CHUNK):
+            try:
+                changed += writer.submit(_recompute_chunk, job, user_ids[start:start + RECOMPUTE_CHUNK])
+            except (WriteQueueFull, WriteTimeout):
+                modeladmin.message_user(
+                    request,
+                    f"Database busy: recomputed {job} for {start} of {len(user_ids)} users "
+                    f"({changed} changed). Try again or use recompute_profiles.",
+                    messages.ERROR,
+                )
+                return
+        modeladmin.message_user(
+            request,
+            f"Recomputed {job} for {len(user_ids)} users: {changed} changed "
+            f"in {time.monotonic() - started:.2f}s.",
+        )
+
+    action.__name__ = f"recompute_{job}"
+    action.short_description = description
+    return action
+
+
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ('user', 'points', 'streak', 'last_activity', 'last_session_date')
+class UserProfileAdmin(ScaleModeAdmin):
+    list_display = ('user', 'points', 'streak', 'longest_streak', 'last_activity', 'last_session_date')
+    actions = [
+        _recompute_action("points", "Recompute points from the points ledger"),
+        _recompute_action("streaks", "Recompute streaks from session dates"),
+        _recompute_action("progress", "Recompute session progress from reports"),
+    ]
 
 
 @admin.register(SessionRecord)
-class SessionRecordAdmin(admin.ModelAdmin):
-    list_display = ('user', 'date', 'points_earned', 'created_at')
-    list_filter = ('date', 'user')
-    search_fields = ('user__username',)
+class SessionRecordAdmin(ScaleModeAdmin):
+    list_display = ('user', 'date', 'points_earned', 'progress', 'created_at')
+    date_hierarchy = 'date'
 
 
 from .models import ExercisePlan, PlanItem
@@ -29,9 +239,45 @@ admin.site.register(PlanItem)
 from .models import DailyExerciseChallenge, DailyExerciseChallengeLog
 
 admin.site.register(DailyExerciseChallenge)
-admin.site.register(DailyExerciseChallengeLog)
+
+
+@admin.register(DailyExerciseChallengeLog)
+class DailyExerciseChallengeLogAdmin(ScaleModeAdmin):
+    list_display = ('user', 'challenge', 'status', 'date')
+    list_filter = ('status',)
+    list_select_related = ('user', 'challenge')
+    raw_id_fields = ('user', 'challenge')
+    date_hierarchy = 'date'
 
 from .models import ChallengeMaster, UserChallengeLog
 
 admin.site.register(ChallengeMaster)
-admin.site.register(UserChallengeLog)
+
+
+@admin.register(UserChallengeLog)
+class UserChallengeLogAdmin(ScaleModeAdmin):
+    list_display = ('user', 'challenge', 'status', 'date')
+    list_select_related = ('user', 'challenge')
+    raw_id_fields = ('user', 'challenge')
+    date_hierarchy = 'date'
+
+from .models import ActivityYear
+
+
+@admin.register(ActivityYear)
+class ActivityYearAdmin(ScaleModeAdmin):
+    list_display = ('user', 'year', 'days_active')
+    list_filter = ('year',)
+
+from .models import PointsTransaction
+
+
+@admin.register(PointsTransaction)
+class PointsTransactionAdmin(ScaleModeAdmin):
+    list_display = ('user', 'date', 'points', 'source', 'note')
+    list_filter = ('source',)
+    date_hierarchy = 'date'
+
+from .models import PlanTemplate
+
+admin.site.register(PlanTemplate)
@@ -0,0 +1,195 @@
+# tracker/async_views.py
+"""
+async def versions of the hot read endpoints, for ASGI deployments
+(settings.ASYNC_VIEWS). Same URLs, templates and JSON as the sync views in
+tracker.views; only the data access differs: async ORM calls, with
+independent queries started together via asyncio.gather.
+
+Also home of the live updates stream (SSE), which is ASGI-only.
+"""
+
+import asyncio
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from .live_updates import bus, format_event, leaderboard_snapshot, profile_snapshot
+from .models import (
+    CHALLENGE_SERIES_DAYS,
+    ChallengeMaster,
+    PointsTransaction,
+    SessionRecord,
+    UserChallengeSummary,
+    UserProfile,
+)
+from .views import (
+    _challenge_context,
+    challenge_for_day,
+    _progress_payload,
+    _nav_stats,
+    _progress_rows,
+    _report_cache_headers,
+    _report_not_modified,
+    _report_validators,
+    _saved_report_html,
+)
+
+# render() runs the user_stats context processor, which hits the ORM
+arender = sync_to_async(render)
+# cache lookup + render_to_string on a miss: both blocking
+asaved_report_html = sync_to_async(_saved_report_html)
+
+
+# ---------------- PROGRESS ----------------
+@login_required(login_url="login")
+async def progress_data(request):
+    user = await request.auser()
+    today = timezone.localdate()
+    rows = [row async for row in _progress_rows(user, today)]
+    return JsonResponse(_progress_payload(rows, today))
+
+
+# ---------------- STREAK / LEADERBOARD ----------------
+async def streak(request):
+    top_users = [
+        p async for p in (
+            UserProfile.objects
+            .select_related("user", "user__challenge_summary")
+            .filter(user__is_superuser=False)
+            .order_by("-streak", "-points")[:5]   # ✅ primary streak, secondary points
+        )
+    ]
+
+    return await arender(request, "tracker/rewards/streak.html", {
+        "top_users": top_users,
+        "series_days": CHALLENGE_SERIES_DAYS,
+    })
+
+
+# ---------------- POINTS HISTORY PAGE ----------------
+async def _list(qs):
+    return [obj async for obj in qs]
+
+
+@login_required(login_url="login")
+async def points(request):
+    user = await request.auser()
+
+    # ✅ history + profile are independent → run together
+    txns, profile = await asyncio.gather(
+        _list(PointsTransaction.objects.filter(user=user).order_by("-date")),
+        UserProfile.objects.aget(user=user),
+    )
+
+    return await arender(request, "tracker/rewards/points.html", {
+        "profile": profile,
+        "txns": txns,
+    })
+
+
+# ---------------- SESSION REPORT ----------------
+@login_required(login_url="login")
+async def session_report(request, day=None):
+    if day:
+        try:
+            selected_date = datetime.datetime.strptime(day, "%Y-%m-%d").date()
+        except ValueError:
+            return redirect("show_progress")
+    else:
+        selected_date = timezone.localdate()
+
+    user = await request.auser()
+    record = await SessionRecord.objects.filter(
+        user=user,
+        date=selected_date
+    ).afirst()
+
+    validators = None
+    if record is not None and record.date < timezone.localdate():
+        validators = _report_validators(record, await _nav_stats(user).afirst())
+    response = _report_not_modified(request, validators)
+    if response is None:
+        response = await arender(request, "tracker/session/session_report.html", {
+            "record": record,
+            "selected_date": selected_date,
+            "history": bool(day),
+            "saved_report": await asaved_report_html(record) if day and record else None,
+        })
+    return _report_cache_headers(response, validators)
+
+
+# ---------------- CHALLENGES ----------------
+async def _no_series():
+    return None
+
+
+async def challenges(request):
+    user = await request.auser()
+
+    # ✅ the 10-day catalogue and the user's series summary are independent
+    series_query = (
+        UserChallengeSummary.objects.filter(user=user).afirst()
+        if user.is_authenticated else _no_series()
+    )
+    catalogue, series = await asyncio.gather(
+        _list(ChallengeMaster.objects.order_by("day_number")),
+        series_query,
+    )
+
+    if not catalogue:
+        return await arender(request, "tracker/challenges/challenges.html", {
+            "challenge": None,
+            "today_date": timezone.localdate().strftime("%B %d, %Y"),
+            "is_guest": not user.is_authenticated,
+        })
+
+    today_challenge = challenge_for_day(catalogue, timezone.localdate())
+
+    return await arender(request, "tracker/challenges/challenges.html",
+                         _challenge_context(user, today_challenge, series))
+
+
+# ---------------- LIVE UPDATES (SSE) ----------------
+async def _event_stream(user):
+    sub = bus.subscribe(user.pk)
+    heartbeat = getattr(settings, "LIVE_UPDATES_HEARTBEAT_SECONDS", 15)
+    try:
+        # ✅ current state first, so the page is fresh even if nothing changes
+        profile, board = await asyncio.gather(
+            UserProfile.objects.aget(user=user),
+            sync_to_async(leaderboard_snapshot)(),
+        )
+        yield format_event("profile", profile_snapshot(profile))
+        yield format_event("leaderboard", board)
+
+        while True:
+            try:
+                event, data = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"   # keeps proxies from closing an idle stream
+                continue
+            yield format_event(event, data)
+    finally:
+        bus.unsubscribe(sub)
+
+
+@login_required(login_url="login")
+async def live_updates(request):
+    # a WSGI worker would buffer this never-ending stream → refuse instead
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"status": "error", "message": "Live updates need the ASGI server."},
+            status=501,
+        )
+
+    user = await request.auser()
+    response = StreamingHttpResponse(_event_stream(user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,34 @@
+"""
+Database routers.
+
+ReadReplicaRouter sends reads to the "replica" alias only while a request
+marked as read-heavy is being handled (see tracker.middleware.ReadReplicaMiddleware).
+Everything else, and every write, stays on "default".
+"""
+from contextvars import ContextVar
+
+REPLICA_ALIAS = "replica"
+
+# alias for reads in the current request; None = primary
+read_alias = ContextVar("read_alias", default=None)
+
+# sessions must always see the latest login/logout
+PRIMARY_ONLY_APPS = {"sessions"}
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica is a copy of the primary, so objects from either are compatible
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica receives the schema through the copy job
+        return db == "default"
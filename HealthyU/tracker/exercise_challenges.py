@@ -0,0 +1,61 @@
+"""
+Builds the per-user 10-day DailyExerciseChallenge series from the user's
+"Physical Exercise" plan items (day 1 -> first item, cycling through items).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+
+from .models import CHALLENGE_SERIES_DAYS, DailyExerciseChallenge, PlanItem
+
+
+def build_series(user_id, item_ids):
+    """Unsaved challenge rows for one user, cycling through the plan items."""
+    if not item_ids:
+        return []
+
+    return [
+        DailyExerciseChallenge(
+            user_id=user_id,
+            plan_item_id=item_ids[(day - 1) % len(item_ids)],
+            day_number=day,
+        )
+        for day in range(1, CHALLENGE_SERIES_DAYS + 1)
+    ]
+
+
+def physical_item_ids_by_user(user_ids):
+    """{user_id: [plan_item_id, ...]} for many users in one query."""
+    rows = (
+        PlanItem.objects
+        .filter(plan__user_id__in=user_ids, category="Physical Exercise")
+        .order_by("plan__user_id", "id")
+        .values_list("plan__user_id", "id")
+    )
+    items = defaultdict(list)
+    for user_id, item_id in rows:
+        items[user_id].append(item_id)
+    return items
+
+
+def generate_for_users(user_ids, batch_size=1000):
+    """
+    Create the missing series rows for the given users.
+    Existing (user, day_number) rows are left alone, so this is safe to re-run.
+    Returns the number of rows attempted, not created (conflicts are skipped).
+    """
+    items = physical_item_ids_by_user(user_ids)
+
+    rows = []
+    for user_id in user_ids:
+        rows.extend(build_series(user_id, items.get(user_id, [])))
+
+    with transaction.atomic():
+        DailyExerciseChallenge.objects.bulk_create(
+            rows, batch_size=batch_size, ignore_conflicts=True
+        )
+    return len(rows)
+
+
+def generate_for_user(user):
+    return generate_for_users([user.pk])
@@ -0,0 +1,218 @@
+"""
+Health analytics over PhysicalHealth (served by progress/health/).
+
+A user's whole history is loaded with one query into day-indexed arrays: a
+calendar from the first recorded day to today, with gaps marked missing.
+Prefix sums of the values and of the present-day counts turn every rolling
+mean into the difference of two prefix entries, so all metrics x windows
+(7/30/90 days) x the last SERIES_DAYS days come out of one vectorized step.
+Personal bests and the correlation of each metric with session completion
+(SessionRecord.progress) come from the same arrays.
+
+Days older than the compaction watermark (tracker/health_compaction.py)
+only exist as monthly PhysicalHealthSummary rows: their day masks and
+per-metric maxima still count towards days_recorded and the bests, so a
+compaction run doesn't change the payload.
+
+NumPy is optional: without it the same prefix-sum computation runs over
+plain lists. Results are cached per user per day; health imports and saved
+sessions drop the entry.
+"""
+import statistics
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import PhysicalHealth, PhysicalHealthSummary, SessionRecord
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+METRICS = ("steps", "calories", "sleep_hours")
+WINDOWS = (7, 30, 90)
+SERIES_DAYS = 90
+MIN_CORRELATION_DAYS = 3
+CACHE_SECONDS = 60 * 60 * 24
+
+
+def cache_key(user_id, day):
+    return f"health_analytics:{user_id}:{day.isoformat()}"
+
+
+def invalidate(user_id, day=None):
+    cache.delete(cache_key(user_id, day or timezone.localdate()))
+
+
+def load_series(user_id, today):
+    """[(date, steps, calories, sleep_hours)] oldest first, and {date: progress}."""
+    rows = list(
+        PhysicalHealth.objects
+        .filter(user_id=user_id, date__lte=today)
+        .order_by("date")
+        .values_list("date", *METRICS)
+    )
+    if not rows:
+        return rows, {}
+    completion = dict(
+        SessionRecord.objects
+        .filter(user_id=user_id, date__gte=rows[0][0], date__lte=today)
+        .values_list("date", "progress")
+    )
+    return rows, completion
+
+
+def load_compacted(user_id, today):
+    """
+    The compacted past from the monthly summaries: (set of days, {metric: (month start, max)}).
+    Each compacted day is in exactly one month summary.
+    """
+    days, bests = set(), {}
+    summaries = (
+        PhysicalHealthSummary.objects
+        .filter(user_id=user_id, period="month", period_start__lte=today)
+        .order_by("period_start")
+        .values_list("period_start", "day_mask", *(f"{m}_max" for m in METRICS))
+    )
+    for start, mask, *maxima in summaries:
+        days.update(start + timedelta(days=i) for i in range(mask.bit_length()) if mask >> i & 1)
+        for metric, value in zip(METRICS, maxima):
+            if metric not in bests or value > bests[metric][1]:
+                bests[metric] = (start, value)
+    return days, bests
+
+
+def _numpy_stats(rows, completion, n):
+    start = rows[0][0]
+    idx = np.fromiter(((row[0] - start).days for row in rows), dtype=np.int64, count=len(rows))
+    recorded = np.array([row[1:] for row in rows], dtype=float).T           # (metrics, rows)
+
+    values = np.zeros((len(METRICS), n))
+    values[:, idx] = recorded
+    present = np.zeros(n)
+    present[idx] = 1
+
+    sums = np.zeros((len(METRICS), n + 1))
+    sums[:, 1:] = np.cumsum(values, axis=1)
+    counts = np.concatenate(([0], np.cumsum(present)))
+
+    ends = np.arange(max(n - SERIES_DAYS, 0) + 1, n + 1)                    # (days,)
+    starts = np.maximum(ends - np.array(WINDOWS)[:, None], 0)               # (windows, days)
+    totals = sums[:, ends][:, None, :] - sums[:, starts]                    # (metrics, windows, days)
+    days = counts[ends] - counts[starts]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(days > 0, totals / days, np.nan)
+
+    best = recorded.argmax(axis=1)
+    bests = [(rows[i][0], rows[i][m + 1]) for m, i in enumerate(best.tolist())]
+
+    done = np.array([completion.get(row[0], 0) for row in rows], dtype=float) / 100
+    x = recorded - recorded.mean(axis=1, keepdims=True)
+    y = done - done.mean()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (x @ y) / np.sqrt((x ** 2).sum(axis=1) * (y ** 2).sum())
+    if len(rows) < MIN_CORRELATION_DAYS:
+        r[:] = np.nan
+
+    return ends.tolist(), means.tolist(), bests, r.tolist()
+
+
+def _window_mean(sums, counts, end, window):
+    begin = max(end - window, 0)
+    days = counts[end] - counts[begin]
+    return (sums[end] - sums[begin]) / days if days else None
+
+
+def _python_stats(rows, completion, n):
+    start = rows[0][0]
+    values = [[0.0] * n for _ in METRICS]
+    present = [0] * n
+    for row in rows:
+        i = (row[0] - start).days
+        present[i] = 1
+        for m in range(len(METRICS)):
+            values[m][i] = float(row[m + 1])
+
+    sums = [[0.0, *accumulate(series)] for series in values]
+    counts = [0, *accumulate(present)]
+
+    ends = list(range(max(n - SERIES_DAYS, 0) + 1, n + 1))
+    means = [[[_window_mean(s, counts, e, w) for e in ends] for w in WINDOWS] for s in sums]
+
+    bests, r = [], []
+    done = [completion.get(row[0], 0) / 100 for row in rows]
+    for m in range(len(METRICS)):
+        best = max(rows, key=lambda row: row[m + 1])
+        bests.append((best[0], best[m + 1]))
+        try:
+            if len(rows) < MIN_CORRELATION_DAYS:
+                raise statistics.StatisticsError
+            r.append(statistics.correlation([float(row[m + 1]) for row in rows], done))
+        except statistics.StatisticsError:   # too few days or a constant series
+            r.append(None)
+
+    return ends, means, bests, r
+
+
+def _clean(value, digits=1):
+    # NaN (numpy) and None (fallback) both mean "no data"
+    if value is None or value != value:
+        return None
+    return round(float(value), digits)
+
+
+def _best(day_best, month_best):
+    """Raw-day best (exact date), unless a compacted month beat it: then that month."""
+    if month_best is not None and (day_best is None or month_best[1] > day_best[1]):
+        day, value = month_best
+        return {"date": day.isoformat(), "period": "month", "value": value}
+    if day_best is not None:
+        day, value = day_best
+        return {"date": day.isoformat(), "period": "day", "value": value}
+    return None
+
+
+def compute(rows, completion, today, compacted=None):
+    """The progress/health/ payload from load_series() and load_compacted() output."""
+    compacted_days, compacted_bests = compacted or (set(), {})
+    payload = {
+        "as_of": today.isoformat(),
+        "engine": "numpy" if np is not None else "python",
+        "days_recorded": len(compacted_days.union(row[0] for row in rows)),
+        "latest": {metric: {f"{w}d": None for w in WINDOWS} for metric in METRICS},
+        "series": {"labels": [], **{metric: {f"{w}d": [] for w in WINDOWS} for metric in METRICS}},
+        "bests": {metric: _best(None, compacted_bests.get(metric)) for metric in METRICS},
+        "completion_correlation": {metric: None for metric in METRICS},
+    }
+    if not rows:
+        return payload
+
+    start = rows[0][0]
+    n = (today - start).days + 1
+    stats = _numpy_stats if np is not None else _python_stats
+    ends, means, bests, correlations = stats(rows, completion, n)
+
+    payload["series"]["labels"] = [(start + timedelta(days=e - 1)).isoformat() for e in ends]
+    for m, metric in enumerate(METRICS):
+        digits = 2 if metric == "sleep_hours" else 1
+        for w, window in enumerate(WINDOWS):
+            series = [_clean(v, digits) for v in means[m][w]]
+            payload["series"][metric][f"{window}d"] = series
+            payload["latest"][metric][f"{window}d"] = series[-1]
+        payload["bests"][metric] = _best(bests[m], compacted_bests.get(metric))
+        payload["completion_correlation"][metric] = _clean(correlations[m], 3)
+    return payload
+
+
+def for_user(user_id, today=None):
+    today = today or timezone.localdate()
+    key = cache_key(user_id, today)
+    payload = cache.get(key)
+    if payload is None:
+        rows, completion = load_series(user_id, today)
+        payload = compute(rows, completion, today, load_compacted(user_id, today))
+        cache.set(key, payload, CACHE_SECONDS)
+    return payload
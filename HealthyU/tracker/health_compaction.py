@@ -0,0 +1,176 @@
+"""
+Retention for PhysicalHealth: raw days older than the horizon are rolled into
+weekly and monthly PhysicalHealthSummary rows, then deleted.
+
+The watermark (CompactionWatermark "physicalhealth") is the first day kept
+raw. It only moves forward, to the first of the month containing
+today - settings.HEALTH_RAW_RETENTION_DAYS. A run compacts the raw rows left
+below it, which is only what arrived since the previous run: days the
+horizon moved past, plus late imports of old days. Summaries hold totals and
+a per-day bit mask, so adding to them is incremental and a day is never
+counted twice.
+
+health_history() reads across the boundary: raw days where they exist,
+summaries for the compacted past.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import CompactionWatermark, PhysicalHealth, PhysicalHealthSummary
+from .write_queue import writer
+
+WATERMARK_NAME = "physicalhealth"
+PERIODS = ("week", "month")
+METRICS = ("steps", "calories", "sleep_hours")
+SUMMARY_FIELDS = [
+    "day_mask", "days",
+    *(f"{m}_total" for m in METRICS),
+    *(f"{m}_max" for m in METRICS),
+]
+
+
+def period_start(day, period):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def watermark():
+    """First day still stored raw (None before the first run)."""
+    return (
+        CompactionWatermark.objects
+        .filter(name=WATERMARK_NAME)
+        .values_list("compacted_before", flat=True)
+        .first()
+    )
+
+
+def target_watermark(today, retention_days):
+    return period_start(today - timedelta(days=retention_days), "month")
+
+
+def _add_day(summary, row):
+    bit = 1 << (row.date - summary.period_start).days
+    if summary.day_mask & bit:
+        return False
+    summary.day_mask |= bit
+    summary.days += 1
+    for metric in METRICS:
+        value = getattr(row, metric)
+        setattr(summary, f"{metric}_total", getattr(summary, f"{metric}_total") + value)
+        setattr(summary, f"{metric}_max", max(getattr(summary, f"{metric}_max"), value))
+    return True
+
+
+def _compact_batch(boundary, batch_size):
+    """Write unit: fold up to batch_size raw rows dated before boundary. (rows, skipped)"""
+    rows = list(
+        PhysicalHealth.objects
+        .filter(date__lt=boundary)
+        .order_by("user_id", "date")
+        .only("id", "user_id", "date", *METRICS)[:batch_size]
+    )
+    if not rows:
+        return 0, 0
+
+    keys = {(row.user_id, p, period_start(row.date, p)) for row in rows for p in PERIODS}
+    summaries = {
+        (s.user_id, s.period, s.period_start): s
+        for s in PhysicalHealthSummary.objects.select_for_update().filter(
+            user_id__in={key[0] for key in keys},
+            period_start__gte=min(key[2] for key in keys),
+            period_start__lte=max(key[2] for key in keys),
+        )
+    }
+    existing = set(summaries)
+
+    skipped = 0
+    for row in rows:
+        added = False
+        for period in PERIODS:
+            key = (row.user_id, period, period_start(row.date, period))
+            if key not in summaries:
+                summaries[key] = PhysicalHealthSummary(
+                    user_id=row.user_id, period=period, period_start=key[2]
+                )
+            added |= _add_day(summaries[key], row)
+        # already counted in every period (re-import of a compacted day): the first value stays
+        skipped += not added
+
+    PhysicalHealthSummary.objects.bulk_create(
+        [s for key, s in summaries.items() if key not in existing]
+    )
+    PhysicalHealthSummary.objects.bulk_update(
+        [summaries[key] for key in existing & keys], SUMMARY_FIELDS
+    )
+    PhysicalHealth.objects.filter(id__in=[row.id for row in rows]).delete()
+    return len(rows), skipped
+
+
+def compact(today=None, retention_days=None, batch_size=5000):
+    """Yields (rows, skipped) per batch, then moves the watermark forward."""
+    today = today or timezone.localdate()
+    if retention_days is None:
+        retention_days = settings.HEALTH_RAW_RETENTION_DAYS
+
+    current = watermark()
+    boundary = target_watermark(today, retention_days)
+    if current is not None:
+        boundary = max(boundary, current)
+
+    while True:
+        rows, skipped = writer.submit(_compact_batch, boundary, batch_size)
+        if not rows:
+            break
+        yield rows, skipped
+
+    if boundary != current:
+        CompactionWatermark.objects.update_or_create(
+            name=WATERMARK_NAME, defaults={"compacted_before": boundary}
+        )
+
+
+def _point(start, period, days, steps, calories, sleep_hours):
+    return {
+        "start": start.isoformat(),
+        "period": period,
+        "days": days,
+        "steps": round(steps / days, 1),
+        "calories": round(calories / days, 1),
+        "sleep_hours": round(sleep_hours / days, 2),
+    }
+
+
+def health_history(user_id, start, end, period="week"):
+    """
+    Daily averages for [start, end], oldest first: one point per raw day, and
+    one per `period` summary for the compacted range before the watermark.
+    """
+    points = []
+    boundary = watermark()
+    if boundary is not None and start < boundary:
+        summaries = PhysicalHealthSummary.objects.filter(
+            user_id=user_id,
+            period=period,
+            period_start__gte=period_start(start, period),
+            period_start__lte=min(end, boundary - timedelta(days=1)),
+        ).order_by("period_start")
+        for s in summaries:
+            points.append(_point(
+                s.period_start, period, s.days,
+                s.steps_total, s.calories_total, s.sleep_hours_total,
+            ))
+
+    rows = (
+        PhysicalHealth.objects
+        .filter(user_id=user_id, date__gte=start, date__lte=end)
+        .order_by("date")
+        .values_list("date", *METRICS)
+    )
+    for day, steps, calories, sleep_hours in rows:
+        points.append(_point(day, "day", 1, steps, calories, sleep_hours))
+
+    points.sort(key=lambda p: p["start"])
+    return points
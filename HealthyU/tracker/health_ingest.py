@@ -0,0 +1,147 @@
+"""
+Streaming import of wearable exports into PhysicalHealth.
+
+Accepts CSV (header: date, steps, calories, sleep_hours) or NDJSON (one
+object per line with the same keys). Input is read line by line and written
+in batches of upserts on (user, date), so memory stays bounded by the batch
+size however many years the file covers, and re-importing an overlapping
+export just overwrites those days.
+
+Each batch is one unit on the write queue (tracker/write_queue.py); an
+import that fails halfway keeps the batches already written, and running it
+again is safe.
+"""
+import csv
+import datetime
+import json
+
+from django.utils import timezone
+
+from . import health_analytics
+from .models import PhysicalHealth
+from .write_queue import writer
+
+FORMATS = ("csv", "ndjson")
+FIELDS = ("date", "steps", "calories", "sleep_hours")
+UPDATE_FIELDS = ["steps", "calories", "sleep_hours"]
+
+# (min, max) accepted per day
+LIMITS = {
+    "steps": (0, 200_000),
+    "calories": (0, 20_000),
+    "sleep_hours": (0, 24),
+}
+MAX_ERRORS = 20   # error messages kept in the result
+
+
+def detect_format(name="", content_type=""):
+    """csv / ndjson from a file name or Content-Type; None if neither says."""
+    name = name.lower().removesuffix(".gz")
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type:
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    return None
+
+
+def _text_lines(stream):
+    # request bodies and uploads iterate as bytes lines; the BOM is Excel's doing
+    for i, line in enumerate(stream):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8-sig" if i == 0 else "utf-8")
+        yield line
+
+
+def iter_records(stream, fmt):
+    """Yields (line_number, raw dict) without reading the stream ahead."""
+    lines = _text_lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for raw in reader:
+            yield reader.line_num, raw
+        return
+
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            raw = json.loads(line)
+        except ValueError:
+            raw = None
+        yield line_no, raw
+
+
+def clean_record(raw, today=None):
+    """(date, steps, calories, sleep_hours); ValueError says what is wrong."""
+    if not isinstance(raw, dict):
+        raise ValueError("not a JSON object")
+    missing = [f for f in FIELDS if raw.get(f) in (None, "")]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    try:
+        # "2024-03-01" or a timestamp starting with the date
+        day = datetime.date.fromisoformat(str(raw["date"]).strip()[:10])
+    except ValueError:
+        raise ValueError(f"bad date {raw['date']!r}")
+    if day > (today or timezone.localdate()):
+        raise ValueError(f"date {day} is in the future")
+
+    values = []
+    for field, cast in (("steps", int), ("calories", int), ("sleep_hours", float)):
+        try:
+            # exports often write counts as "8042.0"
+            value = cast(float(raw[field]))
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"bad {field} {raw[field]!r}")
+        low, high = LIMITS[field]
+        if not low <= value <= high:
+            raise ValueError(f"{field} {value} outside {low}-{high}")
+        values.append(value)
+
+    return (day, *values)
+
+
+def _upsert_batch(rows):
+    PhysicalHealth.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=UPDATE_FIELDS,
+    )
+    return len(rows)
+
+
+def ingest(user_id, stream, fmt, batch_size=1000):
+    """
+    Upsert every valid record of the stream for one user.
+    Returns {"rows", "upserted", "invalid", "errors"}; raises WriteQueueFull
+    if the write queue stays full.
+    """
+    result = {"rows": 0, "upserted": 0, "invalid": 0, "errors": []}
+    batch = {}   # date -> row: the last line for a day wins
+    today = timezone.localdate()
+
+    for line_no, raw in iter_records(stream, fmt):
+        result["rows"] += 1
+        try:
+            day, steps, calories, sleep_hours = clean_record(raw, today)
+        except ValueError as e:
+            result["invalid"] += 1
+            if len(result["errors"]) < MAX_ERRORS:
+                result["errors"].append(f"line {line_no}: {e}")
+            continue
+
+        batch[day] = PhysicalHealth(
+            user_id=user_id, date=day, steps=steps, calories=calories, sleep_hours=sleep_hours,
+        )
+        if len(batch) >= batch_size:
+            result["upserted"] += writer.submit(_upsert_batch, list(batch.values()))
+            batch = {}
+
+    if batch:
+        result["upserted"] += writer.submit(_upsert_batch, list(batch.values()))
+    if result["upserted"]:
+        health_analytics.invalidate(user_id)
+    return result
@@ -0,0 +1,130 @@
+"""
+In-process pub/sub bus behind the live updates stream (SSE, /live/).
+
+Write units (submit_session, complete_challenge) call notify_profile_change();
+once their transaction commits, the user's own points/streak go to that user's
+connections, and the top-5 leaderboard is broadcast if the ranking changed.
+
+Each connection has a small bounded queue. Events are state snapshots, so a
+slow client that falls behind loses its oldest events rather than holding
+memory or blocking the publisher. The bus only reaches clients connected to
+the same process.
+"""
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import UserProfile
+
+LEADERBOARD_SIZE = 5
+
+
+class Subscription:
+    def __init__(self, user_id, loop, maxsize):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event):
+        """Runs on the subscriber's event loop; drops the oldest event when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class LiveBus:
+    def __init__(self):
+        self._subs = set()
+        self._lock = threading.Lock()
+        self._leaderboard = None
+
+    def subscribe(self, user_id):
+        """Register a connection; must be called from its event loop."""
+        sub = Subscription(
+            user_id,
+            asyncio.get_running_loop(),
+            getattr(settings, "LIVE_UPDATES_QUEUE_SIZE", 32),
+        )
+        with self._lock:
+            self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs.discard(sub)
+
+    def has_subscribers(self):
+        return bool(self._subs)
+
+    def publish(self, event, data, user_id=None):
+        """Thread-safe. user_id=None broadcasts to every connection."""
+        with self._lock:
+            targets = [s for s in self._subs if user_id is None or s.user_id == user_id]
+
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, (event, data))
+            except RuntimeError:
+                # loop already closed → connection is gone
+                self.unsubscribe(sub)
+
+    def publish_leaderboard(self):
+        """Broadcast the leaderboard if it differs from the last one sent."""
+        board = leaderboard_snapshot()
+        if board == self._leaderboard:
+            return
+        self._leaderboard = board
+        self.publish("leaderboard", board)
+
+
+bus = LiveBus()
+
+
+def leaderboard_snapshot():
+    """
+    Same ranking as the streak page. Broadcast to every subscriber, so only
+    public fields: no names, emails or ids.
+    """
+    rows = (
+        UserProfile.objects
+        .filter(user__is_superuser=False)
+        .order_by("-streak", "-points")
+        .values("user__username", "streak", "points")[:LEADERBOARD_SIZE]
+    )
+    return [
+        {
+            "rank": rank,
+            "username": row["user__username"],
+            "streak": row["streak"],
+            "points": row["points"],
+        }
+        for rank, row in enumerate(rows, start=1)
+    ]
+
+
+def profile_snapshot(profile):
+    return {"points": profile.points, "streak": profile.streak}
+
+
+def notify_profile_change(profile):
+    """Call inside a write unit; publishes after the transaction commits."""
+    if not bus.has_subscribers():
+        return
+
+    user_id = profile.user_id
+    data = profile_snapshot(profile)
+
+    def publish():
+        bus.publish("profile", data, user_id=user_id)
+        bus.publish_leaderboard()
+
+    transaction.on_commit(publish)
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
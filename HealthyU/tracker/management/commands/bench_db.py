@@ -0,0 +1,125 @@
+import json
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client
+
+from tracker.models import ExercisePlan, PlanItem, UserProfile
+from tracker.write_queue import writer
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrent submit_session writes alongside progress_data reads. "
+        "Run once per HEALTHYU_DB_PROFILE on a fresh HEALTHYU_DB_PATH to compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writes-per-writer", type=int, default=10)
+        parser.add_argument("--reads-per-reader", type=int, default=50)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        n_writers = options["writers"]
+        n_writes = options["writes_per_writer"]
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        self.stdout.write(f"journal_mode={journal_mode}")
+
+        # one user per write: submit_session only accepts one session per day
+        users = self._make_users(f"bench-{tag}", n_writers * n_writes + options["readers"])
+        writer_users = users[:n_writers * n_writes]
+        reader_users = users[n_writers * n_writes:]
+
+        report = {"physical": [{"name": "Push Ups", "status": "completed"}], "yoga": []}
+        body = json.dumps({"report": report})
+
+        results = {"write": [], "read": []}
+        errors = {"write": 0, "read": 0}
+        lock = threading.Lock()
+        start = threading.Barrier(n_writers + len(reader_users))
+
+        def timed(kind, call):
+            t0 = time.perf_counter()
+            try:
+                ok = call().status_code == 200
+            except OperationalError:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            with lock:
+                if ok:
+                    results[kind].append(elapsed)
+                else:
+                    errors[kind] += 1
+
+        def write_worker(chunk):
+            clients = [self._client(u) for u in chunk]
+            start.wait()
+            for client in clients:
+                timed("write", lambda: client.post(
+                    "/submit-session/", body, content_type="application/json"
+                ))
+            connection.close()
+
+        def read_worker(user):
+            client = self._client(user)
+            start.wait()
+            for _ in range(options["reads_per_reader"]):
+                timed("read", lambda: client.get("/progress/data/"))
+            connection.close()
+
+        threads = [
+            threading.Thread(target=write_worker, args=(writer_users[i::n_writers],))
+            for i in range(n_writers)
+        ] + [threading.Thread(target=read_worker, args=(u,)) for u in reader_users]
+
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+
+        for kind in ("write", "read"):
+            lat = sorted(results[kind])
+            if lat:
+                p95 = lat[int(len(lat) * 0.95) - 1] if len(lat) > 1 else lat[0]
+                self.stdout.write(
+                    f"{kind}: {len(lat)} ok, {errors[kind]} errors, "
+                    f"p50 {statistics.median(lat) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+                )
+            else:
+                self.stdout.write(f"{kind}: 0 ok, {errors[kind]} errors")
+        self.stdout.write(f"wall time {wall:.2f}s")
+        if writer.enabled:
+            self.stdout.write(f"write queue: {writer.metrics()}")
+
+        User.objects.filter(username__startswith=f"bench-{tag}").delete()
+
+    def _make_users(self, prefix, count):
+        User.objects.bulk_create([User(username=f"{prefix}-{i}") for i in range(count)])
+        users = list(User.objects.filter(username__startswith=prefix).order_by("pk"))
+
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=u) for u in users], ignore_conflicts=True
+        )
+        plans = ExercisePlan.objects.bulk_create([ExercisePlan(user=u) for u in users])
+        PlanItem.objects.bulk_create([
+            PlanItem(plan=p, name="Push Ups", category="Physical Exercise", value=1, unit="freq")
+            for p in plans
+        ])
+        return users
+
+    def _client(self, user):
+        client = Client(HTTP_HOST="localhost")
+        client.force_login(user)
+        return client
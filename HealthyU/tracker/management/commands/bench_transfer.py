@@ -0,0 +1,67 @@
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from tracker.models import UserProfile
+
+PUBLIC_PATHS = ["/", "/workout-plans/", "/yoga/surya-namaskar/", "/challenges/"]
+USER_PATHS = ["/create-plan/", "/progress/", "/progress/data/"]
+ASSETS = [
+    "tracker/css/base.css",
+    "tracker/css/navbar.css",
+    "tracker/js/navbar.js",
+    "tracker/js/pages/plan/create_plan.js",
+]
+
+ENCODINGS = {"identity": "identity", "gzip": "gzip", "br+gzip": "br, gzip"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Response size and latency per Accept-Encoding for public pages, "
+        "logged-in pages and static assets. Run with HEALTHYU_STATIC_MANIFEST=1 "
+        "after collectstatic to measure the precompressed, hashed assets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(f"bench-{uuid.uuid4().hex[:8]}")
+        UserProfile.objects.get_or_create(user=user)
+        try:
+            anon = Client(HTTP_HOST="localhost")
+            member = Client(HTTP_HOST="localhost")
+            member.force_login(user)
+
+            rows = [(path, anon) for path in PUBLIC_PATHS]
+            rows += [(path, member) for path in USER_PATHS]
+            rows += [(staticfiles_storage.url(name), anon) for name in ASSETS]
+
+            self.stdout.write(
+                f"{'path':<55} {'encoding':<9} {'status':>6} {'bytes':>9} {'p50 ms':>8}"
+            )
+            for path, client in rows:
+                for label, accept in ENCODINGS.items():
+                    self._measure(client, path, label, accept, options["repeat"])
+        finally:
+            user.delete()
+
+    def _measure(self, client, path, label, accept, repeat):
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            response = client.get(path, HTTP_ACCEPT_ENCODING=accept)
+            body = b"".join(response) if response.streaming else response.content
+            timings.append(time.perf_counter() - t0)
+
+        encoding = response.get("Content-Encoding", "-")
+        self.stdout.write(
+            f"{path[:55]:<55} {label:<9} {response.status_code:>6} "
+            f"{len(body):>9} {statistics.median(timings) * 1000:>8.2f}  ({encoding})"
+        )
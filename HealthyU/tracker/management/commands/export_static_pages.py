@@ -0,0 +1,93 @@
+import hashlib
+import re
+import shutil
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from tracker.views import MEDITATION_DATA, PLAN_TEMPLATE_PAGES, WORKOUT_DATA, YOGA_DATA
+
+
+def catalog_paths():
+    """Every public page that is a pure function of the catalog dicts."""
+    paths = [reverse("workout_plans")]
+    paths += [reverse("yoga_detail", args=[slug]) for slug in YOGA_DATA]
+    paths += [reverse("meditation_detail", args=[slug]) for slug in MEDITATION_DATA]
+    paths += [reverse("workout_detail", args=[slug]) for slug in WORKOUT_DATA]
+    paths += [
+        reverse(f"{slug.replace('-', '_')}_plan") for slug in PLAN_TEMPLATE_PAGES
+    ]
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render the catalog pages (yoga / meditation / workout details, "
+        "workout plans, plan templates) to <STATIC_EXPORT_ROOT>/<path>/index.html. "
+        "With HEALTHYU_SERVE_STATIC_EXPORT=1 StaticExportMiddleware serves them to "
+        "anonymous visitors; a front-end server can serve them directly to "
+        "requests without a sessionid cookie. "
+        "Re-run after changing the catalog data or templates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clean", action="store_true",
+                            help="Delete the previous export first.")
+
+    def handle(self, *args, **options):
+        root = getattr(settings, "STATIC_EXPORT_ROOT", None)
+        if not root:
+            raise CommandError("STATIC_EXPORT_ROOT is not set.")
+        root = Path(root)
+
+        if options["clean"] and root.exists():
+            shutil.rmtree(root)
+
+        factory = RequestFactory()
+        hashed = isinstance(staticfiles_storage, ManifestFilesMixin)
+
+        for path in catalog_paths():
+            request = factory.get(path)
+            request.user = AnonymousUser()
+
+            match = resolve(path)
+            response = match.func(request, *match.args, **match.kwargs)
+            if response.status_code != 200:
+                raise CommandError(f"{path} rendered {response.status_code}")
+
+            html = response.content.decode()
+            if not hashed:
+                html = self._version_static_links(html)
+
+            target = root / path.strip("/") / "index.html"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(html, encoding="utf-8")
+            self.stdout.write(f"{path} -> {target}")
+
+        self.stdout.write(self.style.SUCCESS(f"Exported {len(catalog_paths())} pages to {root}"))
+
+    def _version_static_links(self, html):
+        # no manifest storage → append the file's content hash as ?v=, so the
+        # exported pages can still be cached far into the future
+        prefix = settings.STATIC_URL if settings.STATIC_URL.startswith("/") else f"/{settings.STATIC_URL}"
+        pattern = re.compile(r'(["\'])' + re.escape(prefix) + r'([^"\'?#]+)\1')
+        digests = {}
+
+        def replace(m):
+            name = m.group(2)
+            if name not in digests:
+                found = finders.find(name)
+                digests[name] = (
+                    hashlib.md5(Path(found).read_bytes()).hexdigest()[:12] if found else None
+                )
+            if digests[name] is None:
+                return m.group(0)
+            return f"{m.group(1)}{prefix}{name}?v={digests[name]}{m.group(1)}"
+
+        return pattern.sub(replace, html)
@@ -0,0 +1,59 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from tracker.exercise_challenges import generate_for_users
+from tracker.models import CHALLENGE_SERIES_DAYS, DailyExerciseChallenge
+
+
+class Command(BaseCommand):
+    help = "Backfill the 10-day DailyExerciseChallenge series for every user with a plan."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Users per batch (default 500).")
+        parser.add_argument("--after-id", type=int, default=0,
+                            help="Resume after this user id (printed in the progress output).")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        # ✅ users that still miss days; finished users drop out, so a re-run resumes
+        pending = (
+            User.objects
+            .filter(exerciseplan__items__category="Physical Exercise")
+            .annotate(series_days=Count("exercise_challenges", distinct=True))
+            .filter(Q(series_days__lt=CHALLENGE_SERIES_DAYS), pk__gt=options["after_id"])
+            .order_by("pk")
+            .values_list("pk", flat=True)
+            .distinct()
+        )
+
+        total = pending.count()
+        self.stdout.write(f"{total} users need a challenge series.")
+
+        started = time.monotonic()
+        done = rows = 0
+        last_id = options["after_id"]
+
+        while True:
+            user_ids = list(pending.filter(pk__gt=last_id)[:batch_size])
+            if not user_ids:
+                break
+
+            # ✅ bulk_create(ignore_conflicts) returns attempted rows: count what was created
+            series = DailyExerciseChallenge.objects.filter(user_id__in=user_ids)
+            before = series.count()
+            generate_for_users(user_ids)
+            rows += series.count() - before
+            done += len(user_ids)
+            last_id = user_ids[-1]
+
+            self.stdout.write(
+                f"{done}/{total} users, {rows} rows created "
+                f"({time.monotonic() - started:.1f}s, resume with --after-id {last_id})"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {done} users, {rows} rows created."))
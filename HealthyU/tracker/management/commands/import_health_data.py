@@ -0,0 +1,48 @@
+import gzip
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.health_ingest import FORMATS, detect_format, ingest
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a wearable export (CSV or NDJSON, optionally .gz) into "
+        "PhysicalHealth for one user, upserting per (user, date)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Username or user id.")
+        parser.add_argument("--format", choices=FORMATS,
+                            help="Default: from the file extension.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        if fmt is None:
+            raise CommandError("Cannot tell the format from the file name; pass --format.")
+
+        name = options["user"]
+        lookup = {"pk": int(name)} if name.isdigit() else {"username": name}
+        user = User.objects.filter(**lookup).first()
+        if user is None:
+            raise CommandError(f"Unknown user: {name}")
+
+        opener = gzip.open if path.endswith(".gz") else open
+        started = time.monotonic()
+        try:
+            with opener(path, "rb") as f:
+                result = ingest(user.pk, f, fmt, batch_size=options["batch_size"])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result["errors"]:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} rows read, {result['upserted']} days upserted, "
+            f"{result['invalid']} invalid in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,48 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.plan_templates import PLAN_TEMPLATES, get_template
+from tracker.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create users (and profiles) from a CSV with columns "
+        "email, first_name, last_name, password (password optional)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_path")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Password hashing processes (default: CPU count, 1 = no pool).")
+        parser.add_argument("--template", choices=sorted(PLAN_TEMPLATES),
+                            help="Give every new user this plan template.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_path"], newline="", encoding="utf-8") as f:
+                rows = [row for row in csv.DictReader(f) if row.get("email")]
+        except OSError as e:
+            raise CommandError(str(e))
+
+        template = get_template(options["template"]) if options["template"] else None
+
+        started = time.monotonic()
+        created = skipped = 0
+        for batch_created, batch_skipped in provision_users(
+            rows,
+            batch_size=options["batch_size"],
+            template=template,
+            workers=options["workers"],
+        ):
+            created += batch_created
+            skipped += batch_skipped
+            self.stdout.write(
+                f"{created + skipped}/{len(rows)} rows "
+                f"({created} created, {skipped} skipped, {time.monotonic() - started:.1f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {created} users created, {skipped} skipped."))
@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tracker.models import PointsTransaction, SessionRecord
+from tracker.sharding import shard_aliases, shard_for
+
+
+class Command(BaseCommand):
+    help = (
+        "Move SessionRecord / PointsTransaction rows of each user to the shard "
+        "their user id hashes to (after enabling sharding or changing HEALTHYU_SHARDS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--source", action="append", dest="sources",
+                            help="Alias to drain (repeatable). Default: default + all shards.")
+
+    def handle(self, *args, **options):
+        if not shard_aliases():
+            raise CommandError("Sharding is off (set HEALTHYU_SHARDS).")
+
+        sources = options["sources"] or ["default", *shard_aliases()]
+        started = time.monotonic()
+        moved_users = moved_rows = 0
+
+        for source in sources:
+            for model in (SessionRecord, PointsTransaction):
+                user_ids = (
+                    model.objects.using(source)
+                    .order_by()
+                    .values_list("user_id", flat=True)
+                    .distinct()
+                )
+                for user_id in list(user_ids):
+                    target = shard_for(user_id)
+                    if target == source:
+                        continue
+
+                    if options["dry_run"]:
+                        count = model.objects.using(source).filter(user_id=user_id).count()
+                    else:
+                        count = self._move(model, user_id, source, target)
+
+                    moved_users += 1
+                    moved_rows += count
+                    self.stdout.write(
+                        f"{model.__name__} user {user_id}: {count} rows {source} -> {target}"
+                    )
+
+        verb = "Would move" if options["dry_run"] else "Moved"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {moved_rows} rows for {moved_users} user/table pairs "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
+
+    def _move(self, model, user_id, source, target):
+        rows = list(model.objects.using(source).filter(user_id=user_id))
+
+        # bulk_create re-stamps auto_now(_add) fields; keep the original times
+        stamp_fields = [
+            f.name for f in model._meta.concrete_fields
+            if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+        ]
+        stamps = [[getattr(row, name) for name in stamp_fields] for row in rows]
+
+        for row in rows:
+            row.pk = None  # ids are per-database
+
+        with transaction.atomic(using=target), transaction.atomic(using=source):
+            model.objects.using(target).bulk_create(rows, batch_size=500)
+            if stamp_fields:
+                for row, values in zip(rows, stamps):
+                    for name, value in zip(stamp_fields, values):
+                        setattr(row, name, value)
+                model.objects.using(target).bulk_update(rows, stamp_fields, batch_size=500)
+            model.objects.using(source).filter(user_id=user_id).delete()
+        return len(rows)
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracker.activity_calendar import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every user's per-year activity calendar rows (ActivityYear) "
+        "from SessionRecord (run once after migrating, and after data fixes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        users = rows = 0
+        for batch_users, batch_rows in rebuild(batch_size=options["batch_size"]):
+            users += batch_users
+            rows += batch_rows
+            self.stdout.write(f"{users} users, {rows} rows ({time.monotonic() - started:.1f}s)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Activity calendar rebuilt: {rows} rows for {users} users in "
+            f"{time.monotonic() - started:.2f}s."
+        ))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tracker.streaks import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute current and longest streaks for every user from SessionRecord "
+        "dates (run once after adding longest_streak, and after data fixes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        done = changed = 0
+        for batch_users, batch_changed in rebuild(batch_size=options["batch_size"]):
+            done += batch_users
+            changed += batch_changed
+            self.stdout.write(
+                f"{done} users, {changed} changed ({time.monotonic() - started:.1f}s)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Streaks rebuilt: {changed} of {done} profiles changed in "
+            f"{time.monotonic() - started:.2f}s."
+        ))
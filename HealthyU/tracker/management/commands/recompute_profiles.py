@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.recompute import JOBS, run
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild derived data for some or all users: points from the "
+        "PointsTransaction ledger, streaks from SessionRecord dates, "
+        "SessionRecord.progress from the stored reports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("users", nargs="*", help="Usernames or user ids.")
+        parser.add_argument("--all", action="store_true", help="Every user.")
+        parser.add_argument("--job", action="append", dest="jobs", choices=JOBS,
+                            help="Repeatable. Default: all jobs.")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            user_ids = list(User.objects.values_list("pk", flat=True))
+        elif options["users"]:
+            user_ids = self._resolve(options["users"])
+        else:
+            raise CommandError("Name some users or pass --all.")
+
+        for job in options["jobs"] or JOBS:
+            started = time.monotonic()
+            done = changed = 0
+            for chunk_users, chunk_changed in run(job, user_ids, options["chunk_size"]):
+                done += chunk_users
+                changed += chunk_changed
+                self.stdout.write(
+                    f"{job}: {done}/{len(user_ids)} users, {changed} changed "
+                    f"({time.monotonic() - started:.1f}s)"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"{job}: {changed} changed for {done} users in {time.monotonic() - started:.2f}s."
+            ))
+
+    def _resolve(self, names):
+        ids = {int(name) for name in names if name.isdigit()}
+        usernames = [name for name in names if not name.isdigit()]
+        found = dict(User.objects.filter(username__in=usernames).values_list("username", "pk"))
+        missing = sorted(set(usernames) - set(found))
+        if missing:
+            raise CommandError(f"Unknown users: {', '.join(missing)}")
+        return sorted(ids | set(found.values()))
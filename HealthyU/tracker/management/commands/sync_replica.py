@@ -0,0 +1,42 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.db_routers import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database onto the read replica (online backup)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=0,
+                            help="Repeat every N seconds (0 = copy once).")
+
+    def handle(self, *args, **options):
+        if REPLICA_ALIAS not in settings.DATABASES:
+            raise CommandError("No replica configured (set HEALTHYU_REPLICA_DB_PATH).")
+
+        primary = str(settings.DATABASES["default"]["NAME"])
+        replica = str(settings.DATABASES[REPLICA_ALIAS]["NAME"])
+
+        while True:
+            started = time.monotonic()
+            self._copy(primary, replica)
+            self.stdout.write(f"replica synced in {(time.monotonic() - started) * 1000:.0f} ms")
+
+            if not options["interval"]:
+                break
+            time.sleep(options["interval"])
+
+    def _copy(self, primary, replica):
+        # sqlite's backup API gives a consistent snapshot while the primary is in use
+        src = sqlite3.connect(primary)
+        dst = sqlite3.connect(replica)
+        try:
+            with dst:
+                src.backup(dst, pages=1024)
+        finally:
+            dst.close()
+            src.close()
@@ -0,0 +1,359 @@
+import asyncio
+import mimetypes
+import time
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.gzip import GZipMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from . import page_cache
+from .db_routers import REPLICA_ALIAS, read_alias
+from .sharding import current_shard, shard_for, sharding_enabled
+
+STICKY_COOKIE = "hu_primary"
+
+
+class ReadReplicaMiddleware:
+    """
+    Routes reads of read-heavy endpoints (settings.READ_REPLICA_URL_NAMES and
+    admin changelists) to the replica. After a write (any unsafe method) the
+    client is pinned to the primary for READ_REPLICA_STICKY_SECONDS, so users
+    always read their own writes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.url_names = set(getattr(settings, "READ_REPLICA_URL_NAMES", ()))
+        self.sticky_seconds = getattr(settings, "READ_REPLICA_STICKY_SECONDS", 10)
+        self.enabled = REPLICA_ALIAS in settings.DATABASES
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = None
+        if self.enabled and self._use_replica(request):
+            token = read_alias.set(REPLICA_ALIAS)
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                read_alias.reset(token)
+        return self._stick(request, response)
+
+    async def __acall__(self, request):
+        token = None
+        if self.enabled and self._use_replica(request):
+            token = read_alias.set(REPLICA_ALIAS)
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                read_alias.reset(token)
+        return self._stick(request, response)
+
+    def _stick(self, request, response):
+        if self.enabled and request.method not in ("GET", "HEAD", "OPTIONS"):
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time()) + self.sticky_seconds),
+                max_age=self.sticky_seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def _use_replica(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if STICKY_COOKIE in request.COOKIES:
+            return False
+
+        # resolver_match is only set later, inside get_response
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+
+        if match.app_name == "admin" and (match.url_name or "").endswith("_changelist"):
+            return True
+        return match.url_name in self.url_names
+
+
+class ShardMiddleware:
+    """
+    Puts the logged-in user's shard in tracker.sharding.current_shard for the
+    request, so SessionRecord / PointsTransaction queries filtered by
+    request.user reach the right database. Must come after AuthenticationMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not sharding_enabled() or not request.user.is_authenticated:
+            return self.get_response(request)
+
+        token = current_shard.set(shard_for(request.user.pk))
+        try:
+            return self.get_response(request)
+        finally:
+            current_shard.reset(token)
+
+    async def __acall__(self, request):
+        if not sharding_enabled():
+            return await self.get_response(request)
+
+        user = await request.auser()
+        if not user.is_authenticated:
+            return await self.get_response(request)
+
+        token = current_shard.set(shard_for(user.pk))
+        try:
+            return await self.get_response(request)
+        finally:
+            current_shard.reset(token)
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serves public pages (settings.PAGE_CACHE_TTLS, by URL name) to anonymous
+    visitors from the cache, skipping sessions, auth, the user_stats context
+    processor and the view. A request with a session or messages cookie is
+    never treated as anonymous. Cached responses carry Vary: Cookie, so
+    downstream caches don't hand them to logged-in users. Goes right after
+    SecurityMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.ttls = dict(getattr(settings, "PAGE_CACHE_TTLS", {}))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        ttl = self._ttl(request)
+        if not ttl:
+            return self.get_response(request)
+
+        key = page_cache.page_key(request, cache.get(page_cache.GENERATION_KEY, 0))
+        entry = cache.get(key)
+        if entry is not None and page_cache.is_fresh(entry):
+            return page_cache.thaw(entry)
+
+        # ✅ single-flight: one request renders; the rest get the stale page,
+        # or wait briefly for the render if there is none
+        if not cache.add(page_cache.lock_key(key), 1, page_cache.LOCK_TIMEOUT):
+            if entry is not None:
+                return page_cache.thaw(entry)
+            waited = 0.0
+            while waited < page_cache.WAIT_TIMEOUT:
+                time.sleep(page_cache.WAIT_INTERVAL)
+                waited += page_cache.WAIT_INTERVAL
+                entry = cache.get(key)
+                if entry is not None:
+                    return page_cache.thaw(entry)
+            return self.get_response(request)
+
+        try:
+            response = self.get_response(request)
+            if page_cache.is_cacheable(request, response):
+                patch_vary_headers(response, ("Cookie",))
+                cache.set(key, page_cache.freeze(response, ttl), ttl + page_cache.STALE_TTL)
+        finally:
+            cache.delete(page_cache.lock_key(key))
+        return response
+
+    async def __acall__(self, request):
+        ttl = self._ttl(request)
+        if not ttl:
+            return await self.get_response(request)
+
+        key = page_cache.page_key(request, await cache.aget(page_cache.GENERATION_KEY, 0))
+        entry = await cache.aget(key)
+        if entry is not None and page_cache.is_fresh(entry):
+            return page_cache.thaw(entry)
+
+        if not await cache.aadd(page_cache.lock_key(key), 1, page_cache.LOCK_TIMEOUT):
+            if entry is not None:
+                return page_cache.thaw(entry)
+            waited = 0.0
+            while waited < page_cache.WAIT_TIMEOUT:
+                await asyncio.sleep(page_cache.WAIT_INTERVAL)
+                waited += page_cache.WAIT_INTERVAL
+                entry = await cache.aget(key)
+                if entry is not None:
+                    return page_cache.thaw(entry)
+            return await self.get_response(request)
+
+        try:
+            response = await self.get_response(request)
+            if page_cache.is_cacheable(request, response):
+                patch_vary_headers(response, ("Cookie",))
+                await cache.aset(key, page_cache.freeze(response, ttl), ttl + page_cache.STALE_TTL)
+        finally:
+            await cache.adelete(page_cache.lock_key(key))
+        return response
+
+    def _ttl(self, request):
+        if not self.ttls or request.method not in ("GET", "HEAD"):
+            return None
+        if not page_cache.is_anonymous(request):
+            return None
+
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        return self.ttls.get(match.url_name)
+
+
+class StaticExportMiddleware:
+    """
+    Short-circuits anonymous GETs to the pages pre-rendered by
+    `manage.py export_static_pages` (STATIC_EXPORT_ROOT/<path>/index.html),
+    before sessions, auth, URL resolving or any view runs. Goes before
+    AnonymousPageCacheMiddleware. Off unless settings.SERVE_STATIC_EXPORT.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        root = getattr(settings, "STATIC_EXPORT_ROOT", None)
+        serve = getattr(settings, "SERVE_STATIC_EXPORT", False)
+        self.root = Path(root).resolve() if root and serve else None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._exported(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._exported(request) or await self.get_response(request)
+
+    def _exported(self, request):
+        if self.root is None or request.method not in ("GET", "HEAD"):
+            return None
+        if not page_cache.is_anonymous(request):
+            return None
+
+        target = (self.root / request.path_info.strip("/") / "index.html").resolve()
+        if not target.is_relative_to(self.root) or not target.is_file():
+            return None
+
+        response = HttpResponse(target.read_bytes(), content_type="text/html; charset=utf-8")
+        patch_vary_headers(response, ("Cookie",))
+        response["X-Static-Export"] = "hit"
+        return response
+
+
+class ThresholdGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware for HTML / JSON responses of at least settings.GZIP_MIN_BYTES.
+    Small bodies aren't worth the CPU, and streams (the SSE feed) must not be
+    buffered by the compressor.
+    """
+
+    COMPRESSIBLE_TYPES = ("text/html", "application/json")
+
+    def process_response(self, request, response):
+        if response.streaming:
+            return response
+        if len(response.content) < getattr(settings, "GZIP_MIN_BYTES", 1024):
+            return response
+        if response.get("Content-Type", "").split(";")[0] not in self.COMPRESSIBLE_TYPES:
+            return response
+        return super().process_response(request, response)
+
+
+class StaticAssetsMiddleware:
+    """
+    Serves collected files from STATIC_ROOT when settings.SERVE_STATIC_ASSETS
+    is on (no front-end server in front of Django). Picks the .br / .gz file
+    written by tracker.storage when the client accepts it; content-hashed
+    names are cached for a year as immutable.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(getattr(settings, "SERVE_STATIC_ASSETS", False) and settings.STATIC_ROOT)
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.root = Path(settings.STATIC_ROOT).resolve() if self.enabled else None
+        self._hashed_names = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self._asset(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self._asset(request) or await self.get_response(request)
+
+    def _asset(self, request):
+        if not self.enabled or request.method not in ("GET", "HEAD"):
+            return None
+        if not request.path_info.startswith(self.prefix):
+            return None
+
+        name = request.path_info[len(self.prefix):]
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root) or not path.is_file():
+            return None
+
+        accepted = request.headers.get("Accept-Encoding", "")
+        encoding = None
+        for candidate, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if candidate in accepted and path.with_name(path.name + suffix).is_file():
+                encoding, path = candidate, path.with_name(path.name + suffix)
+                break
+
+        response = HttpResponse(
+            path.read_bytes(),
+            content_type=mimetypes.guess_type(name)[0] or "application/octet-stream",
+        )
+        if encoding:
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        response["Cache-Control"] = (
+            "public, max-age=31536000, immutable" if self._is_hashed(name) else "public, max-age=300"
+        )
+        return response
+
+    def _is_hashed(self, name):
+        if self._hashed_names is None:
+            self._hashed_names = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        return name in self._hashed_names
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_summaries(apps, schema_editor):
+    UserChallengeLog = apps.get_model("tracker", "UserChallengeLog")
+    UserChallengeSummary = apps.get_model("tracker", "UserChallengeSummary")
+
+    summaries = {}
+    logs = UserChallengeLog.objects.filter(status="completed").values(
+        "user_id", "date", "challenge__day_number", "challenge__reward_points"
+    )
+    for row in logs.iterator():
+        s = summaries.setdefault(
+            row["user_id"],
+            UserChallengeSummary(user_id=row["user_id"]),
+        )
+        s.completed_mask |= 1 << (row["challenge__day_number"] - 1)
+        s.total_reward += row["challenge__reward_points"]
+        if s.last_completed_date is None or row["date"] > s.last_completed_date:
+            s.last_completed_date = row["date"]
+
+    UserChallengeSummary.objects.bulk_create(summaries.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0013_pointstransaction"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserChallengeSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("completed_mask", models.IntegerField(default=0)),
+                ("total_reward", models.IntegerField(default=0)),
+                ("last_completed_date", models.DateField(blank=True, null=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="challenge_summary",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:08
+
+import json
+
+from django.db import migrations, models
+
+
+def report_progress(report):
+    """Frozen copy of tracker.session_payload.report_progress as of this migration."""
+    if report is None:
+        return 0
+
+    if isinstance(report, str):
+        try:
+            report = json.loads(report)
+        except Exception:
+            return 0
+
+    physical = (
+        report.get("physical", [])
+        if isinstance(report.get("physical", []), list)
+        else []
+    )
+    yoga = report.get("yoga", []) if isinstance(report.get("yoga", []), list) else []
+    med = (
+        report.get("meditation", {})
+        if isinstance(report.get("meditation", {}), dict)
+        else {}
+    )
+
+    active = []
+    if len(physical) > 0:
+        active.append("physical")
+    if len(yoga) > 0:
+        active.append("yoga")
+    if med and med.get("status") != "not_planned":
+        active.append("meditation")
+
+    if not active:
+        return 0
+
+    weight = 100 / len(active)
+
+    def ratio_done(lst):
+        if not lst:
+            return 0.0
+        done = sum(1 for x in lst if x.get("status") == "completed")
+        return done / len(lst)
+
+    prog = 0.0
+    if "physical" in active:
+        prog += ratio_done(physical) * weight
+    if "yoga" in active:
+        prog += ratio_done(yoga) * weight
+    if "meditation" in active:
+        prog += (1.0 if med.get("status") == "completed" else 0.0) * weight
+
+    return max(0, min(int(round(prog)), 100))
+
+
+def backfill_progress(apps, schema_editor):
+    SessionRecord = apps.get_model("tracker", "SessionRecord")
+    records = SessionRecord.objects.using(schema_editor.connection.alias)
+
+    batch = []
+    for record in records.only("id", "report").iterator(chunk_size=500):
+        record.progress = report_progress(record.report)
+        batch.append(record)
+        if len(batch) >= 500:
+            records.bulk_update(batch, ["progress"])
+            batch = []
+    if batch:
+        records.bulk_update(batch, ["progress"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0016_shardable_user_fks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sessionrecord",
+            name="progress",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        # runs on the shard databases too (see ShardRouter.allow_migrate)
+        migrations.RunPython(
+            backfill_progress,
+            migrations.RunPython.noop,
+            hints={"model_name": "sessionrecord"},
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0017_sessionrecord_progress"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dailyexercisechallengelog",
+            index=models.Index(fields=["date"], name="tracker_dai_date_6b16a7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pointstransaction",
+            index=models.Index(fields=["date"], name="tracker_poi_date_702a2b_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sessionrecord",
+            index=models.Index(fields=["date"], name="tracker_ses_date_ce9c8d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="userchallengelog",
+            index=models.Index(fields=["date"], name="tracker_use_date_6a0f9f_idx"),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:14
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def drop_duplicate_days(apps, schema_editor):
+    # keep the newest row of each (user, date) before the unique constraint
+    PhysicalHealth = apps.get_model("tracker", "PhysicalHealth")
+    duplicates = (
+        PhysicalHealth.objects.order_by()
+        .values("user_id", "date")
+        .annotate(keep=Max("id"), rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        PhysicalHealth.objects.filter(user_id=row["user_id"], date=row["date"]).exclude(
+            id=row["keep"]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0018_admin_date_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="physicalhealth",
+            options={"ordering": ["-date"]},
+        ),
+        migrations.AlterField(
+            model_name="physicalhealth",
+            name="date",
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.RunPython(drop_duplicate_days, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name="physicalhealth",
+            unique_together={("user", "date")},
+        ),
+        migrations.AddIndex(
+            model_name="physicalhealth",
+            index=models.Index(fields=["date"], name="tracker_phy_date_ca4cf2_idx"),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0019_physicalhealth_user_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CompactionWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("compacted_before", models.DateField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PhysicalHealthSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("week", "Week"), ("month", "Month")], max_length=5
+                    ),
+                ),
+                ("period_start", models.DateField()),
+                ("day_mask", models.IntegerField(default=0)),
+                ("days", models.PositiveSmallIntegerField(default=0)),
+                ("steps_total", models.BigIntegerField(default=0)),
+                ("calories_total", models.BigIntegerField(default=0)),
+                ("sleep_hours_total", models.FloatField(default=0)),
+                ("steps_max", models.IntegerField(default=0)),
+                ("calories_max", models.IntegerField(default=0)),
+                ("sleep_hours_max", models.FloatField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-period_start"],
+                "unique_together": {("user", "period", "period_start")},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0020_physicalhealth_summaries"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="longest_streak",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:22
+
+import django.db.models.deletion
+import tracker.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0021_userprofile_longest_streak"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityYear",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "active_bits",
+                    models.BinaryField(default=tracker.models.empty_year_bits),
+                ),
+                (
+                    "levels",
+                    models.BinaryField(default=tracker.models.empty_year_levels),
+                ),
+                ("days_active", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_years",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "year")},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AlterFieldOutsideShards(migrations.AlterField):
+    """
+    Restores the user FK constraint that 0016 dropped everywhere, except on
+    the shard databases: they hold no auth_user table to reference.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not schema_editor.connection.alias.startswith("shard"):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not schema_editor.connection.alias.startswith("shard"):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tracker", "0022_activityyear"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AlterFieldOutsideShards(
+            model_name="pointstransaction",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="points_transactions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        AlterFieldOutsideShards(
+            model_name="sessionrecord",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="session_records",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Expression index for the case-insensitive username lookups in
+    tracker/provisioning.py (login, signup, bulk provisioning), which
+    otherwise scan auth_user. auth.User isn't ours to add Meta.indexes to,
+    hence the raw SQL.
+    """
+
+    dependencies = [
+        ("tracker", "0023_user_fks_outside_shards"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX "tracker_auth_user_lower_username" ON "auth_user" (LOWER("username"))',
+            reverse_sql='DROP INDEX "tracker_auth_user_lower_username"',
+        ),
+    ]
@@ -1,16 +1,65 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .session_payload import report_progress
 
 class PhysicalHealth(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     steps = models.IntegerField()
     calories = models.IntegerField()
     sleep_hours = models.FloatField()
-    date = models.DateField(auto_now_add=True)
+    # one row per user per day; imports upsert on (user, date) (tracker/health_ingest.py)
+    date = models.DateField(default=timezone.localdate)
 
     def __str__(self):
         return str(self.user)
-    
+
+    class Meta:
+        unique_together = ("user", "date")
+        ordering = ["-date"]
+        indexes = [models.Index(fields=["date"])]
+
+
+class PhysicalHealthSummary(models.Model):
+    """
+    Weekly / monthly roll-up of PhysicalHealth days older than the retention
+    horizon (tracker/health_compaction.py); the raw days are deleted.
+    day_mask: bit (date - period_start).days is set once that day is counted.
+    """
+    PERIOD_CHOICES = [
+        ("week", "Week"),
+        ("month", "Month"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    day_mask = models.IntegerField(default=0)
+    days = models.PositiveSmallIntegerField(default=0)
+    steps_total = models.BigIntegerField(default=0)
+    calories_total = models.BigIntegerField(default=0)
+    sleep_hours_total = models.FloatField(default=0)
+    steps_max = models.IntegerField(default=0)
+    calories_max = models.IntegerField(default=0)
+    sleep_hours_max = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"{self.user} - {self.period} of {self.period_start}"
+
+    class Meta:
+        unique_together = ("user", "period", "period_start")
+        ordering = ["-period_start"]
+
+
+class CompactionWatermark(models.Model):
+    """Raw rows dated before compacted_before have been rolled into summaries."""
+    name = models.CharField(max_length=50, unique=True)
+    compacted_before = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} < {self.compacted_before}"
+
 
 class Exercise(models.Model):
     name = models.CharField(max_length=100)
@@ -24,6 +73,7 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     points = models.IntegerField(default=0)
     streak = models.IntegerField(default=0)
+    longest_streak = models.IntegerField(default=0)
     last_activity = models.DateTimeField(null=True, blank=True)
     last_session_date = models.DateField(null=True, blank=True)
     last_session_report = models.JSONField(null=True, blank=True)
@@ -35,24 +85,34 @@ class UserProfile(models.Model):
 
 
 class SessionRecord(models.Model):
+    # FK constraint everywhere but the shard databases, which have no auth_user (migration 0023)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="session_records")
     date = models.DateField()
     report = models.JSONField()
     points_earned = models.IntegerField(default=0)
+    # summary of report, so lists/charts can skip loading the JSON
+    progress = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        self.progress = report_progress(self.report)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.user.username} - {self.date}"
     
     class Meta:
         unique_together = ('user', 'date')
         ordering = ['-date']
+        indexes = [models.Index(fields=['date'])]   # admin date_hierarchy / ordering
 
 
 class ExercisePlan(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    # set when the plan's items are exactly a shared template's items
+    template = models.ForeignKey("PlanTemplate", null=True, blank=True, on_delete=models.SET_NULL, related_name="plans")
 
     def __str__(self):
         return f"{self.user.username} plan ({self.created_at.date()})"
@@ -73,6 +133,81 @@ class PlanItem(models.Model):
 
     def __str__(self):
         return f"{self.name} ({self.category})"
+
+
+def empty_year_bits():
+    return bytes(46)     # 366 bits
+
+
+def empty_year_levels():
+    return bytes(366)
+
+
+class ActivityYear(models.Model):
+    """
+    One small row per user per year behind the activity calendar
+    (tracker/activity_calendar.py), so it never scans SessionRecord.
+    active_bits: bit (day of year - 1) is set once a session is saved that day.
+    levels: one byte per day of year, 0 (no session) .. 4 (75-100% progress).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="activity_years")
+    year = models.PositiveSmallIntegerField()
+    active_bits = models.BinaryField(default=empty_year_bits)
+    levels = models.BinaryField(default=empty_year_levels)
+    days_active = models.PositiveSmallIntegerField(default=0)
+
+    @staticmethod
+    def day_index(day):
+        return day.timetuple().tm_yday - 1
+
+    def is_active(self, day):
+        i = self.day_index(day)
+        return bool(bytes(self.active_bits)[i // 8] & (1 << (i % 8)))
+
+    def level(self, day):
+        return bytes(self.levels)[self.day_index(day)]
+
+    def mark(self, day, level):
+        i = self.day_index(day)
+        bits = bytearray(self.active_bits)
+        bits[i // 8] |= 1 << (i % 8)
+        levels = bytearray(self.levels)
+        levels[i] = level
+        self.active_bits, self.levels = bytes(bits), bytes(levels)
+        self.days_active = int.from_bytes(self.active_bits, "little").bit_count()
+
+    def run_ending(self, day):
+        """Consecutive active days ending at `day` (within this year)."""
+        run = 0
+        bits = int.from_bytes(bytes(self.active_bits), "little")
+        i = self.day_index(day)
+        while i >= 0 and bits >> i & 1:
+            run += 1
+            i -= 1
+        return run
+
+    def __str__(self):
+        return f"{self.user.username} {self.year}: {self.days_active} active days"
+
+    class Meta:
+        unique_together = ("user", "year")
+
+
+class PlanTemplate(models.Model):
+    """
+    A ready-made plan (beginner / six-week / advanced), stored once.
+    content_hash: sha256 of the canonical item list, so identical plans map to one row.
+    compiled_session: today_session payload, built once and shared by every adopter.
+    """
+    slug = models.SlugField(max_length=50, unique=True)
+    name = models.CharField(max_length=100)
+    content_hash = models.CharField(max_length=64, unique=True)
+    items = models.JSONField(default=list)
+    compiled_session = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.content_hash[:8]})"
     
 
 class DailyProgress(models.Model):
@@ -125,6 +260,7 @@ class DailyExerciseChallengeLog(models.Model):
     class Meta:
         unique_together = ("user", "challenge")
         ordering = ["-date"]
+        indexes = [models.Index(fields=["date"])]
 
     def __str__(self):
         return f"{self.user.username} - {self.challenge.day_number} - {self.status}"
@@ -166,10 +302,44 @@ class UserChallengeLog(models.Model):
     class Meta:
         unique_together = ("user", "challenge")
         ordering = ["-date"]
+        indexes = [models.Index(fields=["date"])]
 
     def __str__(self):
         return f"{self.user.username} - Day {self.challenge.day_number} - {self.status}"
 
+
+CHALLENGE_SERIES_DAYS = 10
+
+
+class UserChallengeSummary(models.Model):
+    """
+    One row per user summarising the 10-day challenge series.
+    completed_mask: bit (day_number - 1) is set once that day is completed.
+    Kept in sync by complete_challenge, so pages never scan UserChallengeLog.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="challenge_summary")
+    completed_mask = models.IntegerField(default=0)
+    total_reward = models.IntegerField(default=0)
+    last_completed_date = models.DateField(null=True, blank=True)
+
+    def is_day_completed(self, day_number):
+        return bool(self.completed_mask & (1 << (day_number - 1)))
+
+    @property
+    def completed_days(self):
+        return [d for d in range(1, CHALLENGE_SERIES_DAYS + 1) if self.is_day_completed(d)]
+
+    @property
+    def completed_count(self):
+        return bin(self.completed_mask).count("1")
+
+    @property
+    def series_percent(self):
+        return int(self.completed_count * 100 / CHALLENGE_SERIES_DAYS)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.completed_count}/{CHALLENGE_SERIES_DAYS} challenges"
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -180,6 +350,7 @@ class PointsTransaction(models.Model):
         ("challenge", "Challenge"),
     ]
 
+    # FK constraint everywhere but the shard databases, which have no auth_user (migration 0023)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="points_transactions")
     date = models.DateTimeField(default=timezone.now)
 
@@ -190,6 +361,7 @@ class PointsTransaction(models.Model):
 
     class Meta:
         ordering = ["-date"]
+        indexes = [models.Index(fields=["date"])]
 
     def __str__(self):
         return f"{self.user.username} {self.points} ({self.source})"
@@ -0,0 +1,85 @@
+"""
+Full-page cache for anonymous visitors (see AnonymousPageCacheMiddleware).
+
+Public pages render the same HTML for every guest, so the first guest render
+of a URL is stored for settings.PAGE_CACHE_TTLS[url_name] seconds. Keys carry
+a generation number, bumped by invalidate() (e.g. when ChallengeMaster
+changes), and the current date, since the challenge of the day rolls over at
+midnight.
+
+Only one request per key re-renders an expired page: it takes a short lock
+with cache.add(). Entries outlive their TTL by STALE_TTL, so while that
+render runs, concurrent requests get the expired page at once instead of
+parking a worker. Only a cold key (first render, new generation or day)
+makes them wait, and then for at most WAIT_TIMEOUT before rendering
+themselves.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+
+GENERATION_KEY = "page:generation"
+LOCK_TIMEOUT = 10      # seconds a render may hold the lock
+STALE_TTL = 60         # seconds an expired page is still served while it is re-rendered
+WAIT_TIMEOUT = 0.2     # seconds a waiter polls a cold key before rendering itself
+WAIT_INTERVAL = 0.02
+
+# a cached guest page is never served to a request carrying these
+BYPASS_COOKIES = ("messages",)
+
+
+def is_anonymous(request):
+    """Cookie-only check, so no session lookup is needed."""
+    if settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    return not any(name in request.COOKIES for name in BYPASS_COOKIES)
+
+
+def page_key(request, generation):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{generation}:{timezone.localdate().isoformat()}:{path}"
+
+
+def lock_key(key):
+    return f"{key}:lock"
+
+
+def invalidate():
+    """Drop every cached page (old generations just expire)."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
+
+
+def is_cacheable(request, response):
+    """Only plain shared pages: 200, no cookies set, CSRF token not embedded."""
+    if response.status_code != 200 or response.streaming:
+        return False
+    if response.cookies:
+        return False
+    if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+        return False
+    return "private" not in response.get("Cache-Control", "")
+
+
+def freeze(response, ttl):
+    """Cache entry, fresh for ttl seconds; store it for ttl + STALE_TTL."""
+    return (time.time() + ttl, response.status_code, response.content, list(response.items()))
+
+
+def is_fresh(entry):
+    return entry[0] > time.time()
+
+
+def thaw(entry):
+    fresh_until, status, content, headers = entry
+    response = HttpResponse(content, status=status)
+    for name, value in headers:
+        response[name] = value
+    response["X-Page-Cache"] = "hit" if fresh_until > time.time() else "stale"
+    return response
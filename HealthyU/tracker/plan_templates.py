@@ -0,0 +1,129 @@
+"""
+Shared, content-addressed plan templates.
+
+Each template's item list is stored once in PlanTemplate (keyed by a hash of
+its content); adopting a template clones the items into the user's plan with
+one bulk insert and links the plan to the template, so the compiled
+today_session payload is built once per template instead of once per user.
+
+The hash also covers compile_session's fingerprint, so editing a template's
+items or the compiler (EXERCISE_STEPS etc.) gives a new hash and the stored
+payload is rebuilt.
+"""
+import hashlib
+import json
+
+from django.db import transaction
+
+from .exercise_challenges import generate_for_user as generate_exercise_challenges
+from .models import ExercisePlan, PlanItem, PlanTemplate
+from .session_payload import compile_fingerprint, compile_session
+
+
+def _item(name, category, value, unit):
+    return {"name": name, "category": category, "value": value, "unit": unit}
+
+
+# units as create_plan posts them: Physical Exercise and Yoga cards are counted
+# ("freq"), Meditation is timed ("min"), so a hand-built copy matches the template
+PLAN_TEMPLATES = {
+    "beginner": {
+        "name": "Beginner Fitness Plan",
+        "items": [
+            _item("Jumping Jacks", "Physical Exercise", 2, "freq"),
+            _item("Push Ups", "Physical Exercise", 2, "freq"),
+            _item("Wall Sit", "Physical Exercise", 1, "freq"),
+            _item("Mountain Pose", "Yoga", 5, "freq"),
+            _item("Child's Pose", "Yoga", 5, "freq"),
+            _item("Breathing Meditation", "Meditation", 5, "min"),
+        ],
+    },
+    "six-week": {
+        "name": "6-Week Transformation",
+        "items": [
+            _item("Squats", "Physical Exercise", 3, "freq"),
+            _item("Lunges", "Physical Exercise", 3, "freq"),
+            _item("Plank", "Physical Exercise", 3, "freq"),
+            _item("Mountain Climbers", "Physical Exercise", 3, "freq"),
+            _item("Warrior II", "Yoga", 5, "freq"),
+            _item("Cobra Pose", "Yoga", 5, "freq"),
+            _item("Mindfulness Meditation", "Meditation", 10, "min"),
+        ],
+    },
+    "advanced": {
+        "name": "Advanced Fitness Plan",
+        "items": [
+            _item("Burpees", "Physical Exercise", 5, "freq"),
+            _item("Pull Ups", "Physical Exercise", 4, "freq"),
+            _item("Pistol Squats", "Physical Exercise", 4, "freq"),
+            _item("Jump Squats", "Physical Exercise", 5, "freq"),
+            _item("Crow Pose", "Yoga", 5, "freq"),
+            _item("Wheel Pose", "Yoga", 5, "freq"),
+            _item("Zen Meditation", "Meditation", 10, "min"),
+        ],
+    },
+}
+
+
+def content_hash(items):
+    """sha256 of the canonical item list (order matters: it is the session order) and the compiler."""
+    canonical = json.dumps(
+        {
+            "compiler": compile_fingerprint(),
+            "items": [_item(i["name"], i["category"], int(i["value"]), i["unit"]) for i in items],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_template(slug):
+    """The stored template for a slug, created and compiled on first use. None for unknown slugs."""
+    spec = PLAN_TEMPLATES.get(slug)
+    if spec is None:
+        return None
+
+    digest = content_hash(spec["items"])
+    template, _ = PlanTemplate.objects.get_or_create(
+        slug=slug,
+        defaults={"content_hash": digest, "name": spec["name"], "items": spec["items"]},
+    )
+    # new row, edited items or a changed compiler: compile here, on the adopt
+    # path, so today_session only ever reads the stored payload
+    if template.content_hash != digest or template.compiled_session is None:
+        with transaction.atomic():
+            if template.items != spec["items"]:
+                # plans cloned the old items: they compile their own from now on
+                template.plans.update(template=None)
+            template.content_hash = digest
+            template.name = spec["name"]
+            template.items = spec["items"]
+            template.compiled_session = compile_session(spec["items"])
+            template.save(update_fields=["content_hash", "name", "items", "compiled_session"])
+    return template
+
+
+def match_template(items):
+    """The stored template whose content is exactly these items, if any."""
+    return PlanTemplate.objects.filter(content_hash=content_hash(items)).first()
+
+
+def compiled_template_session(template):
+    """
+    today_session payload for a template. Never writes: a row whose stored
+    payload is missing or stale (until get_template next refreshes it) is
+    compiled in memory.
+    """
+    if template.compiled_session is not None and template.content_hash == content_hash(template.items):
+        return template.compiled_session
+    return compile_session(template.items)
+
+
+def adopt_template(user, template):
+    """Give the user a plan linked to the template (one insert for all items)."""
+    with transaction.atomic():
+        plan = ExercisePlan.objects.create(user=user, template=template)
+        PlanItem.objects.bulk_create([PlanItem(plan=plan, **item) for item in template.items])
+        generate_exercise_challenges(user)
+    return plan
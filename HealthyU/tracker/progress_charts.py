@@ -0,0 +1,129 @@
+"""
+Server-rendered SVG charts for the progress page.
+
+Built from the same aggregates as progress/data/ (views._progress_payload) and
+embedded inline in show_progress, so the charts paint with the first response:
+no chart library, no second request. All series are on a 0-100 scale
+(progress % and points, capped at 100 per day).
+"""
+import datetime
+
+from django.core.cache import cache
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+WIDTH, HEIGHT = 600, 300
+PAD_LEFT, PAD_RIGHT, PAD_TOP, PAD_BOTTOM = 36, 10, 24, 34
+Y_TICKS = (0, 25, 50, 75, 100)
+CACHE_SECONDS = 60 * 60 * 24
+
+
+def cache_key(user_id, day):
+    return f"progress_charts:{user_id}:{day.isoformat()}"
+
+
+def invalidate(user_id, day):
+    cache.delete(cache_key(user_id, day))
+
+
+def _short_date(label):
+    try:
+        return datetime.date.fromisoformat(label).strftime("%d %b")
+    except ValueError:
+        # monthly labels are YYYY-MM
+        return datetime.datetime.strptime(label, "%Y-%m").strftime("%b %y")
+
+
+def _x(i, count):
+    span = WIDTH - PAD_LEFT - PAD_RIGHT
+    return PAD_LEFT + (span * (i + 0.5) / count)
+
+
+def _y(value):
+    span = HEIGHT - PAD_TOP - PAD_BOTTOM
+    return PAD_TOP + span * (1 - max(0, min(value, 100)) / 100)
+
+
+def _frame(labels, label_every):
+    parts = []
+    for tick in Y_TICKS:
+        y = _y(tick)
+        parts.append(
+            f'<line class="grid" x1="{PAD_LEFT}" y1="{y:.1f}" x2="{WIDTH - PAD_RIGHT}" y2="{y:.1f}"/>'
+            f'<text class="tick" x="{PAD_LEFT - 6}" y="{y + 4:.1f}" text-anchor="end">{tick}</text>'
+        )
+    for i, label in enumerate(labels):
+        if i % label_every == 0 or i == len(labels) - 1:
+            parts.append(
+                f'<text class="tick" x="{_x(i, len(labels)):.1f}" y="{HEIGHT - PAD_BOTTOM + 18}" '
+                f'text-anchor="middle">{escape(_short_date(label))}</text>'
+            )
+    return "".join(parts)
+
+
+def _svg(title, body):
+    return mark_safe(
+        f'<svg class="svg-chart" viewBox="0 0 {WIDTH} {HEIGHT}" role="img" '
+        f'aria-label="{escape(title)}" preserveAspectRatio="xMidYMid meet">{body}</svg>'
+    )
+
+
+def line_chart(title, labels, series, label_every=5):
+    """series: [(name, values, css_class)] drawn as lines with hover titles per point."""
+    parts = [_frame(labels, label_every)]
+    count = len(labels)
+
+    for s, (name, values, css_class) in enumerate(series):
+        points = " ".join(f"{_x(i, count):.1f},{_y(v):.1f}" for i, v in enumerate(values))
+        parts.append(f'<polyline class="line {css_class}" points="{points}"/>')
+        for i, v in enumerate(values):
+            parts.append(
+                f'<circle class="dot {css_class}" cx="{_x(i, count):.1f}" cy="{_y(v):.1f}" r="3">'
+                f"<title>{escape(labels[i])} • {escape(name)}: {v}</title></circle>"
+            )
+        # legend
+        lx = PAD_LEFT + s * 120
+        parts.append(
+            f'<rect class="swatch {css_class}" x="{lx}" y="6" width="10" height="10"/>'
+            f'<text class="legend" x="{lx + 14}" y="15">{escape(name)}</text>'
+        )
+    return _svg(title, "".join(parts))
+
+
+def bar_chart(title, labels, values, name, label_every=2):
+    parts = [_frame(labels, label_every)]
+    count = len(labels)
+    bar = (WIDTH - PAD_LEFT - PAD_RIGHT) / count * 0.7
+    base = _y(0)
+
+    for i, v in enumerate(values):
+        top = _y(v)
+        parts.append(
+            f'<rect class="bar" x="{_x(i, count) - bar / 2:.1f}" y="{top:.1f}" '
+            f'width="{bar:.1f}" height="{base - top:.1f}">'
+            f"<title>{escape(labels[i])} • {escape(name)}: {v}</title></rect>"
+        )
+    return _svg(title, "".join(parts))
+
+
+def render_all(payload):
+    """payload: the dict built by views._progress_payload."""
+    daily, weekly, monthly = payload["daily"], payload["weekly"], payload["monthly"]
+    return {
+        "daily": line_chart(
+            "Daily progress, last 30 days",
+            daily["labels"],
+            [
+                ("Progress (%)", daily["progress"], "series-progress"),
+                ("Points", daily["points"], "series-points"),
+            ],
+        ),
+        "weekly": bar_chart(
+            "Weekly average progress, last 12 weeks",
+            weekly["labels"], weekly["avg_progress"], "Avg Progress (%)",
+        ),
+        "monthly": bar_chart(
+            "Monthly average progress, last 12 months",
+            monthly["labels"], monthly["avg_progress"], "Avg Progress (%)",
+        ),
+    }
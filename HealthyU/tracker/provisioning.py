@@ -0,0 +1,137 @@
+"""
+Bulk user provisioning (corporate onboarding imports).
+
+Users and their UserProfile rows are inserted with bulk_create in batches,
+so the per-row post_save profile signal never fires; passwords are hashed
+across a process pool because hashing dominates the cost.
+
+Accounts use the lower-cased email as username and email; signup and login
+normalise the same way (normalize_email). Older accounts may hold the email
+as typed, so existing users are matched case-insensitively.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .exercise_challenges import generate_for_users
+from .models import ExercisePlan, PlanItem, UserProfile
+
+
+def normalize_email(email):
+    return (email or "").strip().lower()
+
+
+def find_username(email):
+    """Stored username of the account for this email, in whatever case it was saved."""
+    email = normalize_email(email)
+    # accounts made since emails are normalised: the username's unique index
+    if User.objects.filter(username=email).exists():
+        return email
+    # older accounts stored as typed (the LOWER(username) index, migration 0024)
+    return (
+        User.objects.annotate(lower_username=Lower("username"))
+        .filter(lower_username=email)
+        .values_list("username", flat=True)
+        .first()
+    )
+
+
+def _init_worker(settings_module):
+    # needed when the pool uses the "spawn" start method (no inherited setup)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _hash_password(password):
+    # None -> unusable password (user sets one through password reset)
+    return make_password(password)
+
+
+def _password_pool(workers):
+    if workers == 1:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "HealthyU.settings"),),
+    )
+
+
+def hash_passwords(passwords, pool=None):
+    """Hash in parallel when a pool is given; order of the result matches the input."""
+    if pool is None:
+        return [_hash_password(p) for p in passwords]
+    return list(pool.map(_hash_password, passwords, chunksize=32))
+
+
+def _assign_template(user_ids, template):
+    plans = ExercisePlan.objects.bulk_create(
+        [ExercisePlan(user_id=user_id, template=template) for user_id in user_ids]
+    )
+    if any(plan.pk is None for plan in plans):
+        plans = ExercisePlan.objects.filter(user_id__in=user_ids)
+
+    PlanItem.objects.bulk_create(
+        [PlanItem(plan=plan, **item) for plan in plans for item in template.items]
+    )
+    generate_for_users(user_ids)
+
+
+def provision_users(rows, batch_size=1000, template=None, workers=None):
+    """
+    rows: dicts with email (required), first_name, last_name, password.
+    Existing emails are skipped. Yields (created, skipped) after every batch.
+    """
+    pool = _password_pool(workers)
+    try:
+        for start in range(0, len(rows), batch_size):
+            yield _provision_batch(rows[start:start + batch_size], template, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _provision_batch(batch, template, pool):
+    emails = [normalize_email(row["email"]) for row in batch]
+    existing = set(
+        User.objects.annotate(lower_username=Lower("username"))
+        .filter(lower_username__in=emails)
+        .values_list("lower_username", flat=True)
+    )
+
+    new_rows, seen = [], set(existing)
+    for email, row in zip(emails, batch):
+        if email and email not in seen:
+            seen.add(email)
+            new_rows.append((email, row))
+
+    hashes = hash_passwords([row.get("password") or None for _, row in new_rows], pool)
+
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(
+                username=email,
+                email=email,
+                first_name=(row.get("first_name") or "").strip(),
+                last_name=(row.get("last_name") or "").strip(),
+                password=password_hash,
+            )
+            for (email, row), password_hash in zip(new_rows, hashes)
+        ])
+
+        # ✅ re-read ids: not every backend returns pks from bulk_create
+        user_ids = list(
+            User.objects.filter(username__in=[email for email, _ in new_rows])
+            .values_list("pk", flat=True)
+        )
+        UserProfile.objects.bulk_create([UserProfile(user_id=user_id) for user_id in user_ids])
+
+        if template is not None and user_ids:
+            _assign_template(user_ids, template)
+
+    return len(user_ids), len(batch) - len(user_ids)
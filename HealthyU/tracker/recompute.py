@@ -0,0 +1,113 @@
+"""
+Repair jobs for derived per-user data (admin actions + recompute_profiles).
+
+UserProfile.points and .streak are running totals kept by _save_session and
+_complete_challenge; SessionRecord.progress is a summary of the report. When
+they drift (bugs, hand edits, changed scoring rules) these rebuild them from
+the source rows: the PointsTransaction ledger, SessionRecord dates and the
+stored reports.
+
+Users are processed in chunks, each chunk in one transaction; every job
+yields (users, changed) per chunk so callers can report progress.
+"""
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from . import activity_calendar, progress_charts
+from .models import PointsTransaction, SessionRecord, UserProfile
+from .session_payload import report_progress
+from .sharding import aliases_for, shard_for
+from .streaks import rebuild as rebuild_streaks
+
+JOBS = ("points", "streaks", "progress")
+
+
+def _chunks(user_ids, chunk_size):
+    user_ids = sorted(set(user_ids))
+    for start in range(0, len(user_ids), chunk_size):
+        yield user_ids[start:start + chunk_size]
+
+
+def _profiles(chunk):
+    return list(UserProfile.objects.select_for_update().filter(user_id__in=chunk))
+
+
+def recompute_points(user_ids, chunk_size=500):
+    """UserProfile.points = sum of the user's PointsTransaction rows."""
+    for chunk in _chunks(user_ids, chunk_size):
+        totals = {}
+        for alias in aliases_for(PointsTransaction):
+            rows = (
+                PointsTransaction.objects.using(alias)
+                .filter(user_id__in=chunk)
+                .order_by()
+                .values("user_id")
+                .annotate(total=Sum("points"))
+            )
+            for row in rows:
+                totals[row["user_id"]] = totals.get(row["user_id"], 0) + row["total"]
+
+        with transaction.atomic():
+            changed = []
+            for profile in _profiles(chunk):
+                points = totals.get(profile.user_id, 0)
+                if profile.points != points:
+                    profile.points = points
+                    changed.append(profile)
+            UserProfile.objects.bulk_update(changed, ["points"])
+        yield len(chunk), len(changed)
+
+
+def recompute_streaks(user_ids, chunk_size=500):
+    """UserProfile.streak / longest_streak / last_session_date from the SessionRecord dates."""
+    return rebuild_streaks(user_ids, batch_size=chunk_size)
+
+
+def recompute_progress(user_ids, chunk_size=500):
+    """SessionRecord.progress re-derived from each stored report."""
+    today = timezone.localdate()
+    now = timezone.now()
+
+    for chunk in _chunks(user_ids, chunk_size):
+        changed = 0
+        by_alias = {}
+        for user_id in chunk:
+            by_alias.setdefault(shard_for(user_id), []).append(user_id)
+
+        touched = set()
+        for alias, alias_users in by_alias.items():
+            with transaction.atomic(using=alias):
+                rows = (
+                    SessionRecord.objects.using(alias)
+                    .filter(user_id__in=alias_users)
+                    .only("id", "user_id", "report", "progress")
+                )
+                stale = []
+                for record in rows.iterator(chunk_size=chunk_size):
+                    progress = report_progress(record.report)
+                    if record.progress != progress:
+                        record.progress = progress
+                        # new updated_at also retires the cached report HTML
+                        record.updated_at = now
+                        stale.append(record)
+                SessionRecord.objects.using(alias).bulk_update(
+                    stale, ["progress", "updated_at"], batch_size=chunk_size
+                )
+            touched.update(record.user_id for record in stale)
+            changed += len(stale)
+
+        for user_id in touched:
+            progress_charts.invalidate(user_id, today)
+        # calendar intensity comes from progress
+        for _ in activity_calendar.rebuild(touched):
+            pass
+        yield len(chunk), changed
+
+
+def run(job, user_ids, chunk_size=500):
+    return {
+        "points": recompute_points,
+        "streaks": recompute_streaks,
+        "progress": recompute_progress,
+    }[job](user_ids, chunk_size=chunk_size)
@@ -0,0 +1,408 @@
+"""
+Builds the JSON payload the today_session page plays through
+(physical / yoga / meditation lists with per-exercise steps), and scores the
+report it sends back.
+"""
+import json
+from functools import lru_cache
+
+# ✅ Exercise-specific steps dictionary
+EXERCISE_STEPS = {
+    # Physical Exercises - Beginner
+    "Push Ups": [
+        "Place hands shoulder-width apart on the floor",
+        "Keep your body in a straight line from head to heels",
+        "Lower your chest until elbows reach 90 degrees",
+        "Push back up while keeping core engaged",
+        "Breathe out as you push up, inhale going down"
+    ],
+    "Jumping Jacks": [
+        "Stand with feet together and arms at sides",
+        "Jump while spreading legs shoulder-width apart",
+        "Raise arms overhead simultaneously",
+        "Jump back to starting position",
+        "Maintain a steady rhythm and breathe naturally"
+    ],
+    "Wall Sit": [
+        "Stand with back against a wall",
+        "Slide down until thighs are parallel to ground",
+        "Keep knees directly above ankles",
+        "Hold position while breathing steadily",
+        "Press back firmly against the wall throughout"
+    ],
+    "High Knees": [
+        "Stand with feet hip-width apart",
+        "Lift one knee to hip level quickly",
+        "Alternate legs in a running motion",
+        "Pump arms naturally with the movement",
+        "Keep core tight and maintain quick pace"
+    ],
+    "Arm Circles": [
+        "Stand with arms extended straight out to sides",
+        "Make small circular motions forward",
+        "Gradually increase circle size",
+        "Reverse direction after half the time",
+        "Keep shoulders relaxed and core engaged"
+    ],
+    
+    # Physical Exercises - Intermediate
+    "Squats": [
+        "Stand with feet shoulder-width apart",
+        "Lower hips back and down as if sitting",
+        "Keep knees behind toes and chest up",
+        "Descend until thighs are parallel to floor",
+        "Push through heels to return to standing"
+    ],
+    "Lunges": [
+        "Step forward with one leg",
+        "Lower hips until both knees bend at 90 degrees",
+        "Keep front knee directly above ankle",
+        "Push back to starting position",
+        "Alternate legs and maintain upright posture"
+    ],
+    "Plank": [
+        "Start in push-up position on forearms",
+        "Keep body in straight line from head to heels",
+        "Engage core and squeeze glutes",
+        "Hold position without letting hips sag",
+        "Breathe steadily throughout the hold"
+    ],
+    "Mountain Climbers": [
+        "Start in high plank position",
+        "Drive one knee toward chest quickly",
+        "Quickly switch legs in running motion",
+        "Keep hips level and core tight",
+        "Maintain steady breathing rhythm"
+    ],
+    "Glute Bridges": [
+        "Lie on back with knees bent, feet flat",
+        "Lift hips toward ceiling by squeezing glutes",
+        "Form straight line from shoulders to knees",
+        "Hold at top for a moment",
+        "Lower hips slowly back to starting position"
+    ],
+    
+    # Physical Exercises - Advanced
+    "Burpees": [
+        "Start standing, then drop into squat position",
+        "Place hands on floor and jump feet back to plank",
+        "Perform a push-up",
+        "Jump feet back to squat position",
+        "Explode up into a jump with arms overhead"
+    ],
+    "Pull Ups": [
+        "Hang from bar with hands shoulder-width apart",
+        "Engage core and pull shoulder blades down",
+        "Pull body up until chin clears the bar",
+        "Control descent back to starting position",
+        "Avoid swinging or using momentum"
+    ],
+    "Handstand Push Ups": [
+        "Kick up into handstand against wall",
+        "Position hands shoulder-width apart",
+        "Lower head toward floor with control",
+        "Press back up to full arm extension",
+        "Keep core tight and body straight throughout"
+    ],
+    "Pistol Squats": [
+        "Stand on one leg with other leg extended forward",
+        "Lower down on standing leg into deep squat",
+        "Keep extended leg parallel to ground",
+        "Maintain balance with arms forward",
+        "Push through heel to return to standing"
+    ],
+    "Jump Squats": [
+        "Start in regular squat position",
+        "Explode upward into a jump",
+        "Extend fully through hips and knees",
+        "Land softly back into squat position",
+        "Immediately begin next repetition"
+    ],
+    
+    # Yoga - Beginner
+    "Mountain Pose": [
+        "Stand tall with feet together",
+        "Distribute weight evenly across both feet",
+        "Engage thighs and lift kneecaps",
+        "Lengthen spine and relax shoulders",
+        "Breathe deeply and hold with awareness"
+    ],
+    "Tree Pose": [
+        "Stand on one leg with firm foundation",
+        "Place other foot on inner thigh or calf",
+        "Bring hands to prayer position at chest",
+        "Find a focal point for balance",
+        "Hold steady while breathing calmly"
+    ],
+    "Child's Pose": [
+        "Kneel on floor with big toes touching",
+        "Sit back on heels and separate knees",
+        "Fold forward extending arms ahead",
+        "Rest forehead gently on the floor",
+        "Breathe deeply and relax completely"
+    ],
+    "Cat–Cow Pose": [
+        "Start on hands and knees in tabletop",
+        "Inhale, arch back and lift chest (Cow)",
+        "Exhale, round spine and tuck chin (Cat)",
+        "Flow smoothly between the two poses",
+        "Synchronize movement with breath"
+    ],
+    "Downward Dog": [
+        "Start on hands and knees",
+        "Lift hips up and back forming inverted V",
+        "Press hands firmly into the floor",
+        "Straighten legs and press heels toward floor",
+        "Hold while breathing deeply through nose"
+    ],
+    
+    # Yoga - Intermediate
+    "Warrior II": [
+        "Step feet wide apart, turn front foot out",
+        "Bend front knee to 90 degrees",
+        "Extend arms parallel to floor",
+        "Gaze over front fingertips",
+        "Hold with strength and steady breathing"
+    ],
+    "Triangle Pose": [
+        "Stand with feet wide, turn front foot out",
+        "Extend arms parallel to floor",
+        "Reach forward then lower hand to shin",
+        "Extend top arm toward ceiling",
+        "Gaze up at top hand and breathe deeply"
+    ],
+    "Cobra Pose": [
+        "Lie face down with hands under shoulders",
+        "Press palms down and lift chest off floor",
+        "Keep elbows slightly bent",
+        "Draw shoulders back and down",
+        "Hold while breathing into the chest"
+    ],
+    "Chair Pose": [
+        "Stand with feet together",
+        "Bend knees and lower hips as if sitting",
+        "Raise arms overhead beside ears",
+        "Keep weight in heels",
+        "Hold while engaging core and breathing"
+    ],
+    "Bridge Pose": [
+        "Lie on back with knees bent, feet flat",
+        "Press feet down and lift hips high",
+        "Interlace fingers under back",
+        "Roll shoulders under and lift chest",
+        "Hold while breathing into the chest"
+    ],
+    
+    # Yoga - Advanced
+    "Headstand": [
+        "Kneel and interlace fingers on floor",
+        "Place crown of head on floor in hand cradle",
+        "Straighten legs and walk feet toward head",
+        "Lift legs up slowly with control",
+        "Balance with core engaged, breathe steadily"
+    ],
+    "Crow Pose": [
+        "Squat with hands flat on floor",
+        "Place knees on backs of upper arms",
+        "Lean forward shifting weight to hands",
+        "Lift feet off floor one at a time",
+        "Balance on hands with core engaged"
+    ],
+    "Wheel Pose": [
+        "Lie on back with knees bent, feet flat",
+        "Place hands by ears, fingers toward shoulders",
+        "Press into hands and feet, lift body up",
+        "Straighten arms and create arch",
+        "Hold while breathing deeply and evenly"
+    ],
+    "King Pigeon Pose": [
+        "Start in low lunge position",
+        "Slide front shin forward parallel to mat edge",
+        "Lower back leg to floor",
+        "Bend back knee and reach for foot",
+        "Hold while breathing into the stretch"
+    ],
+    "Scorpion Pose": [
+        "Start in forearm plank position",
+        "Walk feet toward elbows",
+        "Lift one leg then the other overhead",
+        "Arch back and bend knees toward head",
+        "Balance with core strength and steady breath"
+    ],
+    
+    # Meditation - All levels
+    "Mindfulness Meditation": [
+        "Sit comfortably with spine straight",
+        "Close eyes and focus on natural breath",
+        "Notice thoughts without judgment",
+        "Gently return focus to breath when distracted",
+        "Continue for full duration with awareness"
+    ],
+    "Breathing Meditation": [
+        "Sit in comfortable position with eyes closed",
+        "Breathe in slowly through nose for 4 counts",
+        "Hold breath gently for 4 counts",
+        "Exhale slowly through mouth for 6 counts",
+        "Repeat cycle maintaining steady rhythm"
+    ],
+    "Gratitude Meditation": [
+        "Sit comfortably and close your eyes",
+        "Think of three things you're grateful for",
+        "Feel the emotion of gratitude deeply",
+        "Visualize each blessing in detail",
+        "End by sending gratitude to yourself"
+    ],
+    "Loving-Kindness Meditation": [
+        "Sit comfortably with eyes closed",
+        "Silently repeat: May I be happy and healthy",
+        "Extend wishes to loved ones",
+        "Extend to neutral people, then difficult people",
+        "End by sending love to all beings"
+    ],
+    "Visualization Meditation": [
+        "Sit or lie down comfortably",
+        "Close eyes and take deep breaths",
+        "Visualize a peaceful, safe place in detail",
+        "Engage all senses in the visualization",
+        "Stay present in this peaceful scene"
+    ],
+    "Walking Meditation": [
+        "Stand still and become aware of body",
+        "Walk slowly with full attention on each step",
+        "Notice lifting, moving, and placing of feet",
+        "Coordinate breath with steps",
+        "Maintain mindful awareness throughout"
+    ],
+    "Mantra Meditation": [
+        "Sit comfortably with spine straight",
+        "Choose a meaningful word or phrase",
+        "Repeat mantra silently with each breath",
+        "Let mantra flow naturally without force",
+        "Return to mantra when mind wanders"
+    ],
+    "Zen Meditation": [
+        "Sit in lotus or cross-legged position",
+        "Keep spine straight and hands in lap",
+        "Lower gaze to floor about 3 feet ahead",
+        "Count breaths from one to ten",
+        "Start over when reaching ten or losing count"
+    ],
+    "Transcendental Meditation": [
+        "Sit comfortably with eyes closed",
+        "Silently repeat your personal mantra",
+        "Let mantra come effortlessly",
+        "Allow thoughts to pass without engagement",
+        "Continue for full meditation period"
+    ],
+    "Chakra Meditation": [
+        "Sit comfortably with spine aligned",
+        "Visualize energy centers along spine",
+        "Focus on each chakra from root to crown",
+        "Breathe into each center with intention",
+        "Feel energy flowing freely through body"
+    ],
+}
+
+DEFAULT_STEPS = [
+    "Prepare your space and body",
+    "Begin with proper form and alignment",
+    "Maintain focus and controlled breathing",
+    "Complete the movement with intention",
+    "Rest and recover appropriately"
+]
+
+DESCRIPTIONS = {
+    "physical": "Perform {name} safely and with proper form.",
+    "yoga": "Practice {name} with mindful breathing and alignment.",
+    "meditation": "{name} helps calm your mind and center your awareness.",
+}
+
+CATEGORY_KEYS = {
+    "physical exercise": "physical",
+    "yoga": "yoga",
+    "meditation": "meditation",
+}
+
+
+# bump when compile_session's output changes shape; the step / description
+# tables below are part of compile_fingerprint() already
+COMPILE_VERSION = 1
+
+
+@lru_cache(maxsize=None)   # module constants: fixed for the life of the process
+def compile_fingerprint():
+    """Changes whenever compile_session would build a different payload for the same items."""
+    return json.dumps(
+        [COMPILE_VERSION, EXERCISE_STEPS, DEFAULT_STEPS, DESCRIPTIONS, CATEGORY_KEYS],
+        sort_keys=True,
+    )
+
+
+def compile_session(items):
+    """
+    items: dicts with name/category/value/unit, in plan (id) order.
+    Returns {"physical": [...], "yoga": [...], "meditation": [...]}.
+    """
+    payload = {key: [] for key in DESCRIPTIONS}
+
+    for item in items:
+        key = CATEGORY_KEYS.get(item["category"].lower())
+        if key is None:
+            continue
+
+        payload[key].append({
+            "name": item["name"],
+            "description": DESCRIPTIONS[key].format(name=item["name"]),
+            "value": item["value"],
+            "unit": item["unit"],
+            "steps": EXERCISE_STEPS.get(item["name"], DEFAULT_STEPS),
+        })
+
+    return payload
+
+
+# ✅ Progress of a saved report (server-truth-ish), stored as SessionRecord.progress
+def report_progress(report):
+    # If your backend stored "report" as dict already, great.
+    # If it stored as string, try parse.
+    if report is None:
+        return 0
+
+    if isinstance(report, str):
+        try:
+            report = json.loads(report)
+        except Exception:
+            return 0
+
+    physical = report.get("physical", []) if isinstance(report.get("physical", []), list) else []
+    yoga = report.get("yoga", []) if isinstance(report.get("yoga", []), list) else []
+    med = report.get("meditation", {}) if isinstance(report.get("meditation", {}), dict) else {}
+
+    # active categories = those present in report
+    active = []
+    if len(physical) > 0: active.append("physical")
+    if len(yoga) > 0: active.append("yoga")
+    # meditation present only if planned in session
+    if med and med.get("status") != "not_planned":
+        active.append("meditation")
+
+    if not active:
+        return 0
+
+    weight = 100 / len(active)
+
+    def ratio_done(lst):
+        if not lst:
+            return 0.0
+        done = sum(1 for x in lst if x.get("status") == "completed")
+        return done / len(lst)
+
+    prog = 0.0
+    if "physical" in active:
+        prog += ratio_done(physical) * weight
+    if "yoga" in active:
+        prog += ratio_done(yoga) * weight
+    if "meditation" in active:
+        prog += (1.0 if med.get("status") == "completed" else 0.0) * weight
+
+    return max(0, min(int(round(prog)), 100))
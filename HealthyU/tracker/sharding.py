@@ -0,0 +1,90 @@
+"""
+Optional horizontal partitioning of per-user history tables.
+
+With HEALTHYU_SHARDS=N, SessionRecord and PointsTransaction rows live in
+N database aliases (shard0..shardN-1) picked by a hash of the user id.
+Views keep filtering by request.user; ShardMiddleware puts the current
+user's shard in a context variable that ShardRouter uses for queries that
+carry no instance hint.
+"""
+import zlib
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+
+SHARDED_MODELS = {("tracker", "sessionrecord"), ("tracker", "pointstransaction")}
+
+# shard alias of the user the current request acts for
+current_shard = ContextVar("current_shard", default=None)
+
+
+def shard_aliases():
+    return [f"shard{i}" for i in range(getattr(settings, "SHARD_COUNT", 0))]
+
+
+def sharding_enabled():
+    return bool(shard_aliases())
+
+
+def is_sharded(model):
+    # model class or instance (request.user is a lazy proxy, so no type() here)
+    return (model._meta.app_label, model._meta.model_name) in SHARDED_MODELS
+
+
+def shard_for(user_id):
+    aliases = shard_aliases()
+    if not aliases:
+        return "default"
+    return aliases[zlib.crc32(str(user_id).encode()) % len(aliases)]
+
+
+def aliases_for(model):
+    """Every alias that can hold rows of the model (for jobs that scan all users)."""
+    if sharding_enabled() and is_sharded(model):
+        return shard_aliases()
+    return ["default"]
+
+
+def user_atomic(user_id):
+    """Transaction on the user's shard (no-op when sharding is off)."""
+    alias = shard_for(user_id)
+    return nullcontext() if alias == "default" else transaction.atomic(using=alias)
+
+
+class ShardRouter:
+    def _alias(self, model, hints):
+        if not sharding_enabled():
+            return None
+
+        instance = hints.get("instance")
+        if not is_sharded(model):
+            # e.g. record.user: Django would otherwise follow the record into its shard
+            if instance is not None and is_sharded(instance):
+                return "default"
+            return None
+
+        if instance is not None:
+            if is_sharded(instance) and instance.user_id is not None:
+                return shard_for(instance.user_id)
+            if instance._meta.label_lower == settings.AUTH_USER_MODEL.lower():
+                return shard_for(instance.pk)
+
+        return current_shard.get()
+
+    def db_for_read(self, model, **hints):
+        return self._alias(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._alias(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if sharding_enabled() and (is_sharded(obj1) or is_sharded(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db.startswith("shard"):
+            return (app_label, model_name) in SHARDED_MODELS
+        return None
@@ -1,9 +1,27 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from . import page_cache
+from .models import ChallengeMaster, PointsTransaction, SessionRecord, UserProfile
+from .sharding import shard_for, sharding_enabled
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+
+
+@receiver(pre_delete, sender=User)
+def delete_sharded_rows(sender, instance, **kwargs):
+    # the delete collector only cascades inside the user's own database
+    if sharding_enabled():
+        alias = shard_for(instance.pk)
+        SessionRecord.objects.using(alias).filter(user_id=instance.pk).delete()
+        PointsTransaction.objects.using(alias).filter(user_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=ChallengeMaster)
+@receiver(post_delete, sender=ChallengeMaster)
+def invalidate_public_pages(sender, **kwargs):
+    # cached guest pages embed the challenge of the day
+    page_cache.invalidate()
@@ -0,0 +1,31 @@
+// tracker/static/tracker/js/components/live_updates.js
+// Live points / streak / leaderboard over Server-Sent Events (replaces refreshing).
+
+function connectLiveUpdates(handlers) {
+  if (!window.EventSource) return null;
+
+  const source = new EventSource("/live/");
+
+  source.addEventListener("profile", (e) => {
+    const data = JSON.parse(e.data);
+
+    // navbar badges are on every page
+    const navPoints = document.getElementById("navPoints");
+    const navStreak = document.getElementById("navStreak");
+    if (navPoints) navPoints.textContent = data.points;
+    if (navStreak) navStreak.textContent = data.streak;
+
+    if (handlers.profile) handlers.profile(data);
+  });
+
+  source.addEventListener("leaderboard", (e) => {
+    if (handlers.leaderboard) handlers.leaderboard(JSON.parse(e.data));
+  });
+
+  // server refused (e.g. not running under ASGI) -> stay on the static page
+  source.onerror = () => {
+    if (source.readyState === EventSource.CLOSED) source.close();
+  };
+
+  return source;
+}
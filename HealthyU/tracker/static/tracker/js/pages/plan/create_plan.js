@@ -2,6 +2,9 @@
 
 let selectedPlan = []; // { key, name, category, value, unit, min, max }
 
+// inputs without a max attribute: the server's freq bound (PLAN_VALUE_BOUNDS in views.py)
+const DEFAULT_MAX = 50;
+
 document.addEventListener("DOMContentLoaded", () => {
 
   // ---------- View Details (delegation: works for all cards incl. extras) ----------
@@ -26,7 +29,7 @@ document.addEventListener("DOMContentLoaded", () => {
     if (!input) return;
 
     const min = input.min ? parseInt(input.min) : 1;
-    const max = input.max ? parseInt(input.max) : 999999;
+    const max = input.max ? parseInt(input.max) : DEFAULT_MAX;
 
     let val = parseInt(input.value || "0");
     val = e.target.classList.contains("plus") ? val + 1 : val - 1;
@@ -61,7 +64,7 @@ document.addEventListener("DOMContentLoaded", () => {
     const unit = card.querySelector(".time-input") ? "min" : "freq";
 
     const min = input?.min ? parseInt(input.min) : 1;
-    const max = input?.max ? parseInt(input.max) : 999999;
+    const max = input?.max ? parseInt(input.max) : DEFAULT_MAX;
 
     const key = `${name}__${category}`;
     const already = selectedPlan.findIndex(x => x.key === key);
@@ -145,6 +148,19 @@ document.addEventListener("DOMContentLoaded", () => {
 
         const data = await res.json();
 
+        // still being written on the server -> don't let the user submit again
+        if (res.status === 202) {
+          alert("⏳ " + data.message);
+          window.location.href = "/profile/";
+          return;
+        }
+
+        // server rejected the plan (validation) -> keep the modal open
+        if (!res.ok || data.status !== "ok") {
+          alert("❌ " + data.message);
+          return;
+        }
+
         // close modal
         const modalEl = document.getElementById("planModal");
         bootstrap.Modal.getInstance(modalEl).hide();
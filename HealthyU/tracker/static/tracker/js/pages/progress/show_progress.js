@@ -1,6 +1,13 @@
 async function loadProgress() {
-  const res = await fetch(PROGRESS_DATA_URL, { headers: { "Accept": "application/json" } });
-  const data = await res.json();
+  // the page embeds the payload; only fetch it when it's missing
+  const embedded = document.getElementById("progressPayload");
+  let data;
+  if (embedded) {
+    data = JSON.parse(embedded.textContent);
+  } else {
+    const res = await fetch(PROGRESS_DATA_URL, { headers: { "Accept": "application/json" } });
+    data = await res.json();
+  }
 
   // Daily (30 days): line chart progress + points (2 traces)
   Plotly.newPlot("dailyChart", [
@@ -0,0 +1,11 @@
+// tracker/static/tracker/js/pages/rewards/points.js
+
+document.addEventListener("DOMContentLoaded", () => {
+  const total = document.querySelector(".ph-points");
+
+  connectLiveUpdates({
+    profile: (data) => {
+      if (total) total.textContent = `Total: ${data.points} pts`;
+    },
+  });
+});
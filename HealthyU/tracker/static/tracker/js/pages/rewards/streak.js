@@ -0,0 +1,37 @@
+// tracker/static/tracker/js/pages/rewards/streak.js
+
+document.addEventListener("DOMContentLoaded", () => {
+  const list = document.querySelector(".leaderboard-list");
+  if (!list) return;   // empty state: next page load renders the list
+
+  connectLiveUpdates({
+    leaderboard: (board) => {
+      list.innerHTML = "";
+
+      board.forEach((p) => {
+        const item = document.createElement("div");
+        item.className = `leaderboard-item rank-${p.rank}`;
+        item.innerHTML = `
+          <div class="rank-badge ${p.rank > 3 ? "default" : ""}"></div>
+          <div class="user-info">
+            <div class="user-name"></div>
+            <div class="user-points"></div>
+          </div>
+          <div class="streak-badge">
+            <span class="streak-icon">🔥</span>
+            <span class="streak-value"></span>
+          </div>
+        `;
+
+        // user-provided text -> textContent, never innerHTML
+        item.querySelector(".rank-badge").textContent = p.rank;
+        // the broadcast carries public fields only (no names / emails)
+        item.querySelector(".user-name").textContent = p.username;
+        item.querySelector(".user-points").textContent = `${p.points} points`;
+        item.querySelector(".streak-value").textContent = p.streak;
+
+        list.appendChild(item);
+      });
+    },
+  });
+});
@@ -0,0 +1,52 @@
+"""
+Static files pipeline: content-hashed names (ManifestStaticFilesStorage) plus
+precompressed .gz / .br siblings written at collectstatic time, so neither
+Django nor the front-end server compresses assets per request.
+
+Brotli is optional: without the `brotli` package only .gz files are written.
+"""
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg", ".html", ".json", ".txt", ".map")
+MIN_COMPRESS_BYTES = 512
+
+
+def compressed_variants(content):
+    """Yields (suffix, data) for each encoding that actually saves bytes."""
+    encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+
+    for suffix, encode in encoders:
+        data = encode(content)
+        if len(data) < len(content):
+            yield suffix, data
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        # templates only ever link to the hashed names
+        for name in list(self.hashed_files.values()):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as f:
+                content = f.read()
+            if len(content) < MIN_COMPRESS_BYTES:
+                continue
+
+            for suffix, data in compressed_variants(content):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(data))
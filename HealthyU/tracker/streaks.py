@@ -0,0 +1,92 @@
+"""
+Streak engine: current and longest streak per user from SessionRecord dates.
+
+_save_session keeps UserProfile.streak / longest_streak up to date one
+session at a time; rebuild() recomputes them for every user (or a given
+set) after data fixes. Users are taken in user_id ranges; each range is one
+query per database ordered by (user_id, date), merged across shards, and
+each user's dates are run-length encoded in the same pass: a run continues
+while the next date is the day after the previous one.
+
+The current streak is the run ending at the user's last session, the value
+_save_session would have stored.
+"""
+import heapq
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+
+from .models import SessionRecord, UserProfile
+from .sharding import aliases_for
+
+ONE_DAY = timedelta(days=1)
+PROFILE_FIELDS = ["streak", "longest_streak", "last_session_date"]
+
+
+def run_lengths(dates):
+    """(current, longest, last_date) for dates in ascending order."""
+    current = longest = 0
+    last = None
+    for day in dates:
+        current = current + 1 if last is not None and day - last == ONE_DAY else 1
+        longest = max(longest, current)
+        last = day
+    return current, longest, last
+
+
+def _streaks_in_range(first, last, user_ids=None):
+    streams = []
+    for alias in aliases_for(SessionRecord):
+        qs = SessionRecord.objects.using(alias).filter(user_id__gte=first, user_id__lte=last)
+        if user_ids is not None:
+            qs = qs.filter(user_id__in=user_ids)
+        streams.append(qs.order_by("user_id", "date").values_list("user_id", "date"))
+
+    # users never span databases, so merging keeps each user's dates together
+    return {
+        user_id: run_lengths(day for _, day in rows)
+        for user_id, rows in groupby(heapq.merge(*streams), key=itemgetter(0))
+    }
+
+
+def _profile_batches(user_ids, batch_size):
+    if user_ids is not None:
+        user_ids = sorted(set(user_ids))
+        for start in range(0, len(user_ids), batch_size):
+            chunk = user_ids[start:start + batch_size]
+            yield chunk, UserProfile.objects.filter(user_id__in=chunk)
+        return
+
+    last = 0
+    while True:
+        chunk = list(
+            UserProfile.objects
+            .filter(user_id__gt=last)
+            .order_by("user_id")
+            .values_list("user_id", flat=True)[:batch_size]
+        )
+        if not chunk:
+            return
+        yield None, UserProfile.objects.filter(user_id__gte=chunk[0], user_id__lte=chunk[-1])
+        last = chunk[-1]
+
+
+def rebuild(user_ids=None, batch_size=1000):
+    """Yields (users, changed) per batch; user_ids=None means everyone."""
+    for chunk, profiles in _profile_batches(user_ids, batch_size):
+        with transaction.atomic():
+            profiles = list(profiles.select_for_update().order_by("user_id"))
+            if not profiles:
+                continue
+            streaks = _streaks_in_range(profiles[0].user_id, profiles[-1].user_id, chunk)
+
+            changed = []
+            for profile in profiles:
+                values = streaks.get(profile.user_id, (0, 0, None))
+                if tuple(getattr(profile, f) for f in PROFILE_FIELDS) != values:
+                    profile.streak, profile.longest_streak, profile.last_session_date = values
+                    changed.append(profile)
+            UserProfile.objects.bulk_update(changed, PROFILE_FIELDS)
+        yield len(profiles), len(changed)
@@ -1,3 +1,1122 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.db.models.functions import Lower
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings,
+)
+from django.utils import timezone
+
+from . import (
+    activity_calendar, health_analytics, health_compaction, health_ingest, page_cache, plan_templates, progress_charts,
+    session_payload, streaks,
+)
+from .admin import EstimatedCountPaginator, ShardListFilter, estimated_row_count
+from . import async_views
+from .async_views import _event_stream
+from .live_updates import LiveBus, bus, format_event, leaderboard_snapshot
+from .middleware import STICKY_COOKIE, ShardMiddleware, StaticExportMiddleware
+from .models import (
+    ActivityYear, CHALLENGE_SERIES_DAYS, ChallengeMaster, DailyExerciseChallenge, ExercisePlan, PhysicalHealth,
+    PhysicalHealthSummary, PlanItem, PlanTemplate, PointsTransaction, SessionRecord, UserChallengeSummary, UserProfile,
+)
+from .provisioning import find_username, provision_users
+from .sharding import ShardRouter, current_shard, shard_aliases, shard_for
+from .views import _save_session, challenge_for_day
+from .write_queue import WriteCoordinator, WriteQueueFull, WriteTimeout, writer
+
+
+# default plus the shards (not "__all__": a replica mirror can't see the test transaction)
+SHARDED_DATABASES = {"default", *shard_aliases()}
+
+
+# write units run on the test's own connection: under the production profile
+# (SQLITE_WRITE_QUEUE on) the writer thread would wait on the test transaction
+inline_writes = override_settings(SQLITE_WRITE_QUEUE=False)
+
+
+def create_session(user, **fields):
+    """SessionRecord on the user's shard (outside a request nothing sets current_shard)."""
+    return SessionRecord.objects.using(shard_for(user.pk)).create(user=user, **fields)
+
+
+# ---------------- SHARDING ----------------
+@override_settings(SHARD_COUNT=2)
+class ShardRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ShardRouter()
+
+    def test_shard_for_is_stable_and_in_range(self):
+        self.assertEqual(shard_aliases(), ["shard0", "shard1"])
+        for user_id in range(1, 50):
+            self.assertIn(shard_for(user_id), shard_aliases())
+            self.assertEqual(shard_for(user_id), shard_for(user_id))
+        # both shards get users
+        self.assertEqual({shard_for(user_id) for user_id in range(1, 50)}, set(shard_aliases()))
+
+    def test_off_means_default(self):
+        with self.settings(SHARD_COUNT=0):
+            self.assertEqual(shard_for(7), "default")
+            self.assertIsNone(self.router.db_for_read(SessionRecord, instance=SessionRecord(user_id=7)))
+
+    def test_instance_hint_picks_the_owners_shard(self):
+        record = SessionRecord(user_id=7)
+        self.assertEqual(self.router.db_for_write(SessionRecord, instance=record), shard_for(7))
+        self.assertEqual(self.router.db_for_read(PointsTransaction, instance=User(pk=7)), shard_for(7))
+
+    def test_user_of_a_sharded_row_is_read_from_default(self):
+        self.assertEqual(self.router.db_for_read(User, instance=SessionRecord(user_id=7)), "default")
+        self.assertIsNone(self.router.db_for_read(UserProfile))
+
+    def test_unhinted_queries_use_the_current_shard(self):
+        self.assertIsNone(self.router.db_for_read(SessionRecord))
+        token = current_shard.set("shard1")
+        try:
+            self.assertEqual(self.router.db_for_read(SessionRecord), "shard1")
+        finally:
+            current_shard.reset(token)
+
+    def test_shards_only_get_the_sharded_tables(self):
+        self.assertTrue(self.router.allow_migrate("shard0", "tracker", "sessionrecord"))
+        self.assertTrue(self.router.allow_migrate("shard1", "tracker", "pointstransaction"))
+        self.assertFalse(self.router.allow_migrate("shard0", "tracker", "userprofile"))
+        self.assertFalse(self.router.allow_migrate("shard0", "auth", "user"))
+        self.assertIsNone(self.router.allow_migrate("default", "tracker", "sessionrecord"))
+
+    def test_middleware_sets_the_request_users_shard(self):
+        seen = []
+        middleware = ShardMiddleware(lambda request: seen.append(current_shard.get()))
+        request = RequestFactory().get("/")
+        request.user = User(pk=7)
+        middleware(request)
+        self.assertEqual(seen, [shard_for(7)])
+        self.assertIsNone(current_shard.get())
+
+    def test_admin_reads_an_explicit_shard(self):
+        model_admin = site._registry[SessionRecord]
+        factory = RequestFactory()
+        user_id = next(i for i in range(1, 50) if shard_for(i) == "shard1")
+
+        self.assertEqual(model_admin.get_shard(factory.get("/")), "shard0")
+        self.assertEqual(model_admin.get_shard(factory.get("/", {"shard": "shard1"})), "shard1")
+        self.assertEqual(model_admin.get_shard(factory.get("/", {"q": str(user_id)})), "shard1")
+        # change form opened from a filtered changelist
+        request = factory.get("/", {"_changelist_filters": "shard=shard1"})
+        self.assertEqual(model_admin.get_shard(request), "shard1")
+
+    def test_admin_shard_filter_links_every_shard(self):
+        model_admin = site._registry[SessionRecord]
+        request = RequestFactory().get("/")
+        shard_filter = ShardListFilter(request, {}, SessionRecord, model_admin)
+        changelist = mock.Mock(root_queryset=SessionRecord.objects.using("shard1"))
+        changelist.get_query_string.side_effect = lambda params: f"?shard={params['shard']}"
+
+        self.assertEqual(
+            [(c["display"], c["selected"], c["query_string"]) for c in shard_filter.choices(changelist)],
+            [("shard0", False, "?shard=shard0"), ("shard1", True, "?shard=shard1")],
+        )
+        self.assertEqual(model_admin.get_list_filter(request)[0], ShardListFilter)
+        # no auth_user on a shard: no JOIN, the raw user id is listed
+        self.assertEqual(model_admin.get_list_select_related(request), ())
+        self.assertEqual(model_admin.get_list_display(request)[0], "user_id")
+
+
+@unittest.skipUnless(settings.SHARD_COUNT >= 2, "needs HEALTHYU_SHARDS=2 or more")
+class ShardRebalanceTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def test_rebalance_moves_rows_to_the_owners_shard(self):
+        users = [User.objects.create_user(f"user{n}") for n in range(6)]
+        day = datetime.date(2026, 3, 1)
+        for user in users:
+            # written before sharding was on: everything in default
+            SessionRecord.objects.using("default").create(user=user, date=day, report={})
+            PointsTransaction.objects.using("default").create(user=user, points=5, source="session")
+
+        call_command("rebalance_shards", stdout=io.StringIO())
+
+        self.assertFalse(SessionRecord.objects.using("default").exists())
+        self.assertFalse(PointsTransaction.objects.using("default").exists())
+        for user in users:
+            alias = shard_for(user.pk)
+            self.assertEqual(SessionRecord.objects.using(alias).filter(user=user).count(), 1)
+            self.assertEqual(PointsTransaction.objects.using(alias).filter(user=user).count(), 1)
+
+
+# ---------------- PLAN TEMPLATES ----------------
+@inline_writes
+class PlanTemplateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("adopter")
+        self.template = plan_templates.get_template("beginner")
+        plan_templates.adopt_template(self.user, self.template)
+
+    def test_new_row_is_compiled_up_front(self):
+        self.assertEqual(
+            self.template.compiled_session,
+            session_payload.compile_session(plan_templates.PLAN_TEMPLATES["beginner"]["items"]),
+        )
+
+    def test_changed_items_refresh_the_slugs_row(self):
+        spec = plan_templates.PLAN_TEMPLATES["beginner"]
+        items = spec["items"] + [plan_templates._item("Plank", "Physical Exercise", 1, "freq")]
+        with mock.patch.dict(plan_templates.PLAN_TEMPLATES, {"beginner": {**spec, "items": items}}):
+            template = plan_templates.get_template("beginner")
+
+        self.assertEqual(template.pk, self.template.pk)
+        self.assertEqual(template.items, items)
+        self.assertEqual(template.content_hash, plan_templates.content_hash(items))
+        self.assertEqual(template.compiled_session, session_payload.compile_session(items))
+        # the adopter's plan still has the old items
+        self.assertIsNone(ExercisePlan.objects.get(user=self.user).template_id)
+
+    def test_compiler_change_recompiles_the_stored_payload(self):
+        session_payload.compile_fingerprint.cache_clear()
+        self.addCleanup(session_payload.compile_fingerprint.cache_clear)
+        steps = {**session_payload.EXERCISE_STEPS, "Push Ups": ["Just push"]}
+        with mock.patch.object(session_payload, "EXERCISE_STEPS", steps):
+            stale = PlanTemplate.objects.get(slug="beginner")
+            # the read path compiles a stale row in memory and writes nothing
+            with self.assertNumQueries(0):
+                payload = plan_templates.compiled_template_session(stale)
+            template = plan_templates.get_template("beginner")
+
+        for session in (payload, PlanTemplate.objects.get(pk=template.pk).compiled_session):
+            push_ups = next(e for e in session["physical"] if e["name"] == "Push Ups")
+            self.assertEqual(push_ups["steps"], ["Just push"])
+        self.assertEqual(ExercisePlan.objects.get(user=self.user).template_id, template.pk)
+
+    def test_adopt_view_goes_through_the_writer(self):
+        adopter = User.objects.create_user("clicker", password="pw")
+        self.client.force_login(adopter)
+        with mock.patch.object(writer, "submit", wraps=writer.submit) as submit:
+            response = self.client.post("/workout-plans/beginner/adopt/")
+
+        self.assertRedirects(response, "/view-plan/", fetch_redirect_response=False)
+        self.assertEqual(submit.call_count, 1)
+        self.assertEqual(ExercisePlan.objects.get(user=adopter).template_id, self.template.pk)
+
+    def test_hand_built_copy_links_the_template(self):
+        # what create_plan.js posts: yoga cards use .frequency-input, meditation .time-input
+        items = [
+            {"name": "Jumping Jacks", "category": "Physical Exercise", "value": 2, "unit": "freq"},
+            {"name": "Push Ups", "category": "Physical Exercise", "value": 2, "unit": "freq"},
+            {"name": "Wall Sit", "category": "Physical Exercise", "value": 1, "unit": "freq"},
+            {"name": "Mountain Pose", "category": "Yoga", "value": 5, "unit": "freq"},
+            {"name": "Child's Pose", "category": "Yoga", "value": 5, "unit": "freq"},
+            {"name": "Breathing Meditation", "category": "Meditation", "value": 5, "unit": "min"},
+        ]
+        builder = User.objects.create_user("builder", password="pw")
+        self.client.force_login(builder)
+        response = self.client.post("/save-plan/", json.dumps({"items": items}), content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ExercisePlan.objects.get(user=builder).template_id, self.template.pk)
+
+
+# ---------------- WRITE QUEUE ----------------
+@override_settings(SQLITE_WRITE_QUEUE=True)
+class WriteQueueTests(TransactionTestCase):
+    def setUp(self):
+        self.writer = WriteCoordinator(result_timeout=0.2)
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _block(self, started):
+        started.set()
+        self.release.wait(5)
+
+    def _start_blocking_unit(self):
+        """Occupies the writer thread until self.release is set."""
+        started = threading.Event()
+
+        def submit():
+            try:
+                self.writer.submit(self._block, started)
+            except WriteTimeout:
+                pass
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        self.addCleanup(thread.join)
+        started.wait(5)
+        return started
+
+    def test_results_and_errors_reach_the_caller(self):
+        self.assertEqual(self.writer.submit(lambda a, b: a + b, 2, b=3), 5)
+
+        def fails():
+            User.objects.create_user("rolled-back")
+            raise ValueError("boom")
+
+        with self.assertRaisesMessage(ValueError, "boom"):
+            self.writer.submit(fails)
+        # the unit's transaction was rolled back
+        self.assertFalse(User.objects.filter(username="rolled-back").exists())
+        self.assertEqual(self.writer.metrics()["failed"], 1)
+
+    def test_timeout_while_running(self):
+        started = threading.Event()
+        with self.assertRaises(WriteTimeout) as raised:
+            self.writer.submit(self._block, started)
+        self.assertTrue(started.is_set())
+        self.assertTrue(raised.exception.started)
+        self.assertEqual(self.writer.metrics()["timed_out"], 1)
+
+    def test_timeout_while_queued_cancels_the_unit(self):
+        self._start_blocking_unit()
+        ran = []
+        with self.assertRaises(WriteTimeout) as raised:
+            self.writer.submit(ran.append, "queued")
+        self.assertFalse(raised.exception.started)
+
+        self.release.set()
+        self.writer.submit(ran.append, "next")   # FIFO: the cancelled unit came first
+        self.assertEqual(ran, ["next"])
+
+
+class WriteTimeoutResponseTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("planner", password="pw")
+        self.client.force_login(self.user)
+        self.body = json.dumps({"items": [
+            {"name": "Squats", "category": "Physical Exercise", "value": 3, "unit": "freq"},
+        ]})
+
+    def _save_plan(self, started):
+        with mock.patch.object(writer, "submit", side_effect=WriteTimeout(started=started)):
+            return self.client.post("/save-plan/", self.body, content_type="application/json")
+
+    def test_running_unit_answers_still_saving(self):
+        response = self._save_plan(started=True)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["reason"], "saving")
+
+    def test_cancelled_unit_answers_busy(self):
+        response = self._save_plan(started=False)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["reason"], "busy")
+
+
+# ---------------- SESSION REPORT CACHING ----------------
+class SessionReportCachingTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def setUp(self):
+        self.user = User.objects.create_user("reporter", password="pw")
+        self.client.force_login(self.user)
+        self.day = timezone.localdate() - datetime.timedelta(days=3)
+        self.record = create_session(
+            self.user, date=self.day, report={"yoga": [{"status": "completed"}]}
+        )
+        self.url = f"/session-report/{self.day.isoformat()}/"
+
+    def test_past_day_is_revalidated_not_immutable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["Cache-Control"], "private, max-age=300")
+        self.assertIn("Last-Modified", response)
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_rewritten_record_gets_a_new_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.record.report = {"yoga": [{"status": "skipped"}]}
+        self.record.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+# ---------------- PROGRESS CHARTS ----------------
+class ProgressChartRenderTests(SimpleTestCase):
+    labels = ["2026-03-01", "2026-03-02", "2026-03-03", "2026-03-04"]
+
+    def _points(self, svg):
+        points = re.search(r'<polyline class="line series-progress" points="([^"]*)"', svg).group(1)
+        return [tuple(map(float, point.split(","))) for point in points.split()]
+
+    def test_one_point_per_day_clamped_to_the_plot(self):
+        svg = progress_charts.line_chart(
+            "Daily", self.labels, [("Progress (%)", [50, 150, -10, 100], "series-progress")],
+        )
+        points = self._points(svg)
+        top, bottom = progress_charts._y(100), progress_charts._y(0)
+
+        self.assertEqual(len(points), len(self.labels))
+        self.assertEqual([y for _, y in points], [progress_charts._y(50), top, bottom, top])
+        # 100 and 0 are the plot's edges
+        self.assertEqual((top, bottom), (progress_charts.PAD_TOP, progress_charts.HEIGHT - progress_charts.PAD_BOTTOM))
+        self.assertEqual(svg.count('<circle class="dot series-progress"'), len(self.labels))
+
+    def test_bars_stay_inside_the_plot(self):
+        svg = progress_charts.bar_chart("Weekly", self.labels, [0, 40, 250, -5], "Avg")
+        heights = [float(h) for h in re.findall(r'<rect class="bar" [^>]*height="([^"]+)"', svg)]
+        full = progress_charts._y(0) - progress_charts._y(100)
+        self.assertEqual(heights, [0.0, round(full * 0.4, 1), full, 0.0])
+
+
+@inline_writes
+class ProgressChartCacheTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def test_saved_session_drops_the_cached_charts(self):
+        user = User.objects.create_user("charted")
+        key = progress_charts.cache_key(user.pk, timezone.localdate())
+        cache.set(key, {"daily": "<svg/>"})
+        self.addCleanup(cache.delete, key)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.submit(_save_session, user, {"yoga": [{"status": "completed"}]}, 100, 50)
+
+        self.assertIsNone(cache.get(key))
+
+
+# ---------------- PAGE CACHE ----------------
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def _key(self):
+        return page_cache.page_key(RequestFactory().get("/"), cache.get(page_cache.GENERATION_KEY, 0))
+
+    def test_expired_page_is_served_stale_while_it_is_re_rendered(self):
+        self.assertNotIn("X-Page-Cache", self.client.get("/"))
+        self.assertEqual(self.client.get("/")["X-Page-Cache"], "hit")
+
+        # another request holds the render lock for the expired page
+        cache.add(page_cache.lock_key(self._key()), 1, None)
+        with mock.patch.object(page_cache.time, "time", return_value=page_cache.time.time() + 301):
+            response = self.client.get("/")
+        self.assertEqual(response["X-Page-Cache"], "stale")
+
+    def test_cold_key_waits_at_most_wait_timeout(self):
+        cache.add(page_cache.lock_key(self._key()), 1, None)
+        with mock.patch.object(page_cache, "WAIT_TIMEOUT", 0.05):
+            response = self.client.get("/")
+        # rendered itself after the short wait
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Page-Cache", response)
+
+
+# ---------------- STATIC EXPORT ----------------
+class StaticExportTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / "workout-plans").mkdir()
+        (self.root / "workout-plans" / "index.html").write_text("exported")
+
+    def _get(self):
+        middleware = StaticExportMiddleware(lambda request: None)
+        return middleware(RequestFactory().get("/workout-plans/"))
+
+    def test_export_is_not_served_by_default(self):
+        with self.settings(STATIC_EXPORT_ROOT=self.root, SERVE_STATIC_EXPORT=False):
+            self.assertIsNone(self._get())
+
+    def test_export_is_served_when_enabled(self):
+        with self.settings(STATIC_EXPORT_ROOT=self.root, SERVE_STATIC_EXPORT=True):
+            self.assertEqual(self._get().content, b"exported")
+
+
+# ---------------- PLAN VALIDATION ----------------
+@inline_writes
+class PlanValueBoundsTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("bounded", password="pw"))
+
+    def _save(self, value, unit):
+        category = "Physical Exercise" if unit == "freq" else "Yoga"
+        body = json.dumps({"items": [{"name": "Squats", "category": category, "value": value, "unit": unit}]})
+        return self.client.post("/save-plan/", body, content_type="application/json")
+
+    def test_bounds_are_per_unit(self):
+        self.assertEqual(self._save(51, "freq").status_code, 400)
+        self.assertEqual(self._save(120, "min").status_code, 200)
+
+    def test_create_plan_inputs_carry_the_freq_bounds(self):
+        response = self.client.get("/create-plan/")
+        self.assertContains(response, 'min="1" max="50"')
+        self.assertNotContains(response, "{{ freq_max }}")
+
+
+# ---------------- ACCOUNTS ----------------
+class EmailCaseTests(TestCase):
+    password = "Secret1!"
+
+    def _signup(self, email):
+        return self.client.post("/signup/", {
+            "first_name": "Ann", "last_name": "Lee", "email": email,
+            "password": self.password, "dob": "1990-01-01",
+        })
+
+    def test_signup_stores_the_lower_cased_email_and_login_accepts_any_case(self):
+        self._signup("  Ann.Lee@Example.COM ")
+        user = User.objects.get()
+        self.assertEqual((user.username, user.email), ("ann.lee@example.com", "ann.lee@example.com"))
+
+        response = self.client.post("/login/", {"email": "ANN.LEE@example.com", "password": self.password})
+        self.assertRedirects(response, "/profile/", fetch_redirect_response=False)
+
+    def test_older_mixed_case_account_matches(self):
+        User.objects.create_user("Old@Example.com", "Old@Example.com", self.password)
+
+        self._signup("old@example.com")
+        self.assertEqual(User.objects.count(), 1)
+
+        response = self.client.post("/login/", {"email": "old@example.com", "password": self.password})
+        self.assertRedirects(response, "/profile/", fetch_redirect_response=False)
+
+        created, skipped = next(provision_users([{"email": "OLD@example.com"}], workers=1))
+        self.assertEqual((created, skipped), (0, 1))
+
+    def test_find_username_tries_the_exact_username_first(self):
+        User.objects.create_user("new@example.com")
+        User.objects.create_user("Old@Example.com")
+
+        with self.assertNumQueries(1):
+            self.assertEqual(find_username("NEW@example.com"), "new@example.com")
+        with self.assertNumQueries(2):
+            self.assertEqual(find_username("old@example.com"), "Old@Example.com")
+        self.assertIsNone(find_username("nobody@example.com"))
+
+    def test_case_insensitive_lookup_uses_the_lower_username_index(self):
+        query = User.objects.annotate(lower_username=Lower("username")).filter(lower_username="a@example.com")
+        sql, params = query.values_list("username", flat=True).query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("tracker_auth_user_lower_username", plan)
+
+
+# ---------------- CHALLENGES ----------------
+class ChallengeOfTheDayTests(TestCase):
+    def setUp(self):
+        for day in range(1, 11):
+            ChallengeMaster.objects.create(day_number=day, title=f"Challenge {day}")
+
+    def test_page_shows_the_series_challenge_for_the_local_date(self):
+        today = timezone.localdate()
+        expected = challenge_for_day(list(ChallengeMaster.objects.order_by("day_number")), today)
+
+        response = self.client.get("/challenges/")
+        self.assertEqual(response.context["challenge"]["id"], expected.id)
+
+    def test_catalogue_cycles_one_per_day(self):
+        catalogue = list(ChallengeMaster.objects.order_by("day_number"))
+        day = datetime.date(2026, 1, 1)
+        picks = [challenge_for_day(catalogue, day + datetime.timedelta(days=n)) for n in range(10)]
+        self.assertEqual(sorted(c.day_number for c in picks), list(range(1, 11)))
+
+
+@inline_writes
+class ChallengeCompletionTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def setUp(self):
+        self.user = User.objects.create_user("finisher", password="pw")
+        self.client.force_login(self.user)
+        self.challenge = ChallengeMaster.objects.create(day_number=1, title="Plank", reward_points=50)
+        self.url = f"/challenges/{self.challenge.pk}/complete/"
+
+    def _ledger(self):
+        return PointsTransaction.objects.using(shard_for(self.user.pk)).filter(user=self.user)
+
+    def test_completion_writes_ledger_summary_and_points_once(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+
+        self.assertEqual(list(self._ledger().values_list("points", "source")), [(50, "challenge")])
+        self.assertTrue(UserChallengeSummary.objects.get(user=self.user).is_day_completed(1))
+        self.assertEqual(UserProfile.objects.get(user=self.user).points, 50)
+
+    def test_failed_ledger_write_leaves_the_profile_alone(self):
+        with mock.patch.object(PointsTransaction.objects, "create", side_effect=DatabaseError("ledger down")):
+            with self.assertRaises(DatabaseError):
+                self.client.get(self.url)
+
+        self.assertFalse(UserChallengeSummary.objects.filter(user=self.user, completed_mask__gt=0).exists())
+        self.assertEqual(UserProfile.objects.get(user=self.user).points, 0)
+        self.assertFalse(self._ledger().exists())
+
+
+# ---------------- EXERCISE CHALLENGE BACKFILL ----------------
+class GenerateExerciseChallengesTests(TestCase):
+    def test_reports_rows_actually_created(self):
+        user = User.objects.create_user("backfill")
+        plan = ExercisePlan.objects.create(user=user)
+        item = PlanItem.objects.create(plan=plan, name="Squats", category="Physical Exercise", value=3, unit="freq")
+        # three days already exist: only the other seven are new
+        for day in range(1, 4):
+            DailyExerciseChallenge.objects.create(user=user, plan_item=item, day_number=day)
+
+        out = io.StringIO()
+        call_command("generate_exercise_challenges", stdout=out)
+        self.assertIn("Done: 1 users, 7 rows created.", out.getvalue())
+        self.assertEqual(DailyExerciseChallenge.objects.filter(user=user).count(), CHALLENGE_SERIES_DAYS)
+
+
+# ---------------- STREAK PAGE ----------------
+# the page is replica-routed; the replica can't see this test's uncommitted rows
+@override_settings(READ_REPLICA_URL_NAMES=[])
+class StreakPageTests(TestCase):
+    def test_challenge_badge_uses_the_series_length(self):
+        user = User.objects.create_user("leader", first_name="Lea")
+        UserChallengeSummary.objects.create(user=user, completed_mask=0b111)
+
+        response = self.client.get("/streak/")
+        self.assertContains(response, f"3/{CHALLENGE_SERIES_DAYS} challenges")
+
+
+# ---------------- HEALTH IMPORT ----------------
+@inline_writes
+class HealthIngestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("wearer")
+
+    def _ingest(self, text, fmt, **kwargs):
+        stream = io.BytesIO(text.encode("utf-8"))
+        return health_ingest.ingest(self.user.pk, stream, fmt, **kwargs)
+
+    def _days(self):
+        return dict(
+            PhysicalHealth.objects.filter(user=self.user)
+            .order_by("date").values_list("date", "steps")
+        )
+
+    def test_csv_upserts_on_user_and_date(self):
+        first = "\ufeffdate,steps,calories,sleep_hours\n2026-03-01,1000,1800,7\n2026-03-02,2000,1900,6.5\n"
+        # Excel BOM on the header, one upsert per batch
+        result = self._ingest(first, "csv", batch_size=1)
+        self.assertEqual((result["rows"], result["upserted"], result["invalid"]), (2, 2, 0))
+
+        # overlapping re-export: 03-02 is overwritten, 03-03 added, nothing duplicated
+        again = "date,steps,calories,sleep_hours\n2026-03-02,2500.0,1900,6.5\n2026-03-03,3000,2000,8\n"
+        self._ingest(again, "csv")
+        self.assertEqual(self._days(), {
+            datetime.date(2026, 3, 1): 1000,
+            datetime.date(2026, 3, 2): 2500,
+            datetime.date(2026, 3, 3): 3000,
+        })
+
+    def test_invalid_rows_are_counted_and_skipped(self):
+        tomorrow = timezone.localdate() + datetime.timedelta(days=1)
+        lines = [
+            '{"date": "2026-03-01T07:00:00Z", "steps": 1000, "calories": 1800, "sleep_hours": 7}',
+            "not json",
+            '{"date": "2026-03-02", "steps": 1000}',
+            '{"date": "2026-03-03", "steps": -5, "calories": 1800, "sleep_hours": 7}',
+            f'{{"date": "{tomorrow}", "steps": 1, "calories": 1, "sleep_hours": 1}}',
+            "",
+        ]
+        result = self._ingest("\n".join(lines), "ndjson")
+
+        self.assertEqual((result["rows"], result["upserted"], result["invalid"]), (5, 1, 4))
+        self.assertEqual(result["errors"], [
+            "line 2: not a JSON object",
+            "line 3: missing calories, sleep_hours",
+            "line 4: steps -5 outside 0-200000",
+            f"line 5: date {tomorrow} is in the future",
+        ])
+        self.assertEqual(self._days(), {datetime.date(2026, 3, 1): 1000})
+
+    def test_last_line_for_a_day_wins_within_a_batch(self):
+        text = "date,steps,calories,sleep_hours\n2026-03-01,1000,1800,7\n2026-03-01,1200,1800,7\n"
+        self.assertEqual(self._ingest(text, "csv")["upserted"], 1)
+        self.assertEqual(self._days(), {datetime.date(2026, 3, 1): 1200})
+
+
+# ---------------- HEALTH ANALYTICS ----------------
+class HealthAnalyticsComputeTests(SimpleTestCase):
+    today = datetime.date(2026, 3, 14)
+
+    def setUp(self):
+        day = lambda n: datetime.date(2026, 3, n)
+        # 2026-03-03 and 03-05..03-13 missing
+        self.rows = [
+            (day(1), 1000, 100, 6.0),
+            (day(2), 2000, 200, 7.0),
+            (day(4), 4000, 400, 8.0),
+            (day(14), 3000, 300, 6.5),
+        ]
+        self.completion = {day(1): 0, day(2): 50, day(4): 100, day(14): 100}
+
+    def _compute(self, rows=None):
+        # the pure-Python engine runs everywhere; numpy agreement is checked below
+        with mock.patch.object(health_analytics, "np", None):
+            return health_analytics.compute(self.rows if rows is None else rows, self.completion, self.today)
+
+    def test_rolling_means_skip_missing_days(self):
+        payload = self._compute()
+        labels = payload["series"]["labels"]
+        steps_7d = dict(zip(labels, payload["series"]["steps"]["7d"]))
+
+        self.assertEqual(payload["engine"], "python")
+        self.assertEqual(payload["days_recorded"], 4)
+        self.assertEqual((labels[0], labels[-1], len(labels)), ("2026-03-01", "2026-03-14", 14))
+        self.assertEqual(steps_7d["2026-03-03"], 1500.0)   # 03-01, 03-02
+        self.assertEqual(steps_7d["2026-03-10"], 4000.0)   # 03-04 only
+        self.assertIsNone(steps_7d["2026-03-12"])          # 03-06..03-12: no data
+        self.assertEqual(payload["latest"]["steps"], {"7d": 3000.0, "30d": 2500.0, "90d": 2500.0})
+        self.assertEqual(payload["latest"]["sleep_hours"]["30d"], 6.88)
+
+    def test_bests_and_correlation(self):
+        payload = self._compute()
+        self.assertEqual(
+            payload["bests"]["steps"], {"date": "2026-03-04", "period": "day", "value": 4000},
+        )
+        self.assertEqual(payload["completion_correlation"]["steps"], 0.944)
+        self.assertEqual(payload["completion_correlation"]["sleep_hours"], 0.663)
+
+    def test_too_few_days_for_a_correlation(self):
+        rows = self.rows[:health_analytics.MIN_CORRELATION_DAYS - 1]
+        payload = self._compute(rows)
+        self.assertEqual(payload["completion_correlation"], dict.fromkeys(health_analytics.METRICS))
+        self.assertEqual(payload["bests"]["calories"]["value"], 200)
+
+    def test_no_rows(self):
+        payload = self._compute([])
+        self.assertEqual(payload["days_recorded"], 0)
+        self.assertEqual(payload["series"]["labels"], [])
+
+    @unittest.skipUnless(health_analytics.np is not None, "numpy not installed")
+    def test_numpy_engine_matches_python(self):
+        for rows in (self.rows, self.rows[:2]):
+            with self.subTest(days=len(rows)):
+                payload = health_analytics.compute(rows, self.completion, self.today)
+                self.assertEqual(payload.pop("engine"), "numpy")
+                expected = self._compute(rows)
+                expected.pop("engine")
+                self.assertEqual(payload, expected)
+
+
+# ---------------- HEALTH COMPACTION ----------------
+@inline_writes
+class HealthCompactionTests(TestCase):
+    today = datetime.date(2026, 6, 15)
+    retention = 30   # watermark: 2026-05-01
+
+    def setUp(self):
+        self.user = User.objects.create_user("sleeper")
+        # 2026-04-27 .. 2026-05-03: four compacted days, three kept raw
+        for n in range(7):
+            self._day(datetime.date(2026, 4, 27) + datetime.timedelta(days=n), steps=1000 * (n + 1))
+
+    def _day(self, day, steps):
+        PhysicalHealth.objects.update_or_create(
+            user=self.user, date=day, defaults={"steps": steps, "calories": 2000, "sleep_hours": 7},
+        )
+
+    def _compact(self):
+        return list(health_compaction.compact(self.today, self.retention))
+
+    def _totals(self, period):
+        return dict(
+            PhysicalHealthSummary.objects.filter(user=self.user, period=period)
+            .values_list("period_start", "steps_total")
+        )
+
+    def test_rolls_up_below_the_watermark_and_deletes_the_raw_days(self):
+        self.assertEqual(self._compact(), [(4, 0)])
+        self.assertEqual(health_compaction.watermark(), datetime.date(2026, 5, 1))
+
+        self.assertEqual(
+            sorted(PhysicalHealth.objects.values_list("date", flat=True)),
+            [datetime.date(2026, 5, n) for n in (1, 2, 3)],
+        )
+        # 27-30 April is Monday..Thursday of one week, all in April
+        self.assertEqual(self._totals("week"), {datetime.date(2026, 4, 27): 10000})
+        self.assertEqual(self._totals("month"), {datetime.date(2026, 4, 1): 10000})
+        month = PhysicalHealthSummary.objects.get(period="month")
+        self.assertEqual((month.days, month.steps_max), (4, 4000))
+
+    def test_reruns_and_reimports_never_count_a_day_twice(self):
+        self._compact()
+        self.assertEqual(self._compact(), [])   # nothing new below the watermark
+
+        # re-import of a compacted day is skipped; a day never seen before is added
+        self._day(datetime.date(2026, 4, 28), steps=99999)
+        self._day(datetime.date(2026, 4, 26), steps=500)
+        self.assertEqual(self._compact(), [(2, 1)])
+
+        self.assertEqual(self._totals("week"), {
+            datetime.date(2026, 4, 20): 500,
+            datetime.date(2026, 4, 27): 10000,
+        })
+        self.assertEqual(self._totals("month"), {datetime.date(2026, 4, 1): 10500})
+        self.assertFalse(PhysicalHealth.objects.filter(date__lt=datetime.date(2026, 5, 1)).exists())
+
+    def test_analytics_keep_the_compacted_history(self):
+        self._day(datetime.date(2026, 4, 28), steps=99999)
+
+        def analytics():
+            cache.clear()
+            return health_analytics.for_user(self.user.pk, today=self.today)
+
+        before = analytics()
+        self._compact()
+        after = analytics()
+
+        self.assertEqual(before["days_recorded"], 7)
+        self.assertEqual(after["days_recorded"], 7)
+        self.assertEqual(before["bests"]["steps"], {"date": "2026-04-28", "period": "day", "value": 99999})
+        self.assertEqual(after["bests"]["steps"], {"date": "2026-04-01", "period": "month", "value": 99999})
+
+    def test_day_new_to_any_period_is_not_a_skip(self):
+        # the month already counts 27 April, its week doesn't (e.g. a summary fixed by hand)
+        PhysicalHealthSummary.objects.create(
+            user=self.user, period="month", period_start=datetime.date(2026, 4, 1),
+            day_mask=1 << 26, days=1, steps_total=1000, steps_max=1000,
+        )
+        PhysicalHealth.objects.filter(date__gt=datetime.date(2026, 4, 27)).delete()
+
+        self.assertEqual(self._compact(), [(1, 0)])
+        self.assertEqual(self._totals("week"), {datetime.date(2026, 4, 27): 1000})
+        self.assertEqual(self._totals("month"), {datetime.date(2026, 4, 1): 1000})
+
+    def test_watermark_only_moves_forward(self):
+        self._compact()
+        list(health_compaction.compact(self.today, retention_days=400))
+        self.assertEqual(health_compaction.watermark(), datetime.date(2026, 5, 1))
+
+    def test_history_reads_summaries_then_raw_days(self):
+        self._compact()
+        points = health_compaction.health_history(
+            self.user.pk, datetime.date(2026, 4, 27), datetime.date(2026, 5, 3)
+        )
+        self.assertEqual(
+            [(p["start"], p["period"], p["days"]) for p in points],
+            [("2026-04-27", "week", 4), ("2026-05-01", "day", 1),
+             ("2026-05-02", "day", 1), ("2026-05-03", "day", 1)],
+        )
+        self.assertEqual(points[0]["steps"], 2500.0)
+
+
+# ---------------- STREAK ENGINE ----------------
+class RunLengthTests(SimpleTestCase):
+    def days(self, *numbers):
+        return [datetime.date(2026, 3, n) for n in numbers]
+
+    def test_current_is_the_last_run_longest_the_best(self):
+        self.assertEqual(
+            streaks.run_lengths(self.days(1, 2, 3, 4, 8, 9)),
+            (2, 4, datetime.date(2026, 3, 9)),
+        )
+
+    def test_gap_resets_the_current_run(self):
+        self.assertEqual(streaks.run_lengths(self.days(1, 2, 5)), (1, 2, datetime.date(2026, 3, 5)))
+
+    def test_no_sessions(self):
+        self.assertEqual(streaks.run_lengths([]), (0, 0, None))
+
+
+class StreakRebuildTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def setUp(self):
+        self.runner = User.objects.create_user("runner")
+        self.idle = User.objects.create_user("idle")
+        for day in (1, 2, 3, 6, 7):
+            create_session(self.runner, date=datetime.date(2026, 3, day), report={})
+        UserProfile.objects.filter(user=self.idle).update(
+            streak=9, longest_streak=9, last_session_date=datetime.date(2026, 3, 1)
+        )
+
+    def _profile(self, user):
+        return UserProfile.objects.values_list(*streaks.PROFILE_FIELDS).get(user=user)
+
+    def test_rebuild_everyone(self):
+        self.assertEqual(list(streaks.rebuild()), [(2, 2)])
+        self.assertEqual(self._profile(self.runner), (2, 3, datetime.date(2026, 3, 7)))
+        self.assertEqual(self._profile(self.idle), (0, 0, None))
+
+        self.assertEqual(list(streaks.rebuild()), [(2, 0)])
+
+    def test_rebuild_only_the_given_users(self):
+        self.assertEqual(list(streaks.rebuild([self.runner.pk], batch_size=1)), [(1, 1)])
+        self.assertEqual(self._profile(self.runner), (2, 3, datetime.date(2026, 3, 7)))
+        self.assertEqual(self._profile(self.idle), (9, 9, datetime.date(2026, 3, 1)))
+
+
+# ---------------- ACTIVITY CALENDAR ----------------
+class ActivityYearTests(SimpleTestCase):
+    def test_mark_sets_the_bit_and_the_level(self):
+        row = ActivityYear(year=2026)
+        row.mark(datetime.date(2026, 1, 1), 1)
+        row.mark(datetime.date(2026, 12, 31), 4)
+        row.mark(datetime.date(2026, 12, 31), 3)   # re-marking a day doesn't count it twice
+
+        self.assertEqual(row.days_active, 2)
+        self.assertTrue(row.is_active(datetime.date(2026, 1, 1)))
+        self.assertFalse(row.is_active(datetime.date(2026, 1, 2)))
+        self.assertEqual(row.level(datetime.date(2026, 12, 31)), 3)
+        self.assertEqual(row.level(datetime.date(2026, 6, 1)), 0)
+
+    def test_leap_day_uses_the_last_slot(self):
+        row = ActivityYear(year=2028)
+        row.mark(datetime.date(2028, 12, 31), 2)
+        self.assertEqual(ActivityYear.day_index(datetime.date(2028, 12, 31)), 365)
+        self.assertTrue(row.is_active(datetime.date(2028, 12, 31)))
+
+    def test_run_ending_stops_at_a_gap(self):
+        row = ActivityYear(year=2026)
+        for day in (1, 3, 4, 5):
+            row.mark(datetime.date(2026, 2, day), 2)
+        self.assertEqual(row.run_ending(datetime.date(2026, 2, 5)), 3)
+        self.assertEqual(row.run_ending(datetime.date(2026, 2, 2)), 0)
+
+    def test_level_for_progress(self):
+        self.assertEqual(
+            [activity_calendar.level_for(p) for p in (None, 0, 24, 25, 74, 75, 100, 150)],
+            [1, 1, 1, 2, 3, 4, 4, 4],
+        )
+
+
+class CurrentRunTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def setUp(self):
+        self.user = User.objects.create_user("walker")
+
+    def _mark(self, *days):
+        with transaction.atomic():
+            for day in days:
+                activity_calendar.mark_day(self.user.pk, day, 80)
+
+    def test_run_continues_through_new_year(self):
+        self._mark(datetime.date(2025, 12, 30), datetime.date(2025, 12, 31),
+                   datetime.date(2026, 1, 1), datetime.date(2026, 1, 2))
+        self.assertEqual(activity_calendar.current_run(self.user.pk, datetime.date(2026, 1, 2)), 4)
+
+    def test_run_ending_yesterday_still_counts(self):
+        self._mark(datetime.date(2025, 12, 31), datetime.date(2026, 1, 1))
+        self.assertEqual(activity_calendar.current_run(self.user.pk, datetime.date(2026, 1, 2)), 2)
+        self.assertEqual(activity_calendar.current_run(self.user.pk, datetime.date(2026, 1, 3)), 0)
+
+    def test_gap_before_new_year_ends_the_run(self):
+        self._mark(datetime.date(2025, 12, 30), datetime.date(2026, 1, 1))
+        self.assertEqual(activity_calendar.current_run(self.user.pk, datetime.date(2026, 1, 1)), 1)
+
+    def test_rebuild_from_session_records(self):
+        for day in (datetime.date(2025, 12, 31), datetime.date(2026, 1, 1)):
+            create_session(self.user, date=day, report={})
+        self.assertEqual(list(activity_calendar.rebuild()), [(1, 2)])
+        self.assertEqual(
+            sorted(ActivityYear.objects.values_list("year", "days_active")), [(2025, 1), (2026, 1)]
+        )
+        self.assertEqual(activity_calendar.current_run(self.user.pk, datetime.date(2026, 1, 1)), 2)
+
+
+# ---------------- ADMIN ----------------
+class ScaleModeAdminTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("walker")
+        for n in range(1, 4):
+            PhysicalHealth.objects.create(
+                user=user, date=datetime.date(2026, 3, n), steps=1000 * n, calories=2000, sleep_hours=7,
+            )
+
+    def test_row_estimate_comes_from_analyze(self):
+        self.assertIsNone(estimated_row_count(PhysicalHealth, "default"))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(estimated_row_count(PhysicalHealth, "default"), 3)
+
+    def test_unfiltered_count_is_the_estimate(self):
+        with mock.patch("tracker.admin.estimated_row_count", return_value=250000), self.assertNumQueries(0):
+            self.assertEqual(EstimatedCountPaginator(PhysicalHealth.objects.all(), 50).count, 250000)
+
+    def test_filtered_count_is_capped(self):
+        paginator = EstimatedCountPaginator(PhysicalHealth.objects.filter(steps__gte=1000), 50)
+        with mock.patch.object(EstimatedCountPaginator, "COUNT_CAP", 2):
+            self.assertEqual(paginator.count, 2)
+
+    def test_changelist_renders(self):
+        self.client.force_login(User.objects.create_superuser("staff"))
+        # changelists are replica-routed; the replica can't see this test's uncommitted rows
+        self.client.cookies[STICKY_COOKIE] = "1"
+        response = self.client.get("/admin/tracker/physicalhealth/", {"q": "walker"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["cl"].result_list), 3)
+
+
+@inline_writes
+class RecomputeActionTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser("staff"))
+        self.users = [User.objects.create_user(f"drifted{n}") for n in range(3)]
+        for user in self.users:
+            PointsTransaction.objects.using(shard_for(user.pk)).create(user=user, points=30, source="session")
+
+    def _recompute_points(self):
+        profiles = UserProfile.objects.filter(user__in=self.users)
+        return self.client.post(
+            "/admin/tracker/userprofile/",
+            {"action": "recompute_points", "_selected_action": [p.pk for p in profiles]},
+            follow=True,
+        )
+
+    def _points(self):
+        return sorted(UserProfile.objects.filter(user__in=self.users).values_list("points", flat=True))
+
+    def test_recompute_runs_in_chunks_on_the_write_queue(self):
+        with mock.patch("tracker.admin.RECOMPUTE_CHUNK", 2), \
+                mock.patch.object(writer, "submit", wraps=writer.submit) as submit:
+            response = self._recompute_points()
+        self.assertEqual(self._points(), [30, 30, 30])
+        self.assertEqual(submit.call_count, 2)
+        self.assertContains(response, "Recomputed points for 3 users: 3 changed")
+
+    def test_big_selection_is_left_to_the_command(self):
+        with mock.patch("tracker.admin.RECOMPUTE_MAX_USERS", 2):
+            response = self._recompute_points()
+        self.assertEqual(self._points(), [0, 0, 0])
+        self.assertContains(response, "recompute_profiles --job points")
+
+    def test_busy_queue_stops_the_action(self):
+        with mock.patch.object(writer, "submit", side_effect=WriteQueueFull):
+            response = self._recompute_points()
+        self.assertEqual(self._points(), [0, 0, 0])
+        self.assertContains(response, "Database busy: recomputed points for 0 of 3 users")
+
+
+# ---------------- ASYNC VIEWS ----------------
+class AsyncViewTests(TestCase):
+    databases = SHARDED_DATABASES
+
+    def setUp(self):
+        self.user = User.objects.create_user("asyncer")
+        self.day = timezone.localdate() - datetime.timedelta(days=2)
+        create_session(self.user, date=self.day, report={"yoga": [{"name": "Tree pose", "status": "completed"}]})
+        PointsTransaction.objects.using(shard_for(self.user.pk)).create(
+            user=self.user, points=25, source="session", note="Async note",
+        )
+
+    async def _call(self, view, path, *args, user=None, **headers):
+        # what AuthenticationMiddleware and ShardMiddleware set up
+        user = user or self.user
+        request = AsyncRequestFactory().get(path, headers=headers)
+        request.user = user
+
+        async def auser():
+            return user
+        request.auser = auser
+        token = current_shard.set(shard_for(user.pk) if user.pk else None)
+        try:
+            return await view(request, *args)
+        finally:
+            current_shard.reset(token)
+
+    async def test_session_report_renders_the_saved_report(self):
+        url = f"/session-report/{self.day.isoformat()}/"
+        response = await self._call(async_views.session_report, url, self.day.isoformat())
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Tree pose")
+
+        # the browser's copy is current → 304, nothing rendered
+        with mock.patch.object(async_views, "arender") as arender:
+            response = await self._call(
+                async_views.session_report, url, self.day.isoformat(), if_none_match=response["ETag"],
+            )
+        self.assertEqual(response.status_code, 304)
+        arender.assert_not_called()
+
+    async def test_progress_data(self):
+        response = await self._call(async_views.progress_data, "/progress/data/")
+        payload = json.loads(response.content)
+        self.assertIn(self.day.isoformat(), payload["daily"]["labels"])
+
+    async def test_points_lists_the_ledger(self):
+        response = await self._call(async_views.points, "/points/")
+        self.assertContains(response, "Async note")
+
+    async def test_challenges_for_a_guest(self):
+        await ChallengeMaster.objects.acreate(day_number=1, title="Wall sit")
+        response = await self._call(async_views.challenges, "/challenges/", user=AnonymousUser())
+        self.assertContains(response, "Day 1: Wall sit")
+        self.assertContains(response, "View Only")
+
+
+# ---------------- LIVE UPDATES ----------------
+class LiveBusTests(SimpleTestCase):
+    def setUp(self):
+        self.bus = LiveBus()
+
+    async def test_publish_reaches_the_users_connections(self):
+        mine, other = self.bus.subscribe(1), self.bus.subscribe(2)
+
+        # publishers are write units on other threads
+        thread = threading.Thread(target=self.bus.publish, args=("profile", {"points": 5}), kwargs={"user_id": 1})
+        thread.start()
+        thread.join()
+        self.assertEqual(await asyncio.wait_for(mine.queue.get(), 1), ("profile", {"points": 5}))
+        self.assertTrue(other.queue.empty())
+
+        self.bus.unsubscribe(mine)
+        self.bus.publish("leaderboard", [])
+        self.assertEqual(await asyncio.wait_for(other.queue.get(), 1), ("leaderboard", []))
+        self.assertTrue(mine.queue.empty())
+
+    @override_settings(LIVE_UPDATES_QUEUE_SIZE=2)
+    async def test_slow_consumer_keeps_only_the_newest_events(self):
+        sub = self.bus.subscribe(1)
+        for points in range(5):
+            self.bus.publish("profile", {"points": points}, user_id=1)
+        await asyncio.sleep(0)
+
+        self.assertEqual(sub.dropped, 3)
+        self.assertEqual([sub.queue.get_nowait()[1]["points"] for _ in range(2)], [3, 4])
+
+    def test_closed_loop_drops_the_connection(self):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(self._subscribe())
+        loop.close()
+
+        self.bus.publish("leaderboard", [])
+        self.assertFalse(self.bus.has_subscribers())
+
+    async def _subscribe(self):
+        self.bus.subscribe(1)
+
+
+class LiveStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("runner", email="runner@example.com", first_name="Run", last_name="Ner")
+        UserProfile.objects.filter(user=self.user).update(points=40, streak=3)
+
+    def test_leaderboard_carries_public_fields_only(self):
+        self.assertEqual(leaderboard_snapshot(), [{"rank": 1, "username": "runner", "streak": 3, "points": 40}])
+
+    @override_settings(LIVE_UPDATES_HEARTBEAT_SECONDS=0.01)
+    async def test_stream_sends_state_then_heartbeats_and_events(self):
+        stream = _event_stream(self.user)
+        try:
+            self.assertEqual(await anext(stream), format_event("profile", {"points": 40, "streak": 3}))
+            self.assertTrue((await anext(stream)).startswith("event: leaderboard\n"))
+            self.assertEqual(await anext(stream), ": ping\n\n")
+
+            bus.publish("profile", {"points": 50, "streak": 3}, user_id=self.user.pk)
+            self.assertEqual(await anext(stream), format_event("profile", {"points": 50, "streak": 3}))
+        finally:
+            await stream.aclose()
+        self.assertFalse(bus.has_subscribers())
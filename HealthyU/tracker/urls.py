@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# ✅ progress_data / streak / points / session_report / challenges
+hot = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     # Home
@@ -14,16 +18,17 @@ urlpatterns = [
     path("profile/", views.profile, name="profile"),
 
     # Rewards
-    path("streak/", views.streak, name="streak"),
-    path("points/", views.points, name="points"),
+    path("streak/", hot.streak, name="streak"),
+    path("points/", hot.points, name="points"),
+    path("live/", async_views.live_updates, name="live_updates"),
 
     # Exercise Plan
     path("create-plan/", views.create_plan, name="create_plan"),
     path("save-plan/", views.save_plan, name="save_plan"),
 
     # Exercise Flow
-    path("session-report/", views.session_report, name="session_report"),
-    path("session-report/<str:day>/", views.session_report, name="session_report_by_day"),
+    path("session-report/", hot.session_report, name="session_report"),
+    path("session-report/<str:day>/", hot.session_report, name="session_report_by_day"),
 
     # View Your Plan
     path("view-plan/", views.view_plan, name="view_plan"),
@@ -36,9 +41,12 @@ urlpatterns = [
     path("submit-session/", views.submit_session, name="submit_session"),
 
     path("progress/", views.show_progress, name="show_progress"),
-    path("progress/data/", views.progress_data, name="progress_data"),
+    path("progress/data/", hot.progress_data, name="progress_data"),
+    path("progress/activity/", views.activity_data, name="activity_data"),
+    path("progress/health/", views.health_analytics_data, name="health_analytics_data"),
+    path("progress/health/history/", views.health_history_data, name="health_history_data"),
+    path("progress/<str:day>/", views.progress_day_detail, name="progress_day_detail"),
     # Challenges
-    path("challenges/", views.challenges, name="challenges"),
     path("challenges/accept/<int:challenge_id>/", views.accept_challenge, name="accept_challenge"),
 
     # Yoga
@@ -49,13 +57,23 @@ urlpatterns = [
 
     # Workout Plans
     path("workout-plans/", views.workout_plans, name="workout_plans"),
+    path("workout-plans/beginner/", views.plan_template_detail, {"slug": "beginner"}, name="beginner_plan"),
+    path("workout-plans/six-week/", views.plan_template_detail, {"slug": "six-week"}, name="six_week_plan"),
+    path("workout-plans/advanced/", views.plan_template_detail, {"slug": "advanced"}, name="advanced_plan"),
+    path("workout-plans/<slug:slug>/adopt/", views.adopt_plan_template, name="adopt_plan_template"),
 
     # Workout Details
     path("workout/<str:workout_type>/", views.workout_detail, name="workout_detail"),
 
-    path("challenges/", views.challenges, name="challenges"),
+    path("challenges/", hot.challenges, name="challenges"),
     path("challenges/<int:challenge_id>/", views.challenge_session, name="challenge_session"),
     path("challenges/<int:challenge_id>/complete/", views.complete_challenge, name="complete_challenge"),
 
+    # Wearable data
+    path("health/import/", views.import_health_data, name="import_health_data"),
+
+    # Metrics (staff only)
+    path("metrics/write-queue/", views.write_queue_metrics, name="write_queue_metrics"),
+
     
 ]
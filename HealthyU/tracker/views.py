@@ -11,9 +11,23 @@ from django.views.decorators.http import require_POST
 from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response, patch_cache_control, quote_etag
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
 from .models import PointsTransaction
 
 from .models import UserProfile, ExercisePlan, PlanItem, SessionRecord
+from .exercise_challenges import generate_for_user as generate_exercise_challenges
+from .live_updates import notify_profile_change
+from .plan_templates import PLAN_TEMPLATES, adopt_template, compiled_template_session, get_template, match_template
+from .provisioning import find_username, normalize_email
+from . import activity_calendar, health_analytics, health_compaction, health_ingest, progress_charts
+from .session_payload import compile_session
+from .sharding import user_atomic
+from .write_queue import WriteQueueFull, WriteTimeout, writer
 
 def _count_status(items, status):
     return sum(1 for x in items if x.get("status") == status)
@@ -37,6 +51,26 @@ def _validate_skip_limit(report):
         return False, f"Skip limit exceeded. Allowed {max_skips}, got {skipped}."
     return True, None
 
+def _busy_response():
+    return JsonResponse({
+        "status": "error",
+        "message": "Server is busy. Please try again in a moment.",
+        "reason": "busy"
+    }, status=503)
+
+
+def _write_timeout_response(exc):
+    # cancelled before it ran: nothing was written, a retry is safe
+    if not exc.started:
+        return _busy_response()
+    # still running and may commit: tell the client not to submit again
+    return JsonResponse({
+        "status": "pending",
+        "message": "Still saving. Refresh in a moment instead of submitting again.",
+        "reason": "saving"
+    }, status=202)
+
+
 def _compute_progress_points(plan, report):
     # active categories based on plan content (NOT based on client)
     physical_count = plan.items.filter(category="Physical Exercise").count()
@@ -136,7 +170,7 @@ def signup(request):
     if request.method == "POST":
         first_name = request.POST.get("first_name", "").strip()
         last_name = request.POST.get("last_name", "").strip()
-        email = request.POST.get("email", "").strip()
+        email = normalize_email(request.POST.get("email", ""))
         password = request.POST.get("password", "")
         dob = request.POST.get("dob", "")
         
@@ -161,7 +195,7 @@ def signup(request):
             error = "Password must be at least 6 characters with uppercase, lowercase, number and special character"
         elif not dob:
             error = "Date of birth is required"
-        elif User.objects.filter(email=email).exists():
+        elif User.objects.filter(email__iexact=email).exists() or find_username(email):
             error = "An account with this email already exists"
         else:
             # Validate date of birth
@@ -179,14 +213,14 @@ def signup(request):
         
         if not error:
             try:
-                user = User.objects.create_user(
+                # ✅ single INSERT (names passed in, no second save)
+                User.objects.create_user(
                     username=email,
                     email=email,
-                    password=password
+                    password=password,
+                    first_name=first_name,
+                    last_name=last_name,
                 )
-                user.first_name = first_name
-                user.last_name = last_name
-                user.save()
                 messages.success(request, "Account created successfully! Please log in.")
                 return redirect("login")
             except Exception as e:
@@ -208,7 +242,9 @@ def login_view(request):
         elif not password:
             error = "Password is required"
         else:
-            user = authenticate(request, username=email, password=password)
+            # ✅ any case works, including older accounts stored as typed
+            username = find_username(email) or normalize_email(email)
+            user = authenticate(request, username=username, password=password)
 
             if user is not None:
                 login(request, user)
@@ -254,18 +290,19 @@ def profile(request):
 
 # ---------------- STREAK / LEADERBOARD ----------------
 from django.db.models import F
-from .models import UserProfile
+from .models import CHALLENGE_SERIES_DAYS, UserProfile
 
 def streak(request):
     top_users = (
         UserProfile.objects
-        .select_related("user")
+        .select_related("user", "user__challenge_summary")
         .filter(user__is_superuser=False)
         .order_by("-streak", "-points")[:5]   # ✅ primary streak, secondary points
     )
 
     return render(request, "tracker/rewards/streak.html", {
-        "top_users": top_users
+        "top_users": top_users,
+        "series_days": CHALLENGE_SERIES_DAYS,
     })
 
 
@@ -276,7 +313,72 @@ def create_plan(request):
     # one plan only
     if ExercisePlan.objects.filter(user=request.user).exists():
         return redirect("view_plan")
-    return render(request, "tracker/plan/create_plan.html")
+    freq_min, freq_max = PLAN_VALUE_BOUNDS["freq"]
+    return render(request, "tracker/plan/create_plan.html", {
+        "freq_min": freq_min,
+        "freq_max": freq_max,
+    })
+
+
+PLAN_MAX_ITEMS = 50
+PLAN_UNITS = ("freq", "min")
+# per unit; the create_plan inputs carry the same bounds (time inputs are narrower still)
+PLAN_VALUE_BOUNDS = {"freq": (1, 50), "min": (1, 120)}
+PLAN_CATEGORIES = {key for key, _ in PlanItem.CATEGORY_CHOICES}
+
+
+def _validate_plan_items(data):
+    """
+    Check the whole save_plan payload before touching the DB.
+    Returns (cleaned_items, None) or (None, error_message).
+    """
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return None, "Plan must contain at least one exercise."
+    if len(items) > PLAN_MAX_ITEMS:
+        return None, f"Plan can have at most {PLAN_MAX_ITEMS} exercises."
+
+    cleaned = []
+    for i, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            return None, f"Item {i} is invalid."
+
+        name = str(item.get("name") or "").strip()
+        category = item.get("category")
+        unit = item.get("unit")
+
+        if not name or len(name) > 100:
+            return None, f"Item {i}: name is required (max 100 characters)."
+        if category not in PLAN_CATEGORIES:
+            return None, f"Item {i}: unknown category."
+        if unit not in PLAN_UNITS:
+            return None, f"Item {i}: unit must be 'freq' or 'min'."
+
+        try:
+            value = int(item.get("value"))
+        except (TypeError, ValueError):
+            return None, f"Item {i}: value must be a number."
+        low, high = PLAN_VALUE_BOUNDS[unit]
+        if not low <= value <= high:
+            return None, f"Item {i}: {unit} value must be between {low} and {high}."
+
+        cleaned.append({"name": name, "category": category, "value": value, "unit": unit})
+
+    return cleaned, None
+
+
+def _create_plan(user, items):
+    """Write unit for save_plan (runs on the writer thread). None if a plan already exists."""
+    if ExercisePlan.objects.filter(user=user).exists():
+        return None
+
+    # ✅ identical to a shared template → link it (shares the compiled session)
+    plan = ExercisePlan.objects.create(user=user, template=match_template(items))
+    PlanItem.objects.bulk_create([PlanItem(plan=plan, **item) for item in items])
+
+    # ✅ build the 10-day exercise challenge series from the new plan
+    generate_exercise_challenges(user)
+    return plan
 
 
 @require_POST
@@ -289,16 +391,28 @@ def save_plan(request):
             status=400
         )
 
-    data = json.loads(request.body)
-    plan = ExercisePlan.objects.create(user=request.user)
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid JSON."}, status=400)
 
-    for item in data.get("items", []):
-        PlanItem.objects.create(
-            plan=plan,
-            name=item["name"],
-            category=item["category"],
-            value=int(item["value"]),
-            unit=item["unit"]
+    # ✅ validate everything up front, so a bad item never leaves a half-written plan
+    items, error = _validate_plan_items(data)
+    if error:
+        return JsonResponse({"status": "error", "message": error}, status=400)
+
+    # ✅ constant number of queries regardless of plan size (one writer-thread unit)
+    try:
+        plan = writer.submit(_create_plan, request.user, items)
+    except WriteQueueFull:
+        return _busy_response()
+    except WriteTimeout as exc:
+        return _write_timeout_response(exc)
+
+    if plan is None:
+        return JsonResponse(
+            {"status": "error", "message": "Plan already exists. You can only delete it."},
+            status=400
         )
 
     return JsonResponse({"status": "ok", "message": "Plan saved successfully!"})
@@ -342,360 +456,31 @@ def today_session(request):
 
     # ✅ Load user's plan
     try:
-        plan = ExercisePlan.objects.prefetch_related("items").get(user=request.user)
+        plan = ExercisePlan.objects.select_related("template").get(user=request.user)
     except ExercisePlan.DoesNotExist:
         return redirect("profile")
 
-    physical_items = plan.items.filter(category="Physical Exercise").order_by("id")
-    yoga_items = plan.items.filter(category="Yoga").order_by("id")
-    med_items = plan.items.filter(category__iexact="Meditation").order_by("id")
+    # ✅ plans adopted from a template share one compiled payload
+    if plan.template_id:
+        payload = compiled_template_session(plan.template)
+    else:
+        payload = compile_session(
+            plan.items.order_by("id").values("name", "category", "value", "unit")
+        )
 
     # ✅ Flags for dynamic progress / phase logic
-    has_physical = physical_items.exists()
-    has_yoga = yoga_items.exists()
-    has_meditation = med_items.exists()
+    has_physical = bool(payload["physical"])
+    has_yoga = bool(payload["yoga"])
+    has_meditation = bool(payload["meditation"])
 
     # ✅ If user selected nothing at all → go back
     if (not has_physical) and (not has_yoga) and (not has_meditation):
         return redirect("profile")
 
-    # ✅ Exercise-specific steps dictionary
-    EXERCISE_STEPS = {
-        # Physical Exercises - Beginner
-        "Push Ups": [
-            "Place hands shoulder-width apart on the floor",
-            "Keep your body in a straight line from head to heels",
-            "Lower your chest until elbows reach 90 degrees",
-            "Push back up while keeping core engaged",
-            "Breathe out as you push up, inhale going down"
-        ],
-        "Jumping Jacks": [
-            "Stand with feet together and arms at sides",
-            "Jump while spreading legs shoulder-width apart",
-            "Raise arms overhead simultaneously",
-            "Jump back to starting position",
-            "Maintain a steady rhythm and breathe naturally"
-        ],
-        "Wall Sit": [
-            "Stand with back against a wall",
-            "Slide down until thighs are parallel to ground",
-            "Keep knees directly above ankles",
-            "Hold position while breathing steadily",
-            "Press back firmly against the wall throughout"
-        ],
-        "High Knees": [
-            "Stand with feet hip-width apart",
-            "Lift one knee to hip level quickly",
-            "Alternate legs in a running motion",
-            "Pump arms naturally with the movement",
-            "Keep core tight and maintain quick pace"
-        ],
-        "Arm Circles": [
-            "Stand with arms extended straight out to sides",
-            "Make small circular motions forward",
-            "Gradually increase circle size",
-            "Reverse direction after half the time",
-            "Keep shoulders relaxed and core engaged"
-        ],
-        
-        # Physical Exercises - Intermediate
-        "Squats": [
-            "Stand with feet shoulder-width apart",
-            "Lower hips back and down as if sitting",
-            "Keep knees behind toes and chest up",
-            "Descend until thighs are parallel to floor",
-            "Push through heels to return to standing"
-        ],
-        "Lunges": [
-            "Step forward with one leg",
-            "Lower hips until both knees bend at 90 degrees",
-            "Keep front knee directly above ankle",
-            "Push back to starting position",
-            "Alternate legs and maintain upright posture"
-        ],
-        "Plank": [
-            "Start in push-up position on forearms",
-            "Keep body in straight line from head to heels",
-            "Engage core and squeeze glutes",
-            "Hold position without letting hips sag",
-            "Breathe steadily throughout the hold"
-        ],
-        "Mountain Climbers": [
-            "Start in high plank position",
-            "Drive one knee toward chest quickly",
-            "Quickly switch legs in running motion",
-            "Keep hips level and core tight",
-            "Maintain steady breathing rhythm"
-        ],
-        "Glute Bridges": [
-            "Lie on back with knees bent, feet flat",
-            "Lift hips toward ceiling by squeezing glutes",
-            "Form straight line from shoulders to knees",
-            "Hold at top for a moment",
-            "Lower hips slowly back to starting position"
-        ],
-        
-        # Physical Exercises - Advanced
-        "Burpees": [
-            "Start standing, then drop into squat position",
-            "Place hands on floor and jump feet back to plank",
-            "Perform a push-up",
-            "Jump feet back to squat position",
-            "Explode up into a jump with arms overhead"
-        ],
-        "Pull Ups": [
-            "Hang from bar with hands shoulder-width apart",
-            "Engage core and pull shoulder blades down",
-            "Pull body up until chin clears the bar",
-            "Control descent back to starting position",
-            "Avoid swinging or using momentum"
-        ],
-        "Handstand Push Ups": [
-            "Kick up into handstand against wall",
-            "Position hands shoulder-width apart",
-            "Lower head toward floor with control",
-            "Press back up to full arm extension",
-            "Keep core tight and body straight throughout"
-        ],
-        "Pistol Squats": [
-            "Stand on one leg with other leg extended forward",
-            "Lower down on standing leg into deep squat",
-            "Keep extended leg parallel to ground",
-            "Maintain balance with arms forward",
-            "Push through heel to return to standing"
-        ],
-        "Jump Squats": [
-            "Start in regular squat position",
-            "Explode upward into a jump",
-            "Extend fully through hips and knees",
-            "Land softly back into squat position",
-            "Immediately begin next repetition"
-        ],
-        
-        # Yoga - Beginner
-        "Mountain Pose": [
-            "Stand tall with feet together",
-            "Distribute weight evenly across both feet",
-            "Engage thighs and lift kneecaps",
-            "Lengthen spine and relax shoulders",
-            "Breathe deeply and hold with awareness"
-        ],
-        "Tree Pose": [
-            "Stand on one leg with firm foundation",
-            "Place other foot on inner thigh or calf",
-            "Bring hands to prayer position at chest",
-            "Find a focal point for balance",
-            "Hold steady while breathing calmly"
-        ],
-        "Child's Pose": [
-            "Kneel on floor with big toes touching",
-            "Sit back on heels and separate knees",
-            "Fold forward extending arms ahead",
-            "Rest forehead gently on the floor",
-            "Breathe deeply and relax completely"
-        ],
-        "Cat–Cow Pose": [
-            "Start on hands and knees in tabletop",
-            "Inhale, arch back and lift chest (Cow)",
-            "Exhale, round spine and tuck chin (Cat)",
-            "Flow smoothly between the two poses",
-            "Synchronize movement with breath"
-        ],
-        "Downward Dog": [
-            "Start on hands and knees",
-            "Lift hips up and back forming inverted V",
-            "Press hands firmly into the floor",
-            "Straighten legs and press heels toward floor",
-            "Hold while breathing deeply through nose"
-        ],
-        
-        # Yoga - Intermediate
-        "Warrior II": [
-            "Step feet wide apart, turn front foot out",
-            "Bend front knee to 90 degrees",
-            "Extend arms parallel to floor",
-            "Gaze over front fingertips",
-            "Hold with strength and steady breathing"
-        ],
-        "Triangle Pose": [
-            "Stand with feet wide, turn front foot out",
-            "Extend arms parallel to floor",
-            "Reach forward then lower hand to shin",
-            "Extend top arm toward ceiling",
-            "Gaze up at top hand and breathe deeply"
-        ],
-        "Cobra Pose": [
-            "Lie face down with hands under shoulders",
-            "Press palms down and lift chest off floor",
-            "Keep elbows slightly bent",
-            "Draw shoulders back and down",
-            "Hold while breathing into the chest"
-        ],
-        "Chair Pose": [
-            "Stand with feet together",
-            "Bend knees and lower hips as if sitting",
-            "Raise arms overhead beside ears",
-            "Keep weight in heels",
-            "Hold while engaging core and breathing"
-        ],
-        "Bridge Pose": [
-            "Lie on back with knees bent, feet flat",
-            "Press feet down and lift hips high",
-            "Interlace fingers under back",
-            "Roll shoulders under and lift chest",
-            "Hold while breathing into the chest"
-        ],
-        
-        # Yoga - Advanced
-        "Headstand": [
-            "Kneel and interlace fingers on floor",
-            "Place crown of head on floor in hand cradle",
-            "Straighten legs and walk feet toward head",
-            "Lift legs up slowly with control",
-            "Balance with core engaged, breathe steadily"
-        ],
-        "Crow Pose": [
-            "Squat with hands flat on floor",
-            "Place knees on backs of upper arms",
-            "Lean forward shifting weight to hands",
-            "Lift feet off floor one at a time",
-            "Balance on hands with core engaged"
-        ],
-        "Wheel Pose": [
-            "Lie on back with knees bent, feet flat",
-            "Place hands by ears, fingers toward shoulders",
-            "Press into hands and feet, lift body up",
-            "Straighten arms and create arch",
-            "Hold while breathing deeply and evenly"
-        ],
-        "King Pigeon Pose": [
-            "Start in low lunge position",
-            "Slide front shin forward parallel to mat edge",
-            "Lower back leg to floor",
-            "Bend back knee and reach for foot",
-            "Hold while breathing into the stretch"
-        ],
-        "Scorpion Pose": [
-            "Start in forearm plank position",
-            "Walk feet toward elbows",
-            "Lift one leg then the other overhead",
-            "Arch back and bend knees toward head",
-            "Balance with core strength and steady breath"
-        ],
-        
-        # Meditation - All levels
-        "Mindfulness Meditation": [
-            "Sit comfortably with spine straight",
-            "Close eyes and focus on natural breath",
-            "Notice thoughts without judgment",
-            "Gently return focus to breath when distracted",
-            "Continue for full duration with awareness"
-        ],
-        "Breathing Meditation": [
-            "Sit in comfortable position with eyes closed",
-            "Breathe in slowly through nose for 4 counts",
-            "Hold breath gently for 4 counts",
-            "Exhale slowly through mouth for 6 counts",
-            "Repeat cycle maintaining steady rhythm"
-        ],
-        "Gratitude Meditation": [
-            "Sit comfortably and close your eyes",
-            "Think of three things you're grateful for",
-            "Feel the emotion of gratitude deeply",
-            "Visualize each blessing in detail",
-            "End by sending gratitude to yourself"
-        ],
-        "Loving-Kindness Meditation": [
-            "Sit comfortably with eyes closed",
-            "Silently repeat: May I be happy and healthy",
-            "Extend wishes to loved ones",
-            "Extend to neutral people, then difficult people",
-            "End by sending love to all beings"
-        ],
-        "Visualization Meditation": [
-            "Sit or lie down comfortably",
-            "Close eyes and take deep breaths",
-            "Visualize a peaceful, safe place in detail",
-            "Engage all senses in the visualization",
-            "Stay present in this peaceful scene"
-        ],
-        "Walking Meditation": [
-            "Stand still and become aware of body",
-            "Walk slowly with full attention on each step",
-            "Notice lifting, moving, and placing of feet",
-            "Coordinate breath with steps",
-            "Maintain mindful awareness throughout"
-        ],
-        "Mantra Meditation": [
-            "Sit comfortably with spine straight",
-            "Choose a meaningful word or phrase",
-            "Repeat mantra silently with each breath",
-            "Let mantra flow naturally without force",
-            "Return to mantra when mind wanders"
-        ],
-        "Zen Meditation": [
-            "Sit in lotus or cross-legged position",
-            "Keep spine straight and hands in lap",
-            "Lower gaze to floor about 3 feet ahead",
-            "Count breaths from one to ten",
-            "Start over when reaching ten or losing count"
-        ],
-        "Transcendental Meditation": [
-            "Sit comfortably with eyes closed",
-            "Silently repeat your personal mantra",
-            "Let mantra come effortlessly",
-            "Allow thoughts to pass without engagement",
-            "Continue for full meditation period"
-        ],
-        "Chakra Meditation": [
-            "Sit comfortably with spine aligned",
-            "Visualize energy centers along spine",
-            "Focus on each chakra from root to crown",
-            "Breathe into each center with intention",
-            "Feel energy flowing freely through body"
-        ],
-    }
-
-    def build_list_with_specific_steps(qs, default_desc):
-        arr = []
-        for item in qs:
-            # Get specific steps for this exercise, or use generic ones
-            specific_steps = EXERCISE_STEPS.get(item.name, [
-                "Prepare your space and body",
-                "Begin with proper form and alignment",
-                "Maintain focus and controlled breathing",
-                "Complete the movement with intention",
-                "Rest and recover appropriately"
-            ])
-            
-            arr.append({
-                "name": item.name,
-                "description": default_desc.format(name=item.name),
-                "value": item.value,
-                "unit": item.unit,
-                "steps": specific_steps
-            })
-        return arr
-
-    physical_data = build_list_with_specific_steps(
-        physical_items,
-        "Perform {name} safely and with proper form."
-    )
-
-    yoga_data = build_list_with_specific_steps(
-        yoga_items,
-        "Practice {name} with mindful breathing and alignment."
-    )
-
-    meditation_data = build_list_with_specific_steps(
-        med_items,
-        "{name} helps calm your mind and center your awareness."
-    )
-
     return render(request, "tracker/session/today_session.html", {
-        "physical_json": json.dumps(physical_data, cls=DjangoJSONEncoder),
-        "yoga_json": json.dumps(yoga_data, cls=DjangoJSONEncoder),
-        "meditation_json": json.dumps(meditation_data, cls=DjangoJSONEncoder),
+        "physical_json": json.dumps(payload["physical"], cls=DjangoJSONEncoder),
+        "yoga_json": json.dumps(payload["yoga"], cls=DjangoJSONEncoder),
+        "meditation_json": json.dumps(payload["meditation"], cls=DjangoJSONEncoder),
         "has_physical": has_physical,
         "has_yoga": has_yoga,
         "has_meditation": has_meditation,
@@ -722,10 +507,77 @@ def session_report(request, day=None):
         date=selected_date
     ).first()
 
-    return render(request, "tracker/session/session_report.html", {
-        "record": record,
-        "selected_date": selected_date
-    })
+    validators = None
+    if record is not None and record.date < timezone.localdate():
+        validators = _report_validators(record, _nav_stats(request.user).first())
+    response = _report_not_modified(request, validators) or render(
+        request, "tracker/session/session_report.html", {
+            "record": record,
+            "selected_date": selected_date,
+            "history": bool(day),
+            "saved_report": _saved_report_html(record) if day and record else None,
+        }
+    )
+    return _report_cache_headers(response, validators)
+
+
+REPORT_CACHE_SECONDS = 60 * 60 * 24 * 30
+
+
+def _saved_report_html(record):
+    """Rendered report of a saved session; updated_at in the key → never stale."""
+    key = f"session_report:{record.user_id}:{record.date.isoformat()}:{record.updated_at.timestamp()}"
+    html = cache.get(key)
+    if html is None:
+        report = record.report if isinstance(record.report, dict) else {}
+        html = render_to_string("tracker/partials/session_report_body.html", {
+            "record": record,
+            "sections": [
+                ("Physical Exercises", report.get("physical") or []),
+                ("Yoga", report.get("yoga") or []),
+            ],
+            "meditation": report.get("meditation") or {},
+        })
+        cache.set(key, html, REPORT_CACHE_SECONDS)
+    return mark_safe(html)
+
+
+REPORT_BROWSER_MAX_AGE = 300
+
+
+def _nav_stats(user):
+    """points / streak shown in the nav of every page (tracker.context_processors)."""
+    return UserProfile.objects.filter(user=user).values_list("points", "streak")
+
+
+def _report_validators(record, nav):
+    """
+    (etag, last_modified) of a past day's report page, or None for today's.
+    A past report rarely changes, but recompute_profiles can still rewrite
+    it, so the browser keeps it briefly and then revalidates: the ETag covers
+    record.updated_at plus the nav values on the page.
+    """
+    if record is None or record.date >= timezone.localdate():
+        return None
+    points, streak = nav or (0, 0)
+    etag = quote_etag(f"{record.pk}-{record.updated_at.timestamp()}-{points}-{streak}")
+    return etag, int(record.updated_at.timestamp())
+
+
+def _report_not_modified(request, validators):
+    """304 response if the browser's copy is current, else None."""
+    if validators is None:
+        return None
+    return get_conditional_response(request, *validators)
+
+
+def _report_cache_headers(response, validators):
+    if validators is not None:
+        etag, last_modified = validators
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, private=True, max_age=REPORT_BROWSER_MAX_AGE)
+    return response
 
 
 
@@ -738,15 +590,84 @@ from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 import json
 
+def _save_session(user, report, progress, points):
+    """
+    Write unit for submit_session (runs on the writer thread). None if already saved today.
+
+    With sharding on, the history rows go to the user's shard in their own
+    transaction, which commits first; the profile and calendar writes follow
+    in the unit's default-database transaction. If that second commit fails,
+    the session is recorded but the profile is behind: `recompute_profiles
+    --job points`, `rebuild_streaks` and `rebuild_activity_calendar` rebuild
+    them from the shard rows.
+    """
+    today = timezone.localdate()
+    now = timezone.now()
+
+    # ✅ re-check inside the write transaction (request-side check can race)
+    if SessionRecord.objects.filter(user=user, date=today).exists():
+        return None
+
+    # ✅ history rows may live in the user's shard → its own transaction, committed first
+    with user_atomic(user.pk):
+        # ✅ Points history entry (SESSION)
+        PointsTransaction.objects.create(
+            user=user,
+            points=int(points or 0),
+            source="session",
+            note=f"Session saved • Progress {progress}%"
+        )
+
+        # ✅ Store record for report + analytics
+        record = SessionRecord.objects.create(
+            user=user,
+            date=today,
+            report=report,
+            points_earned=int(points or 0)
+        )
+
+    profile = UserProfile.objects.get(user=user)
+
+    # ✅ STREAK: always use last_session_date (convert to date if needed)
+    last_session_date = profile.last_session_date
+    if hasattr(last_session_date, "date"):   # handles datetime accidentally stored
+        last_session_date = last_session_date.date()
+
+    yesterday = today - timedelta(days=1)
+
+    if last_session_date == yesterday:
+        profile.streak = (profile.streak or 0) + 1
+    else:
+        profile.streak = 1
+    profile.longest_streak = max(profile.longest_streak, profile.streak)
+
+    # ✅ POINTS
+    profile.points = (profile.points or 0) + int(points or 0)
+
+    # ✅ Update profile daily status
+    profile.last_activity = now
+    profile.last_session_date = today
+    profile.last_session_report = report
+    profile.session_saved_today = True
+    profile.session_completed_today = (progress == 100)
+    profile.save()
+    notify_profile_change(profile)
+    transaction.on_commit(lambda: progress_charts.invalidate(user.pk, today))
+    transaction.on_commit(lambda: health_analytics.invalidate(user.pk, today))
+
+    # ✅ activity calendar bit + intensity for today
+    activity_calendar.mark_day(user.pk, today, record.progress)
+
+    return profile
+
+
 @login_required(login_url="login")
 @require_POST
 def submit_session(request):
     data = json.loads(request.body or "{}")
     report = data.get("report") or {}
 
-    profile = UserProfile.objects.get(user=request.user)
     today = timezone.localdate()
-    now = timezone.now()
 
     # ✅ must have a plan
     plan = ExercisePlan.objects.prefetch_related("items").filter(user=request.user).first()
@@ -778,44 +699,20 @@ def submit_session(request):
             "progress": progress
         }, status=400)
 
-    # ✅ STREAK: always use last_session_date (convert to date if needed)
-    last_session_date = profile.last_session_date
-    if hasattr(last_session_date, "date"):   # handles datetime accidentally stored
-        last_session_date = last_session_date.date()
-
-    yesterday = today - timedelta(days=1)
-
-    if last_session_date == yesterday:
-        profile.streak = (profile.streak or 0) + 1
-    else:
-        profile.streak = 1
-
-    # ✅ POINTS
-    profile.points = (profile.points or 0) + int(points or 0)
-
-    # ✅ Update profile daily status
-    profile.last_activity = now
-    profile.last_session_date = today
-    profile.last_session_report = report
-    profile.session_saved_today = True
-    profile.session_completed_today = (progress == 100)
-    profile.save()
-
-    # ✅ Points history entry (SESSION)
-    PointsTransaction.objects.create(
-        user=request.user,
-        points=int(points or 0),
-        source="session",
-        note=f"Session saved • Progress {progress}%"
-    )
+    # ✅ DB writes go through the single-writer queue
+    try:
+        profile = writer.submit(_save_session, request.user, report, progress, points)
+    except WriteQueueFull:
+        return _busy_response()
+    except WriteTimeout as exc:
+        return _write_timeout_response(exc)
 
-    # ✅ Store record for report + analytics
-    SessionRecord.objects.create(
-        user=request.user,
-        date=today,
-        report=report,
-        points_earned=int(points or 0)
-    )
+    if profile is None:
+        return JsonResponse({
+            "status": "error",
+            "message": "Session already saved today. Come back tomorrow!",
+            "reason": "already_saved"
+        }, status=400)
 
     return JsonResponse({
         "status": "ok",
@@ -837,17 +734,40 @@ from .models import SessionRecord, ExercisePlan
 def show_progress(request):
     plan = ExercisePlan.objects.filter(user=request.user).first()
     today = timezone.localdate()
+
+    # ✅ inline SVG by default; Plotly only when asked for
+    interactive = request.GET.get("interactive") == "1"
+    charts = None if interactive else cache.get(progress_charts.cache_key(request.user.pk, today))
+
+    # ✅ one summary query (no report JSON) feeds both the list and the charts;
+    # reports are loaded per day by session_report
+    if charts is None:
+        rows = list(_progress_rows(request.user, today))
+    else:
+        rows = list(_progress_rows(request.user, today, days=30))
+
     start = today - timedelta(days=30)
+    records = [row for row in reversed(rows) if row["date"] >= start]
 
-    records = (
-        SessionRecord.objects
-        .filter(user=request.user, date__gte=start, date__lte=today)
-        .order_by("-date")
-    )
+    payload = None
+    if interactive:
+        payload = _progress_payload(rows, today)
+    elif charts is None:
+        charts = progress_charts.render_all(_progress_payload(rows, today))
+        cache.set(progress_charts.cache_key(request.user.pk, today), charts, progress_charts.CACHE_SECONDS)
+
+    # ✅ year calendar from one ActivityYear row
+    activity = activity_calendar.get_year(request.user.pk, today.year)
 
     return render(request, "tracker/progress/show_progress.html", {
         "plan": plan,
         "records": records,
+        "interactive": interactive,
+        "charts": charts,
+        "progress_payload": payload,
+        "activity_year": today.year,
+        "activity_days": activity.days_active if activity else 0,
+        "activity_heatmap": activity_calendar.heatmap_svg(activity, today.year),
     })
 
 @login_required(login_url="login")
@@ -859,65 +779,80 @@ def progress_data(request):
     - monthly (last 12 months)
     """
     today = timezone.localdate()
+    qs = _progress_rows(request.user, today)
+    return JsonResponse(_progress_payload(list(qs), today))
+
+
+@login_required(login_url="login")
+def activity_data(request):
+    """
+    Activity calendar JSON for ?year= (default: this year): per-day levels,
+    days active and the current run, all from ActivityYear rows.
+    """
+    today = timezone.localdate()
+    try:
+        year = int(request.GET.get("year", today.year))
+    except ValueError:
+        year = 0
+    if not 1 <= year <= today.year:
+        return JsonResponse({"status": "error", "message": "Invalid year."}, status=400)
+
+    payload = activity_calendar.summary(activity_calendar.get_year(request.user.pk, year), year, today)
+    payload["current_run"] = activity_calendar.current_run(request.user.pk, today)
+    return JsonResponse(payload)
+
+
+@login_required(login_url="login")
+def health_analytics_data(request):
+    """
+    Returns JSON for the health metrics (PhysicalHealth):
+    - 7 / 30 / 90 day rolling averages (latest + last 90 days)
+    - personal bests
+    - correlation with session completion
+    """
+    return JsonResponse(health_analytics.for_user(request.user.pk))
+
+
+@login_required(login_url="login")
+def health_history_data(request):
+    """
+    Daily health averages for ?start=&end= (YYYY-MM-DD, default last year):
+    raw days, plus ?period=week|month summaries where old days were compacted.
+    """
+    today = timezone.localdate()
+    period = request.GET.get("period", "week")
+    try:
+        start = request.GET.get("start")
+        start = datetime.date.fromisoformat(start) if start else today - timedelta(days=365)
+        end = request.GET.get("end")
+        end = datetime.date.fromisoformat(end) if end else today
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Dates must be YYYY-MM-DD."}, status=400)
+    if period not in health_compaction.PERIODS:
+        return JsonResponse({"status": "error", "message": "period must be week or month."}, status=400)
+
+    return JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "points": health_compaction.health_history(request.user.pk, start, end, period),
+    })
+
 
-    # Pull last ~365 days for easy aggregation
-    start = today - timedelta(days=365)
-    qs = (
+def _progress_rows(user, today, days=365):
+    """Session summary rows (no report JSON) for the last `days` days, oldest first."""
+    start = today - timedelta(days=days)
+    return (
         SessionRecord.objects
-        .filter(user=request.user, date__gte=start, date__lte=today)
+        .filter(user=user, date__gte=start, date__lte=today)
         .order_by("date")
-        .values("date", "points_earned", "report")
+        .values("date", "points_earned", "progress")
     )
 
-    # --- Helper: compute progress from stored report (server-truth-ish) ---
-    def compute_progress_from_report(report):
-        # If your backend stored "report" as dict already, great.
-        # If it stored as string, try parse.
-        if report is None:
-            return 0
-
-        if isinstance(report, str):
-            import json
-            try:
-                report = json.loads(report)
-            except Exception:
-                return 0
-
-        physical = report.get("physical", []) if isinstance(report.get("physical", []), list) else []
-        yoga = report.get("yoga", []) if isinstance(report.get("yoga", []), list) else []
-        med = report.get("meditation", {}) if isinstance(report.get("meditation", {}), dict) else {}
-
-        # active categories = those present in report
-        active = []
-        if len(physical) > 0: active.append("physical")
-        if len(yoga) > 0: active.append("yoga")
-        # meditation present only if planned in session
-        if med and med.get("status") != "not_planned":
-            active.append("meditation")
-
-        if not active:
-            return 0
-
-        weight = 100 / len(active)
-
-        def ratio_done(lst):
-            if not lst:
-                return 0.0
-            done = sum(1 for x in lst if x.get("status") == "completed")
-            return done / len(lst)
-
-        prog = 0.0
-        if "physical" in active:
-            prog += ratio_done(physical) * weight
-        if "yoga" in active:
-            prog += ratio_done(yoga) * weight
-        if "meditation" in active:
-            prog += (1.0 if med.get("status") == "completed" else 0.0) * weight
-
-        return max(0, min(int(round(prog)), 100))
 
+def _progress_payload(qs, today):
+    """Builds the progress_data JSON (daily / weekly / monthly) from session rows."""
     # --- Build daily series (last 30 days, include 0s) ---
-    daily_map = {row["date"]: (compute_progress_from_report(row["report"]), int(row["points_earned"] or 0)) for row in qs}
+    daily_map = {row["date"]: (row["progress"], int(row["points_earned"] or 0)) for row in qs}
 
     daily_labels = []
     daily_progress = []
@@ -938,7 +873,7 @@ def progress_data(request):
     for row in qs:
         d = row["date"]
         ws = week_start(d)
-        prog = compute_progress_from_report(row["report"])
+        prog = row["progress"]
         pts = int(row["points_earned"] or 0)
         if ws not in weekly_bucket:
             weekly_bucket[ws] = {"sum_prog": 0, "sum_pts": 0, "count": 0}
@@ -970,7 +905,7 @@ def progress_data(request):
     for row in qs:
         d = row["date"]
         mk = month_key(d)
-        prog = compute_progress_from_report(row["report"])
+        prog = row["progress"]
         pts = int(row["points_earned"] or 0)
         if mk not in monthly_bucket:
             monthly_bucket[mk] = {"sum_prog": 0, "sum_pts": 0, "count": 0}
@@ -1004,7 +939,7 @@ def progress_data(request):
             monthly_avg_progress.append(0)
             monthly_total_points.append(0)
 
-    return JsonResponse({
+    return {
         "daily": {
             "labels": daily_labels,
             "progress": daily_progress,
@@ -1020,61 +955,9 @@ def progress_data(request):
             "avg_progress": monthly_avg_progress,
             "total_points": monthly_total_points
         }
-    })
-
-# ---------------- CHALLENGES ----------------
-import random
-from datetime import date
-
-# Daily challenges pool
-CHALLENGE_POOL = [
-    {"icon_class": "challenge-icon-run", "title": "Morning Runner", "description": "Complete a 20-minute run or jog", "points": 25, "xp": 10, "category": "cardio"},
-    {"icon_class": "challenge-icon-strength", "title": "Push-up Master", "description": "Do 50 push-ups (can be broken into sets)", "points": 20, "xp": 8, "category": "strength"},
-    {"icon_class": "challenge-icon-meditation", "title": "Zen Master", "description": "Complete 15 minutes of meditation", "points": 15, "xp": 12, "category": "mindfulness"},
-    {"icon_class": "challenge-icon-weights", "title": "Strength Builder", "description": "Complete a full strength training session", "points": 30, "xp": 15, "category": "strength"},
-    {"icon_class": "challenge-icon-flexibility", "title": "Flexibility Focus", "description": "Do 20 minutes of stretching or yoga", "points": 18, "xp": 10, "category": "flexibility"},
-    {"icon_class": "challenge-icon-cardio", "title": "Cardio King", "description": "30 minutes of any cardio activity", "points": 25, "xp": 12, "category": "cardio"},
-    {"icon_class": "challenge-icon-legs", "title": "Leg Day Legend", "description": "Complete 100 squats throughout the day", "points": 22, "xp": 10, "category": "strength"},
-    {"icon_class": "challenge-icon-core", "title": "Core Crusher", "description": "5-minute plank challenge (total time)", "points": 20, "xp": 15, "category": "strength"},
-    {"icon_class": "challenge-icon-water", "title": "Water Warrior", "description": "Drink 8 glasses of water today", "points": 10, "xp": 5, "category": "wellness"},
-    {"icon_class": "challenge-icon-sleep", "title": "Sleep Champion", "description": "Get 8 hours of quality sleep", "points": 15, "xp": 8, "category": "wellness"},
-    {"icon_class": "challenge-icon-nutrition", "title": "Healthy Eater", "description": "Eat 5 servings of fruits/vegetables", "points": 12, "xp": 6, "category": "wellness"},
-    {"icon_class": "challenge-icon-steps", "title": "Step Master", "description": "Walk 10,000 steps today", "points": 20, "xp": 10, "category": "cardio"},
-    {"icon_class": "challenge-icon-consistency", "title": "Consistency King", "description": "Complete your daily workout plan", "points": 30, "xp": 15, "category": "general"},
-    {"icon_class": "challenge-icon-mindbody", "title": "Mind & Body", "description": "Do both yoga and meditation today", "points": 35, "xp": 18, "category": "mindfulness"},
-    {"icon_class": "challenge-icon-hiit", "title": "HIIT Hero", "description": "Complete a 20-minute HIIT workout", "points": 28, "xp": 14, "category": "cardio"},
-    {"icon_class": "challenge-icon-burpees", "title": "Burpee Beast", "description": "Complete 30 burpees throughout the day", "points": 25, "xp": 12, "category": "strength"},
-    {"icon_class": "challenge-icon-yoga", "title": "Yoga Warrior", "description": "Complete a 30-minute yoga session", "points": 22, "xp": 11, "category": "flexibility"},
-    {"icon_class": "challenge-icon-endurance", "title": "Endurance Master", "description": "45 minutes of continuous cardio", "points": 35, "xp": 16, "category": "cardio"},
-]
-
-def get_daily_challenges():
-    """Get 5 random challenges for today based on date seed"""
-    today = date.today()
-    seed = int(today.strftime("%Y%m%d"))
-    random.seed(seed)
-    
-    challenges = random.sample(CHALLENGE_POOL, 5)
-    for i, challenge in enumerate(challenges):
-        challenge['id'] = i + 1
-        challenge['completed'] = False  # You can check against user's completed challenges
-    
-    return challenges
-
-@login_required(login_url="login")
-def challenges(request):
-    daily_challenges = get_daily_challenges()
-    
-    context = {
-        'daily_challenges': daily_challenges,
-        'today_date': date.today().strftime("%B %d, %Y"),
-        'completed_today': 0,  # Calculate from user's data
-        'total_completed': 0,  # Calculate from user's data
-        'points_earned': 0,  # Calculate from user's data
     }
-    
-    return render(request, "tracker/challenges/challenges.html", context)
 
+# ---------------- CHALLENGES ----------------
 @login_required(login_url="login")
 def accept_challenge(request, challenge_id):
     # Logic to accept and track challenge
@@ -1507,6 +1390,56 @@ def meditation_detail(request, meditation_type):
 def workout_plans(request):
     return render(request, "tracker/plans/workout_plans.html")
 
+
+PLAN_TEMPLATE_PAGES = {
+    "beginner": "tracker/plans/beginner_plan.html",
+    "six-week": "tracker/plans/six_week_plan.html",
+    "advanced": "tracker/plans/advanced_plan.html",
+}
+
+def plan_template_detail(request, slug):
+    return render(request, PLAN_TEMPLATE_PAGES[slug], {"template_slug": slug})
+
+
+def _adopt_plan_template(user, slug):
+    """Write unit for adopt_plan_template (runs on the writer thread). (template, plan); plan is None if one exists."""
+    template = get_template(slug)
+    if template is None or ExercisePlan.objects.filter(user=user).exists():
+        return template, None
+    return template, adopt_template(user, template)
+
+
+@login_required(login_url="login")
+@require_POST
+def adopt_plan_template(request, slug):
+    # one plan only
+    if ExercisePlan.objects.filter(user=request.user).exists():
+        messages.error(request, "You already have a plan. Delete it to adopt a template.")
+        return redirect("view_plan")
+
+    if slug not in PLAN_TEMPLATES:
+        return redirect("workout_plans")
+
+    # creating / recompiling the shared template row is a write too
+    try:
+        template, plan = writer.submit(_adopt_plan_template, request.user, slug)
+    except WriteQueueFull:
+        messages.error(request, "Server is busy. Please try again in a moment.")
+        return redirect("workout_plans")
+    except WriteTimeout as exc:
+        if exc.started:
+            messages.info(request, "Still saving your plan. Refresh in a moment.")
+            return redirect("view_plan")
+        messages.error(request, "Server is busy. Please try again in a moment.")
+        return redirect("workout_plans")
+
+    if plan is None:
+        messages.error(request, "You already have a plan. Delete it to adopt a template.")
+        return redirect("view_plan")
+
+    messages.success(request, f"✅ {template.name} added as your plan!")
+    return redirect("view_plan")
+
 # ---------------- POINTS HISTORY PAGE ----------------
 @login_required(login_url="login")
 def points(request):
@@ -1732,7 +1665,18 @@ def progress_day_detail(request, day):
     if not record:
         raise Http404("No session for this date")
 
-    return render(request, "tracker/progress/day_detail.html", {"record": record})
+    validators = None
+    if record.date < timezone.localdate():
+        validators = _report_validators(record, _nav_stats(request.user).first())
+    response = _report_not_modified(request, validators) or render(
+        request, "tracker/session/session_report.html", {
+            "record": record,
+            "selected_date": d,
+            "history": True,
+            "saved_report": _saved_report_html(record),
+        }
+    )
+    return _report_cache_headers(response, validators)
 
 from django.utils.timezone import now
 
@@ -1752,26 +1696,65 @@ def daily_challenge(request):
 
 from django.contrib.auth.decorators import login_required
 
-@login_required(login_url="login")
-def complete_challenge(request, challenge_id):
-    ch = get_object_or_404(ChallengeMaster, id=challenge_id)
+def _complete_challenge(user, ch):
+    """
+    Write unit for complete_challenge (runs on the writer thread). False if already completed.
 
-    if UserChallengeLog.objects.filter(user=request.user, challenge=ch).exists():
-        return redirect("challenges")
+    Same order as _save_session: the ledger row goes to the user's shard in
+    its own transaction, committed first; if the default-database writes
+    after it fail, `recompute_profiles --job points` catches the profile up.
+    """
+    summary, _ = (
+        UserChallengeSummary.objects
+        .select_for_update()
+        .get_or_create(user=user)
+    )
+
+    # ✅ one-row check (summary bitmap) instead of querying the log
+    if summary.is_day_completed(ch.day_number):
+        return False
+
+    # ✅ points history may live in the user's shard → its own transaction, committed first
+    with user_atomic(user.pk):
+        PointsTransaction.objects.create(
+            user=user,
+            points=ch.reward_points,
+            source="challenge",
+            note=f"Day {ch.day_number}: {ch.title}"
+        )
 
-    UserChallengeLog.objects.create(user=request.user, challenge=ch, status="completed")
+    UserChallengeLog.objects.create(user=user, challenge=ch, status="completed")
 
-    profile = UserProfile.objects.get(user=request.user)
+    summary.completed_mask |= 1 << (ch.day_number - 1)
+    summary.total_reward += ch.reward_points
+    summary.last_completed_date = timezone.localdate()
+    summary.save()
+
+    profile = UserProfile.objects.get(user=user)
     profile.points += ch.reward_points
     profile.save()
+    notify_profile_change(profile)
+    return True
 
-    PointsTransaction.objects.create(
-        user=request.user,
-        points=ch.reward_points,
-        source="challenge",
-        note=f"Day {ch.day_number}: {ch.title}"
-    )
 
+@login_required(login_url="login")
+def complete_challenge(request, challenge_id):
+    ch = get_object_or_404(ChallengeMaster, id=challenge_id)
+
+    try:
+        completed = writer.submit(_complete_challenge, request.user, ch)
+    except WriteQueueFull:
+        messages.error(request, "Server is busy. Please try again in a moment.")
+        return redirect("challenges")
+    except WriteTimeout as exc:
+        if exc.started:
+            messages.info(request, "Still saving your challenge. Refresh in a moment.")
+        else:
+            messages.error(request, "Server is busy. Please try again in a moment.")
+        return redirect("challenges")
+
+    if not completed:
+        return redirect("challenges")
 
     messages.success(request, f"🎉 Challenge completed! +{ch.reward_points} points added.")
     return redirect("challenges")
@@ -1779,32 +1762,39 @@ def complete_challenge(request, challenge_id):
 
 from datetime import date
 from django.utils import timezone
-from .models import ChallengeMaster, UserChallengeLog
+from .models import ChallengeMaster, UserChallengeLog, UserChallengeSummary
+
+def challenge_for_day(catalogue, day):
+    """The series challenge shown on `day`: the catalogue cycles, one per day."""
+    return catalogue[day.toordinal() % len(catalogue)]
+
 
 def challenges(request):
-    challenges_qs = ChallengeMaster.objects.order_by("day_number")
+    # ✅ the whole catalogue is 10 rows: one query instead of exists/count/offset
+    catalogue = list(ChallengeMaster.objects.order_by("day_number"))
 
-    if not challenges_qs.exists():
+    if not catalogue:
         return render(request, "tracker/challenges/challenges.html", {
             "challenge": None,
             "today_date": timezone.localdate().strftime("%B %d, %Y"),
             "is_guest": not request.user.is_authenticated,
         })
 
-    # Calculate today's index (0–9)
-    today = date.today()
-    day_index = today.toordinal() % challenges_qs.count()
-
-    today_challenge = challenges_qs[day_index]
+    today_challenge = challenge_for_day(catalogue, timezone.localdate())
 
-    is_completed = False
+    series = None
     if request.user.is_authenticated:
-        is_completed = UserChallengeLog.objects.filter(
-            user=request.user,
-            challenge=today_challenge
-        ).exists()
+        series = UserChallengeSummary.objects.filter(user=request.user).first()
+
+    return render(request, "tracker/challenges/challenges.html",
+                  _challenge_context(request.user, today_challenge, series))
+
 
-    return render(request, "tracker/challenges/challenges.html", {
+def _challenge_context(user, today_challenge, series):
+    """Template context for the challenges page (shared with the async view)."""
+    is_completed = bool(series and series.is_day_completed(today_challenge.day_number))
+
+    return {
         "challenge": {
             "id": today_challenge.id,
             "title": f"Day {today_challenge.day_number}: {today_challenge.title}",
@@ -1812,9 +1802,11 @@ def challenges(request):
             "points": today_challenge.reward_points,
             "completed": is_completed,
         },
+        "series": series,
+        "series_days": CHALLENGE_SERIES_DAYS,
         "today_date": timezone.localdate().strftime("%B %d, %Y"),
-        "is_guest": not request.user.is_authenticated,
-    })
+        "is_guest": not user.is_authenticated,
+    }
 
 import json
 from django.core.serializers.json import DjangoJSONEncoder
@@ -1838,3 +1830,39 @@ def challenge_session(request, challenge_id):
         "end_url": "/challenges/",
         "is_guest": (not request.user.is_authenticated),
     })
+
+
+# ---------------- HEALTH DATA IMPORT ----------------
+@login_required(login_url="login")
+@require_POST
+def import_health_data(request):
+    """
+    Wearable export upload: multipart field "file", or the raw CSV / NDJSON
+    as the request body (format from ?format=, the file name or Content-Type).
+    """
+    upload = request.FILES.get("file")
+    fmt = request.GET.get("format") or health_ingest.detect_format(
+        upload.name if upload else "", request.content_type or ""
+    )
+    if fmt not in health_ingest.FORMATS:
+        return JsonResponse(
+            {"status": "error", "message": "Send a CSV or NDJSON file."}, status=400
+        )
+
+    # ✅ streamed: the body is never read into memory as a whole
+    try:
+        result = health_ingest.ingest(request.user.pk, upload or request, fmt)
+    except WriteQueueFull:
+        return _busy_response()
+    except WriteTimeout as exc:
+        return _write_timeout_response(exc)
+
+    return JsonResponse({"status": "ok", **result})
+
+
+# ---------------- METRICS ----------------
+@login_required(login_url="login")
+def write_queue_metrics(request):
+    if not request.user.is_staff:
+        raise Http404
+    return JsonResponse(writer.metrics())
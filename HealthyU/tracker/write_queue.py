@@ -0,0 +1,153 @@
+"""
+In-process single-writer queue for SQLite.
+
+SQLite allows one writer at a time, so instead of letting request threads
+race for the lock (and fail with "database is locked" under bursts), views
+hand their transactional unit of work to one writer thread through a bounded
+queue and wait for the result. A full queue is reported to the caller as
+WriteQueueFull, so overload shows up as a quick "busy" response instead of
+requests piling up. A unit that does not finish within the result timeout is
+cancelled if it has not started yet, and reported as WriteTimeout either way.
+
+Enabled by settings.SQLITE_WRITE_QUEUE; when off, units run inline in an
+atomic block on the calling thread.
+"""
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+class WriteTimeout(Exception):
+    """
+    The unit did not finish in time. started=False: it was cancelled before it
+    ran, nothing was written. started=True: it is still running and may commit.
+    """
+
+    def __init__(self, started):
+        super().__init__("Write unit still running" if started else "Write unit cancelled in the queue")
+        self.started = started
+
+
+class WriteCoordinator:
+    def __init__(self, maxsize=256, put_timeout=2.0, result_timeout=30.0):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._put_timeout = put_timeout
+        self._result_timeout = result_timeout
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "processed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "max_depth": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+            "last_wait": 0.0,
+        }
+
+    @property
+    def enabled(self):
+        return getattr(settings, "SQLITE_WRITE_QUEUE", False)
+
+    def submit(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) in a transaction on the writer thread and return its result."""
+        if not self.enabled or threading.current_thread() is self._thread:
+            with transaction.atomic():
+                return fn(*args, **kwargs)
+
+        self._ensure_started()
+
+        future = Future()
+        try:
+            # the unit runs in the caller's context (e.g. its shard, see tracker/sharding.py)
+            ctx = contextvars.copy_context()
+            self._queue.put((future, ctx, fn, args, kwargs, time.monotonic()), timeout=self._put_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["rejected"] += 1
+            raise WriteQueueFull("Write queue is full")
+
+        with self._stats_lock:
+            self._stats["max_depth"] = max(self._stats["max_depth"], self._queue.qsize())
+
+        try:
+            return future.result(timeout=self._result_timeout)
+        except FutureTimeoutError:
+            # cancel() only succeeds while the unit is still queued
+            cancelled = future.cancel()
+            if not cancelled and future.done():   # finished right after the timeout
+                return future.result()
+            with self._stats_lock:
+                self._stats["timed_out"] += 1
+            raise WriteTimeout(started=not cancelled) from None
+
+    def metrics(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        done = stats["processed"] + stats["failed"]
+        return {
+            "enabled": self.enabled,
+            "depth": self._queue.qsize(),
+            "max_depth": stats["max_depth"],
+            "capacity": self._queue.maxsize,
+            "processed": stats["processed"],
+            "failed": stats["failed"],
+            "rejected": stats["rejected"],
+            "timed_out": stats["timed_out"],
+            "avg_wait_ms": round(stats["total_wait"] / done * 1000, 2) if done else 0.0,
+            "max_wait_ms": round(stats["max_wait"] * 1000, 2),
+            "last_wait_ms": round(stats["last_wait"] * 1000, 2),
+        }
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    @staticmethod
+    def _run_unit(fn, args, kwargs):
+        with transaction.atomic():
+            return fn(*args, **kwargs)
+
+    def _run(self):
+        while True:
+            future, ctx, fn, args, kwargs, enqueued_at = self._queue.get()
+            wait = time.monotonic() - enqueued_at
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            close_old_connections()
+            try:
+                result = ctx.run(self._run_unit, fn, args, kwargs)
+            except Exception as e:
+                future.set_exception(e)
+                failed = True
+            else:
+                future.set_result(result)
+                failed = False
+
+            with self._stats_lock:
+                self._stats["failed" if failed else "processed"] += 1
+                self._stats["total_wait"] += wait
+                self._stats["max_wait"] = max(self._stats["max_wait"], wait)
+                self._stats["last_wait"] = wait
+
+
+writer = WriteCoordinator()